@@ -0,0 +1,467 @@
+"""
+Almacén binario por columnas de manos jugadas, con consultas sobre mmap.
+
+Cada mano de un asiento se guarda como un registro de ancho fijo: cartas
+del jugador y de la banca (hasta MAX_CARTAS cada una, rellenas con VACIA),
+número de cartas, puntos, resultado, asiento, asientos de la mesa y el
+origen de la mano (generador, semilla, flujo, mezcla, posición y mazos, al
+empezar la mano), con el que ``simulacion.reproducir`` puede volver a
+jugarla con todos sus asientos. Las manos sin origen reproducible (con un
+generador desconocido o jugadas en un zapato recogido a mitad de una mano
+anterior, ver ``Mesa.inicio``) se guardan con el generador VACIA.
+
+Los registros se acumulan en ``array`` por columnas (escribir no necesita
+NumPy) y se vuelcan en segmentos de hasta TAMANO_SEGMENTO manos: una
+cabecera y cada columna contigua, alineada a 8 bytes. Un segmento se
+escribe en un fichero temporal y se renombra al terminar, así que los
+lectores nunca ven segmentos a medias.
+
+``Lector`` proyecta los segmentos con ``mmap`` y expone cada columna como
+una vista de NumPy sin copiar ni interpretar nada; las consultas agregan
+segmento a segmento con ``numpy.bincount``, de modo que recorrer cientos de
+millones de manos solo cuesta leer las columnas que usan.
+
+Uso:
+    python simulacion.py --rondas 10000000 --almacen manos/
+    python almacen.py manos/ --consulta carta-banca
+    python almacen.py manos/ --consulta pedidas --json
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+from azar import GENERADORES
+
+# Cartas guardadas por mano (las de más se descartan; el número real queda en la columna)
+MAX_CARTAS = 12
+# Relleno de las posiciones sin carta
+VACIA = 255
+# Manos por segmento
+TAMANO_SEGMENTO = 1 << 20
+# Extensión de los segmentos
+EXTENSION = ".bja"
+# Columnas: nombre, código de array, bytes por valor y valores por mano
+COLUMNAS = (
+    ("jugador", "B", 1, MAX_CARTAS),
+    ("banca", "B", 1, MAX_CARTAS),
+    ("cartas", "B", 1, 1),
+    ("cartasBanca", "B", 1, 1),
+    ("puntos", "B", 1, 1),
+    ("puntosBanca", "B", 1, 1),
+    ("resultado", "B", 1, 1),
+    ("asiento", "B", 1, 1),
+    ("asientos", "B", 1, 1),
+    ("generador", "B", 1, 1),
+    ("mazos", "B", 1, 1),
+    ("posicion", "H", 2, 1),
+    ("mezcla", "I", 4, 1),
+    ("flujo", "I", 4, 1),
+    ("semilla", "q", 8, 1),
+)
+# Generadores por índice (la columna guarda la posición en esta tupla)
+NOMBRES_GENERADORES = tuple(sorted(GENERADORES))
+# Cabecera de un segmento: magia, cartas por mano, columnas y manos
+_CABECERA = struct.Struct("<4sBBxxQ")
+_MAGIA = b"BJA2"
+# Semillas que caben en la columna (enteros de 64 bits con signo)
+SEMILLAS = range(-1 << 63, 1 << 63)
+_RELLENO = array("B", [VACIA] * MAX_CARTAS)
+
+
+def _alinear(n):
+    """ Redondea n al siguiente múltiplo de 8. """
+    return (n + 7) & ~7
+
+
+def comprobar_semilla(semilla):
+    """
+    Comprueba que una semilla cabe en la columna del almacén.
+
+    Parámetros:
+    - semilla (int): Semilla a comprobar (None se guarda como 0).
+
+    Lanza:
+    - ValueError: Si no cabe en 64 bits con signo.
+    """
+
+    if semilla is not None and semilla not in SEMILLAS:
+        raise ValueError(f"La semilla {semilla} no cabe en 64 bits con signo (almacén de manos)")
+
+
+def desplazamientos(manos):
+    """
+    Calcula dónde empieza cada columna en un segmento.
+
+    Parámetros:
+    - manos (int): Manos del segmento.
+
+    Retorna:
+    - list: Desplazamiento en bytes de cada columna, en el orden de COLUMNAS,
+      y el tamaño total del segmento al final.
+    """
+
+    posiciones = []
+    desplazamiento = _alinear(_CABECERA.size)
+    for _, _, tamano, ancho in COLUMNAS:
+        posiciones.append(desplazamiento)
+        desplazamiento += _alinear(tamano * ancho * manos)
+    posiciones.append(desplazamiento)
+    return posiciones
+
+
+class Escritor:
+    """
+    Escritor de manos en segmentos de un directorio.
+
+    Los segmentos se llaman ``<prefijo>-<índice>.bja`` y el índice sigue al
+    del último segmento existente con el mismo prefijo, así que varias
+    sesiones (o varios procesos con prefijos distintos) añaden segmentos al
+    mismo almacén.
+
+    Parámetros:
+    - directorio (str): Directorio del almacén (se crea si no existe).
+    - prefijo (str): Prefijo de los segmentos, por defecto "manos".
+    - tamano (int): Manos por segmento, por defecto TAMANO_SEGMENTO.
+    - semilla (int): Semilla de las mesas que se van a anotar, para
+      rechazarla antes de jugar si no cabe (ver comprobar_semilla). Por
+      defecto, None (sin comprobar).
+
+    Atributos:
+    - manos (int): Manos pendientes de volcar en el segmento actual.
+    - escritas (int): Manos volcadas en segmentos.
+    - segmentos (list): Rutas de los segmentos escritos.
+    """
+
+    def __init__(self, directorio, prefijo="manos", tamano=TAMANO_SEGMENTO, semilla=None):
+        comprobar_semilla(semilla)
+        os.makedirs(directorio, exist_ok=True)
+        self.directorio = directorio
+        self.prefijo = prefijo
+        self.tamano = tamano
+        existentes = [n for n in os.listdir(directorio) if n.startswith(prefijo + "-") and n.endswith(EXTENSION)]
+        self.indice = max((int(n[len(prefijo) + 1:-len(EXTENSION)]) + 1 for n in existentes), default=0)
+        self.escritas = 0
+        self.segmentos = []
+        self.vaciar()
+
+    def vaciar(self):
+        """ Empieza un segmento nuevo en memoria. """
+        self.manos = 0
+        self.columnas = {nombre: array(codigo) for nombre, codigo, _, _ in COLUMNAS}
+
+    def anotar(self, mesa, resultados=None):
+        """
+        Anota las manos de todos los asientos de una mesa terminada. Las
+        manos de una mesa van siempre en el mismo segmento.
+
+        Parámetros:
+        - mesa (Mesa): Mesa con la banca ya jugada.
+        - resultados (list): Resultado de cada asiento, por defecto mesa.resultados().
+        """
+
+        if resultados is None:
+            resultados = mesa.resultados()
+        if self.manos + len(mesa.jugadores) > self.tamano:
+            self.volcar()  # La mesa no cabe entera en el segmento actual
+        c = self.columnas
+        baraja = mesa.baraja
+        rng = baraja.rng
+        semilla = getattr(rng, "semilla", None) or 0
+        comprobar_semilla(semilla)
+        banca = mesa.banca.mano
+        # Posición y mezcla anotadas por la mesa al empezar la mano
+        reproducible = mesa.inicio is not None and getattr(rng, "nombre", None) in NOMBRES_GENERADORES
+        posicion, mezcla = mesa.inicio if reproducible else (0, 0)
+        origen = (
+            NOMBRES_GENERADORES.index(rng.nombre) if reproducible else VACIA,
+            mesa.reglas.mazos,
+            posicion,
+            mezcla,
+            getattr(rng, "flujo", 0),
+            semilla,
+        )
+        for asiento, (jugador, resultado) in enumerate(zip(mesa.jugadores, resultados)):
+            mano = jugador.mano
+            c["jugador"].extend(mano[:MAX_CARTAS])
+            c["jugador"].extend(_RELLENO[len(mano):])
+            c["banca"].extend(banca[:MAX_CARTAS])
+            c["banca"].extend(_RELLENO[len(banca):])
+            c["cartas"].append(min(len(mano), VACIA))
+            c["cartasBanca"].append(min(len(banca), VACIA))
+            c["puntos"].append(jugador.puntos)
+            c["puntosBanca"].append(mesa.banca.puntos)
+            c["resultado"].append(resultado)
+            c["asiento"].append(asiento)
+            c["asientos"].append(len(mesa.jugadores))
+            for nombre, valor in zip(("generador", "mazos", "posicion", "mezcla", "flujo", "semilla"), origen):
+                c[nombre].append(valor)
+        self.manos += len(mesa.jugadores)
+        if self.manos >= self.tamano:
+            self.volcar()
+
+    def volcar(self):
+        """
+        Escribe las manos pendientes como un segmento nuevo.
+
+        Retorna:
+        - str or None: Ruta del segmento, o None si no había manos pendientes.
+        """
+
+        if not self.manos:
+            return None
+        ruta = os.path.join(self.directorio, f"{self.prefijo}-{self.indice:06d}{EXTENSION}")
+        posiciones = desplazamientos(self.manos)
+        with open(ruta + ".tmp", "wb") as f:
+            f.write(_CABECERA.pack(_MAGIA, MAX_CARTAS, len(COLUMNAS), self.manos))
+            for (nombre, _, _, ancho), inicio in zip(COLUMNAS, posiciones):
+                f.write(bytes(inicio - f.tell()))  # Alineación
+                valores = self.columnas[nombre]
+                if sys.byteorder == "big":
+                    valores.byteswap()
+                if ancho == 1:
+                    f.write(valores.tobytes())
+                else:
+                    # Las cartas llegan por mano; se guardan por posición (la carta i de todas las manos seguidas)
+                    for i in range(ancho):
+                        f.write(valores[i::ancho].tobytes())
+            f.write(bytes(posiciones[-1] - f.tell()))
+        os.replace(ruta + ".tmp", ruta)
+        self.segmentos.append(ruta)
+        self.escritas += self.manos
+        self.indice += 1
+        self.vaciar()
+        return ruta
+
+    def cerrar(self):
+        """ Vuelca las manos pendientes. """
+        self.volcar()
+
+
+class Segmento:
+    """
+    Segmento proyectado en memoria con una vista de NumPy por columna.
+
+    Las columnas de cartas ("jugador" y "banca") tienen forma
+    (MAX_CARTAS, manos): la fila i es la carta i de todas las manos, así que
+    la carta visible de la banca es ``segmento.banca[0]``. Las demás son
+    vectores de una entrada por mano.
+
+    Parámetros:
+    - ruta (str): Ruta del segmento.
+
+    Atributos:
+    - manos (int): Manos del segmento.
+    - columnas (dict): Vista de cada columna por nombre (también como atributos).
+    """
+
+    def __init__(self, ruta):
+        import numpy as np
+
+        self.ruta = ruta
+        with open(ruta, "rb") as f:
+            self.mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magia, cartas, columnas, self.manos = _CABECERA.unpack_from(self.mapa)
+        if magia != _MAGIA or cartas != MAX_CARTAS or columnas != len(COLUMNAS):
+            self.mapa.close()
+            raise ValueError(f"{ruta} no es un segmento de manos compatible")
+        self.columnas = {}
+        for (nombre, codigo, tamano, ancho), inicio in zip(COLUMNAS, desplazamientos(self.manos)):
+            # Códigos de array en minúscula: enteros con signo
+            tipo = np.dtype(f"<{'i' if codigo.islower() else 'u'}{tamano}")
+            vista = np.frombuffer(self.mapa, tipo, self.manos * ancho, inicio)
+            self.columnas[nombre] = vista.reshape(ancho, self.manos) if ancho > 1 else vista
+
+    def __getattr__(self, nombre):
+        try:
+            return self.__dict__["columnas"][nombre]
+        except KeyError:
+            raise AttributeError(nombre) from None
+
+    def origen(self, indice):
+        """
+        Retorna el registro de la mesa de una mano apto para
+        ``simulacion.reproducir`` (las acciones se deducen de las cartas:
+        cada asiento pidió cartas - 2 veces). Con varios asientos, el
+        registro lleva las acciones de todos ellos, en orden de juego. Si la
+        mano no tiene origen reproducible, el generador es None.
+
+        Parámetros:
+        - indice (int): Índice de la mano en el segmento.
+        """
+
+        c = self.columnas
+        generador = int(c["generador"][indice])
+        primera = indice - int(c["asiento"][indice])  # Fila del primer asiento de la mesa
+        asientos = int(c["asientos"][indice])
+        acciones = []
+        for fila in range(primera, primera + asientos):
+            pedidas = int(c["cartas"][fila]) - 2
+            acciones.append(["pedir"] * pedidas + (["plantar"] if int(c["puntos"][fila]) < 21 else []))
+        return {
+            "generador": NOMBRES_GENERADORES[generador] if generador < len(NOMBRES_GENERADORES) else None,
+            "semilla": int(c["semilla"][indice]), "flujo": int(c["flujo"][indice]),
+            "mezcla": int(c["mezcla"][indice]), "posicion": int(c["posicion"][indice]),
+            "mazos": int(c["mazos"][indice]),
+            "asientos": asientos,
+            "acciones": acciones[0] if asientos == 1 else acciones,
+        }
+
+    def cerrar(self):
+        """ Libera la proyección (las vistas dejan de ser válidas). """
+        self.columnas = {}
+        self.mapa.close()
+
+
+class Lector:
+    """
+    Lector de todos los segmentos de un almacén.
+
+    Parámetros:
+    - directorio (str): Directorio del almacén.
+
+    Atributos:
+    - rutas (list): Segmentos del almacén, en orden de nombre.
+    """
+
+    def __init__(self, directorio):
+        self.rutas = sorted(os.path.join(directorio, n) for n in os.listdir(directorio) if n.endswith(EXTENSION))
+
+    def segmentos(self):
+        """
+        Recorre los segmentos de uno en uno; cada uno se libera al pasar al siguiente.
+
+        Retorna:
+        - Generador de Segmento.
+        """
+
+        for ruta in self.rutas:
+            segmento = Segmento(ruta)
+            try:
+                yield segmento
+            finally:
+                segmento.cerrar()
+
+    def manos(self):
+        """ Retorna el número total de manos del almacén (solo lee las cabeceras). """
+        total = 0
+        for ruta in self.rutas:
+            with open(ruta, "rb") as f:
+                total += _CABECERA.unpack(f.read(_CABECERA.size))[3]
+        return total
+
+    def agrupar(self, clave, grupos, peso=None):
+        """
+        Cuenta las manos por grupo en todos los segmentos.
+
+        Parámetros:
+        - clave (callable): Recibe un Segmento y retorna el grupo (entero
+          entre 0 y grupos - 1) de cada mano.
+        - grupos (int): Número de grupos.
+        - peso (callable): Si se indica, recibe un Segmento y retorna el
+          valor de cada mano que se suma en lugar de contarla.
+
+        Retorna:
+        - ndarray: Total de cada grupo.
+        """
+
+        import numpy as np
+
+        total = np.zeros(grupos, dtype=np.int64 if peso is None else np.float64)
+        for segmento in self.segmentos():
+            pesos = peso(segmento) if peso is not None else None
+            total += np.bincount(clave(segmento), pesos, minlength=grupos)[:grupos]
+        return total
+
+    def resultados(self):
+        """
+        Retorna las manos, las tasas de victoria, derrota y empate.
+        """
+
+        conteo = self.agrupar(lambda s: s.resultado, 3)
+        return _tasas(conteo)
+
+    def por_carta_banca(self):
+        """
+        Retorna las tasas de victoria, derrota y empate según la carta
+        visible de la banca (1 = As, 10 = cualquier carta de valor 10).
+        """
+
+        valores = _valores()
+        conteo = self.agrupar(lambda s: valores[s.banca[0]] * 3 + s.resultado, 33).reshape(11, 3)
+        return {valor: _tasas(conteo[valor]) for valor in range(1, 11)}
+
+    def pasadas_por_pedidas(self):
+        """
+        Retorna, según las cartas que pidió el jugador, las manos y la tasa
+        de manos que se pasaron de 21.
+        """
+
+        # Una sola pasada: grupo 2 * pedidas para las que no se pasaron y el siguiente para las que sí
+        conteo = self.agrupar(lambda s: (s.cartas.astype("intp") - 2) * 2 + (s.puntos > 21), 2 * VACIA).reshape(VACIA, 2)
+        manos = conteo.sum(axis=1)
+        return {
+            pedidas: {"manos": int(manos[pedidas]), "pasadas": float(conteo[pedidas, 1] / manos[pedidas])}
+            for pedidas in range(len(manos)) if manos[pedidas]
+        }
+
+
+def _valores():
+    """ Retorna el valor de cada carta (As = 1) como array de NumPy, con 0 para VACIA. """
+    import numpy as np
+    from motor import VALORES
+
+    valores = np.zeros(VACIA + 1, dtype=np.intp)
+    valores[:len(VALORES)] = VALORES
+    return valores
+
+
+def _tasas(conteo):
+    """ Convierte un conteo [empates, victorias, derrotas] en manos y tasas. """
+    manos = int(conteo.sum())
+    resultado = {"manos": manos}
+    for clave, valor in (("victoria", conteo[1]), ("derrota", conteo[2]), ("empate", conteo[0])):
+        resultado[clave] = float(valor / manos) if manos else 0.0
+    return resultado
+
+
+# Consultas por nombre
+CONSULTAS = {
+    "resultados": Lector.resultados,
+    "carta-banca": Lector.por_carta_banca,
+    "pedidas": Lector.pasadas_por_pedidas,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consultas sobre el almacén de manos")
+    parser.add_argument("directorio", help="Directorio del almacén")
+    parser.add_argument("--consulta", choices=sorted(CONSULTAS), default="resultados", help="Consulta a realizar")
+    parser.add_argument("--json", action="store_true", help="Imprime el resultado en formato JSON")
+    args = parser.parse_args()
+
+    lector = Lector(args.directorio)
+    inicio = time.perf_counter()
+    resultado = CONSULTAS[args.consulta](lector)
+    duracion = time.perf_counter() - inicio
+    if args.json:
+        print(json.dumps(resultado))
+        return
+    total = lector.manos()
+    print(f"{total:,} manos en {len(lector.rutas)} segmentos ({duracion:.2f} s, {total / duracion if duracion else 0:,.0f} manos/s)")
+    if args.consulta == "resultados":
+        resultado = {"Todas": resultado}
+    for grupo, fila in resultado.items():
+        if "victoria" in fila:
+            print(f"{grupo:>6}: {fila['manos']:>13,} manos  victoria {fila['victoria']:.2%}  derrota {fila['derrota']:.2%}  empate {fila['empate']:.2%}")
+        else:
+            print(f"{grupo:>6}: {fila['manos']:>13,} manos  pasadas {fila['pasadas']:.2%}")
+
+
+if __name__ == '__main__':
+    main()
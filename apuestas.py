@@ -0,0 +1,286 @@
+"""
+Apuestas, fondos y estudio de fondos a largo plazo.
+
+Los sistemas de apuestas deciden cuánto apostar antes de cada mano (una
+cantidad fija o una escala según la cuenta verdadera de ``conteo``), la
+mesa liquida las apuestas con ``Mesa.liquidar`` (el blackjack natural se
+paga según ``Reglas.pagoBlackjack``) y ``Cuenta`` lleva los fondos.
+
+El estudio juega las manos de una en una y pasa cada resultado por
+acumuladores en línea (media y varianza de Welford, caída máxima desde el
+máximo y ruinas) sin guardar los resultados, así que usa la misma memoria
+para mil manos que para mil millones, e informa del progreso cada cierto
+número de manos.
+
+Uso:
+    python apuestas.py --manos 10000000 --sistema conteo --fondos 1000 --progreso 1000000
+    python apuestas.py --manos 1000000000 --json > estudio.jsonl
+"""
+
+import argparse
+import json
+import math
+import time
+
+from azar import GENERADORES, crear
+from conteo import Conteo
+from motor import Blackjack, Mazo, Reglas
+from simulacion import PlantarseEn, jugar_mano
+
+
+class Plana:
+    """
+    Sistema de apuestas plano: la misma cantidad en todas las manos.
+
+    Parámetros:
+    - unidad (float): Cantidad apostada, por defecto 1.
+    """
+
+    __slots__ = ("unidad",)
+
+    def __init__(self, unidad=1):
+        self.unidad = unidad
+
+    def __call__(self, conteo):
+        """
+        Retorna la apuesta de la siguiente mano.
+
+        Parámetros:
+        - conteo (Conteo): Conteo del zapato (no se usa).
+        """
+
+        return self.unidad
+
+
+class PorConteo:
+    """
+    Sistema de apuestas según la cuenta verdadera Hi-Lo: una unidad con
+    cuenta 1 o menos y tantas unidades como la cuenta (redondeada hacia
+    abajo) por encima, hasta un máximo.
+
+    Parámetros:
+    - unidad (float): Apuesta mínima, por defecto 1.
+    - maximo (int): Unidades como máximo (la horquilla 1-maximo), por defecto 8.
+    """
+
+    __slots__ = ("unidad", "maximo")
+
+    def __init__(self, unidad=1, maximo=8):
+        self.unidad = unidad
+        self.maximo = maximo
+
+    def __call__(self, conteo):
+        """
+        Retorna la apuesta de la siguiente mano.
+
+        Parámetros:
+        - conteo (Conteo): Conteo del zapato antes del reparto.
+        """
+
+        return self.unidad * min(max(math.floor(conteo.verdadera()), 1), self.maximo)
+
+
+# Sistemas de apuestas por nombre
+SISTEMAS = {"plana": Plana, "conteo": PorConteo}
+
+
+class Acumulador:
+    """
+    Media y varianza en línea con el algoritmo de Welford, numéricamente
+    estable aunque se acumulen miles de millones de valores.
+
+    Atributos:
+    - n (int): Valores acumulados.
+    - media (float): Media de los valores.
+    """
+
+    __slots__ = ("n", "media", "m2")
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0  # Suma de cuadrados de las desviaciones
+
+    def agregar(self, valor):
+        """ Añade un valor. """
+        self.n += 1
+        delta = valor - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (valor - self.media)
+
+    def varianza(self):
+        """ Retorna la varianza muestral (0 con menos de dos valores). """
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    def desviacion(self):
+        """ Retorna la desviación típica muestral. """
+        return math.sqrt(self.varianza())
+
+
+def riesgo_ruina(media, varianza, fondos):
+    """
+    Estima la probabilidad de perder unos fondos jugando indefinidamente con
+    la aproximación de difusión: exp(-2 * media * fondos / varianza).
+
+    Parámetros:
+    - media (float): Ganancia media por mano.
+    - varianza (float): Varianza de la ganancia por mano.
+    - fondos (float): Fondos iniciales.
+
+    Retorna:
+    - float: Probabilidad de ruina entre 0 y 1 (1 si la media no es positiva).
+    """
+
+    if media <= 0 or varianza <= 0:
+        return 1.0
+    return math.exp(-2 * media * fondos / varianza)
+
+
+class Cuenta:
+    """
+    Fondos de un jugador con estadísticas en línea de sus resultados.
+
+    Si los fondos se agotan se cuenta una ruina y se recargan los fondos
+    iniciales, de modo que el estudio puede seguir.
+
+    Parámetros:
+    - fondos (float): Fondos iniciales, por defecto 1000.
+
+    Atributos:
+    - saldo (float): Fondos actuales.
+    - pico (float): Saldo máximo desde la última recarga.
+    - caida (float): Mayor caída del saldo desde un máximo.
+    - ruinas (int): Veces que se han agotado los fondos.
+    - apostado (float): Suma de las apuestas.
+    - resultados (Acumulador): Ganancia neta por mano.
+    """
+
+    __slots__ = ("inicial", "saldo", "pico", "caida", "ruinas", "apostado", "resultados")
+
+    def __init__(self, fondos=1000):
+        self.inicial = fondos
+        self.saldo = fondos
+        self.pico = fondos
+        self.caida = 0.0
+        self.ruinas = 0
+        self.apostado = 0.0
+        self.resultados = Acumulador()
+
+    def apostar(self, cantidad):
+        """
+        Retorna la apuesta que cubren los fondos (como mucho, el saldo).
+
+        Parámetros:
+        - cantidad (float): Apuesta que pide el sistema.
+        """
+
+        apuesta = min(cantidad, self.saldo)
+        self.apostado += apuesta
+        return apuesta
+
+    def anotar(self, neto):
+        """
+        Anota el resultado de una mano.
+
+        Parámetros:
+        - neto (float): Ganancia neta de la mano (negativa si pierde).
+        """
+
+        self.resultados.agregar(neto)
+        self.saldo += neto
+        if self.saldo > self.pico:
+            self.pico = self.saldo
+        elif self.pico - self.saldo > self.caida:
+            self.caida = self.pico - self.saldo
+        if self.saldo <= 0:
+            self.ruinas += 1
+            self.saldo = self.pico = self.inicial
+
+    def resumen(self):
+        """
+        Retorna un diccionario con el estado de la cuenta y las estadísticas.
+        """
+
+        r = self.resultados
+        error = r.desviacion() / math.sqrt(r.n) if r.n else 0.0
+        return {
+            "manos": r.n,
+            "saldo": self.saldo,
+            "media": r.media,
+            "ic95": 1.96 * error,
+            "desviacion": r.desviacion(),
+            "ventaja": r.n * r.media / self.apostado if self.apostado else 0.0,
+            "caida_maxima": self.caida,
+            "ruinas": self.ruinas,
+            "riesgo_ruina": riesgo_ruina(r.media, r.varianza(), self.inicial),
+        }
+
+
+def estudiar(manos, sistema, politica, fondos=1000, mazos=6, penetracion=0.75, semilla=None, generador="mt", progreso=1000000):
+    """
+    Juega manos de un jugador con un sistema de apuestas y va informando del
+    estado de sus fondos. Usa memoria constante.
+
+    Parámetros:
+    - manos (int): Manos a jugar.
+    - sistema (callable): Sistema de apuestas; recibe el conteo.
+    - politica (callable): Política del jugador.
+    - fondos (float): Fondos iniciales, por defecto 1000.
+    - mazos (int): Barajas del zapato, por defecto 6.
+    - penetracion (float): Fracción del zapato repartida antes de mezclar, por defecto 0.75.
+    - semilla (int): Semilla del generador, por defecto aleatoria.
+    - generador (str): Generador de ``azar``, por defecto "mt".
+    - progreso (int): Manos entre informes, por defecto un millón.
+
+    Retorna:
+    - Generador de diccionarios de Cuenta.resumen() (con la duración y las
+      manos por segundo), uno cada ``progreso`` manos y otro al terminar.
+    """
+
+    conteo = Conteo(mazos)
+    bj = Blackjack(Mazo(crear(generador, semilla), mazos, penetracion, conteo), Reglas(mazos=mazos))
+    cuenta = Cuenta(fondos)
+    inicio = time.perf_counter()
+    for mano in range(1, manos + 1):
+        bj.reiniciar()
+        bj.humano.apuesta = cuenta.apostar(sistema(conteo))
+        jugar_mano(bj, politica)
+        cuenta.anotar(bj.liquidar()[0])
+        if mano % progreso == 0 or mano == manos:
+            duracion = time.perf_counter() - inicio
+            resumen = cuenta.resumen()
+            resumen["segundos"] = duracion
+            resumen["manos_por_segundo"] = mano / duracion if duracion else 0.0
+            yield resumen
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estudio de fondos con apuestas")
+    parser.add_argument("--manos", type=int, default=1000000, help="Manos a jugar")
+    parser.add_argument("--sistema", choices=sorted(SISTEMAS), default="plana", help="Sistema de apuestas")
+    parser.add_argument("--unidad", type=float, default=1, help="Apuesta mínima")
+    parser.add_argument("--maximo", type=int, default=8, help="Unidades como máximo con el sistema por conteo")
+    parser.add_argument("--fondos", type=float, default=1000, help="Fondos iniciales")
+    parser.add_argument("--mazos", type=int, default=6, help="Número de barajas del zapato")
+    parser.add_argument("--penetracion", type=float, default=0.75, help="Fracción del zapato repartida antes de mezclar")
+    parser.add_argument("--plantarse", type=int, default=17, help="Puntuación con la que se planta el jugador")
+    parser.add_argument("--semilla", type=int, default=None, help="Semilla (por defecto, aleatoria)")
+    parser.add_argument("--generador", choices=sorted(GENERADORES), default="mt", help="Generador para mezclar")
+    parser.add_argument("--progreso", type=int, default=1000000, help="Manos entre informes")
+    parser.add_argument("--json", action="store_true", help="Imprime cada informe como una línea JSON")
+    args = parser.parse_args()
+
+    sistema = Plana(args.unidad) if args.sistema == "plana" else PorConteo(args.unidad, args.maximo)
+    informes = estudiar(args.manos, sistema, PlantarseEn(args.plantarse), args.fondos, args.mazos,
+                        args.penetracion, args.semilla, args.generador, args.progreso)
+    for r in informes:
+        if args.json:
+            print(json.dumps(r), flush=True)
+            continue
+        print(f"{r['manos']:>13,} manos  saldo {r['saldo']:>12,.1f}  media {r['media']:+.4f} ± {r['ic95']:.4f}"
+              f"  ventaja {r['ventaja']:+.2%}  caída máx. {r['caida_maxima']:,.1f}  ruinas {r['ruinas']}"
+              f"  riesgo de ruina {r['riesgo_ruina']:.1%}  ({r['manos_por_segundo']:,.0f} manos/s)", flush=True)
+
+
+if __name__ == '__main__':
+    main()
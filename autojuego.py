@@ -0,0 +1,288 @@
+"""
+Juego automático de la ventana principal para pruebas de resistencia.
+
+``Automata`` juega rondas en una ``MainWindow`` real (con la plataforma
+``offscreen`` de Qt) pulsando ``btnPedir``, ``btnPlantar`` y
+``btnReiniciar``, de modo que pasa por las mismas ranuras y la misma
+habilitación de botones que un usuario. Una política enchufable decide si
+pedir carta. Por defecto las cartas se colocan sin animaciones (turbo) y
+el registro en pantalla no se pinta; con ``animado`` cada animación de
+``Carta.mover`` se crea y se termina al instante, para ejercitar también
+ese camino.
+
+Cada cierto número de rondas toma una muestra con las rondas por segundo,
+la latencia por ronda (p50 y p99), la memoria de Python (``tracemalloc``),
+los objetos de Qt con envoltorio de Python y los hijos de la ventana, las
+líneas del registro y la memoria residente del proceso, de modo que una
+fuga o una ralentización que solo aparece tras horas de juego se ve como
+una tendencia entre las muestras.
+
+Uso:
+    python programa.py --autojuego 100000 --politica estrategia --muestreo 1000
+"""
+
+import os
+import random
+import time
+import tracemalloc
+
+from PySide6 import QtCore, QtWidgets
+from motor import VALORES
+
+# Políticas por nombre (ver crear_politica)
+POLITICAS = ("plantarse", "estrategia", "azar")
+
+
+class PorTabla:
+    """
+    Política que pide carta cuando la tabla de estrategia le da más valor.
+
+    Parámetros:
+    - tabla (TablaEstrategia): Tabla de valor esperado.
+    """
+
+    __slots__ = ("tabla",)
+
+    def __init__(self, tabla):
+        self.tabla = tabla
+
+    def __call__(self, jugador, visible_banca):
+        return self.tabla.pedir(jugador.puntos, jugador.is_soft, VALORES[visible_banca])
+
+
+class AlAzar:
+    """
+    Política que pide carta con una probabilidad fija.
+
+    Parámetros:
+    - probabilidad (float): Probabilidad de pedir, por defecto 0.5.
+    - semilla (int): Semilla del generador, por defecto aleatoria.
+    """
+
+    __slots__ = ("probabilidad", "rng")
+
+    def __init__(self, probabilidad=0.5, semilla=None):
+        self.probabilidad = probabilidad
+        self.rng = random.Random(semilla)
+
+    def __call__(self, jugador, visible_banca):
+        return self.rng.random() < self.probabilidad
+
+
+def crear_politica(nombre, reglas=None):
+    """
+    Crea una política por nombre: "plantarse" (con 17), "estrategia" (la
+    tabla de valor esperado de las reglas) o "azar".
+
+    Parámetros:
+    - nombre (str): Nombre de la política.
+    - reglas (Reglas): Reglas de la mesa para la tabla de estrategia.
+    """
+
+    if nombre == "estrategia":
+        from estrategia import TablaEstrategia
+        return PorTabla(TablaEstrategia(reglas))
+    if nombre == "azar":
+        return AlAzar()
+    from simulacion import PlantarseEn
+    return PlantarseEn()
+
+
+def memoria_residente():
+    """ Retorna la memoria residente del proceso en bytes (0 si no se puede leer). """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def objetos_qt():
+    """ Retorna el número de objetos de Qt vivos con envoltorio de Python. """
+    from shiboken6 import Shiboken
+    return len(Shiboken.getAllValidWrappers())
+
+
+class Automata:
+    """
+    Jugador automático de una ventana principal.
+
+    Parámetros:
+    - ventana (MainWindow): Ventana a jugar (ya mostrada o no).
+    - politica (callable): Recibe la mano del jugador y la carta visible de
+      la banca y retorna True para pedir carta.
+    - animado (bool): Ejecuta las animaciones de las cartas terminándolas al
+      instante en lugar de colocar las cartas. Por defecto, False.
+    - registro (bool): Mantiene el registro en pantalla. Por defecto, False
+      (las líneas se descartan sin pintarlas).
+
+    Atributos:
+    - rondas (int): Rondas jugadas.
+    - muestras (list): Muestras tomadas por ``jugar``.
+    """
+
+    def __init__(self, ventana, politica, animado=False, registro=False):
+        self.ventana = ventana
+        self.politica = politica
+        self.animado = animado
+        self.app = QtWidgets.QApplication.instance()
+        self.rondas = 0
+        self.muestras = []
+        ventana.cola.turbo = not animado
+        if not registro:
+            ventana.anotar = lambda texto: None  # Sin pintar el registro
+
+    def pulsar(self, boton):
+        """
+        Pulsa un botón de la ventana y espera a que la interfaz alcance al motor.
+
+        Parámetros:
+        - boton (QPushButton): Botón a pulsar; debe estar habilitado.
+        """
+
+        if not boton.isEnabled():
+            raise RuntimeError(f"El botón {boton.text()!r} está deshabilitado")
+        boton.click()
+        self.esperar()
+
+    def esperar(self):
+        """ Termina los pasos pendientes de la cola de animaciones. """
+        cola = self.ventana.cola
+        while cola.ocupada():
+            if cola.actual is not None:
+                cola.actual.setCurrentTime(cola.actual.totalDuration())  # Termina y pasa al siguiente paso
+            else:
+                self.app.processEvents()
+
+    def ronda(self):
+        """
+        Juega una ronda: reinicia (salvo la primera), pide según la política y
+        se planta.
+
+        Retorna:
+        - float: Duración de la ronda en segundos.
+        """
+
+        ventana = self.ventana
+        inicio = time.perf_counter()
+        if self.rondas:
+            self.pulsar(ventana.btnReiniciar)
+        else:
+            self.esperar()
+        humano = ventana.bj.humano
+        visible = ventana.bj.banca.mano[0]
+        while not humano.plantado and self.politica(humano, visible):
+            self.pulsar(ventana.btnPedir)
+        if not humano.plantado:
+            self.pulsar(ventana.btnPlantar)
+        if not ventana.finalizado:
+            raise RuntimeError("La ronda no ha terminado al plantarse")
+        # Pintado y borrados diferidos, como al volver al bucle de eventos
+        self.app.processEvents()
+        QtCore.QCoreApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+        self.rondas += 1
+        return time.perf_counter() - inicio
+
+    def muestra(self, latencias, duracion):
+        """
+        Retorna una muestra del rendimiento y la memoria.
+
+        Parámetros:
+        - latencias (list): Duración de cada ronda desde la última muestra.
+        - duracion (float): Segundos desde la última muestra.
+        """
+
+        latencias = sorted(latencias)
+        python, _ = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            "rondas": self.rondas,
+            "rondas_por_segundo": len(latencias) / duracion if duracion else 0.0,
+            "p50": latencias[len(latencias) // 2] if latencias else 0.0,
+            "p99": latencias[min(int(len(latencias) * 0.99), len(latencias) - 1)] if latencias else 0.0,
+            "python": python,
+            "objetos_qt": objetos_qt(),
+            "hijos": len(self.ventana.findChildren(QtCore.QObject)),
+            "registro": self.ventana.registro.blockCount(),
+            "residente": memoria_residente(),
+        }
+
+    def jugar(self, rondas, muestreo=1000, trazar=True):
+        """
+        Juega rondas tomando una muestra cada ``muestreo`` rondas.
+
+        Parámetros:
+        - rondas (int): Rondas a jugar.
+        - muestreo (int): Rondas entre muestras, por defecto 1000.
+        - trazar (bool): Mide la memoria de Python con tracemalloc, por
+          defecto True (hace más lento el juego).
+
+        Retorna:
+        - Generador de muestras (diccionarios), la primera antes de jugar.
+        """
+
+        if trazar and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        latencias = []
+        anterior = time.perf_counter()
+        self.muestras.append(self.muestra(latencias, 0.0))
+        yield self.muestras[-1]
+        for n in range(1, rondas + 1):
+            latencias.append(self.ronda())
+            if n % muestreo == 0 or n == rondas:
+                ahora = time.perf_counter()
+                self.muestras.append(self.muestra(latencias, ahora - anterior))
+                yield self.muestras[-1]
+                latencias = []
+                anterior = time.perf_counter()
+
+    def crecimiento(self):
+        """
+        Retorna el crecimiento por cada mil rondas de la memoria de Python,
+        los objetos de Qt y la memoria residente entre la segunda muestra y
+        la última (la primera incluye el arranque).
+        """
+
+        if len(self.muestras) < 3:
+            return {}
+        primera, ultima = self.muestras[1], self.muestras[-1]
+        rondas = ultima["rondas"] - primera["rondas"]
+        return {clave: (ultima[clave] - primera[clave]) * 1000 / rondas for clave in ("python", "objetos_qt", "residente")}
+
+
+def formatear(muestra):
+    """ Retorna una línea legible con una muestra. """
+    return (f"{muestra['rondas']:>9,} rondas  {muestra['rondas_por_segundo']:>7,.0f} r/s"
+            f"  p50 {muestra['p50'] * 1000:6.2f} ms  p99 {muestra['p99'] * 1000:6.2f} ms"
+            f"  python {muestra['python'] / 2 ** 20:7.2f} MB  qt {muestra['objetos_qt']:>6}"
+            f"  hijos {muestra['hijos']:>5}  registro {muestra['registro']:>4}"
+            f"  residente {muestra['residente'] / 2 ** 20:7.1f} MB")
+
+
+def autojugar(ventana, rondas, politica="plantarse", muestreo=1000, animado=False, en_json=False):
+    """
+    Juega rondas en la ventana e imprime las muestras y el crecimiento de la memoria.
+
+    Parámetros:
+    - ventana (MainWindow): Ventana a jugar.
+    - rondas (int): Rondas a jugar.
+    - politica (str): Nombre de la política, por defecto "plantarse".
+    - muestreo (int): Rondas entre muestras, por defecto 1000.
+    - animado (bool): Ejecuta las animaciones terminándolas al instante.
+    - en_json (bool): Imprime cada muestra como una línea JSON.
+
+    Retorna:
+    - Automata: El jugador automático con sus muestras.
+    """
+
+    import json
+
+    automata = Automata(ventana, crear_politica(politica, ventana.bj.reglas), animado)
+    for muestra in automata.jugar(rondas, muestreo):
+        print(json.dumps(muestra) if en_json else formatear(muestra), flush=True)
+    crecimiento = automata.crecimiento()
+    if crecimiento and not en_json:
+        print(f"Crecimiento por 1000 rondas: python {crecimiento['python'] / 1024:+.1f} KB"
+              f"  qt {crecimiento['objetos_qt']:+.1f} objetos  residente {crecimiento['residente'] / 1024:+.1f} KB")
+    elif crecimiento:
+        print(json.dumps({"crecimiento": crecimiento}))
+    return automata
@@ -0,0 +1,227 @@
+"""
+Generadores aleatorios intercambiables para mezclar la baraja.
+
+Cada generador tiene una semilla explícita y un flujo (para procesos o
+mesas en paralelo) y se inyecta en ``motor.Mazo``. La k-ésima mezcla de un
+generador depende solo de su semilla, su flujo y k, no de las mezclas
+anteriores: una mano se reproduce exactamente con esos datos y la lista de
+acciones, sin guardar el orden de la baraja.
+
+Generadores disponibles en GENERADORES:
+- ``mt``: Mersenne Twister de ``random`` (sin dependencias), secuencial.
+- ``pcg64``: PCG64 de NumPy, con un tramo del flujo por mezcla.
+- ``philox``: Philox de NumPy, basado en contador.
+- ``splitmix``: SplitMix64 basado en contador, calculado con NumPy.
+
+Los generadores de NumPy solo importan NumPy al crearse.
+"""
+
+import hashlib
+import random
+
+# Separación entre las mezclas de un flujo de PCG64 (pasos del generador)
+_SALTO = 1 << 64
+# Mezclas calculadas de una vez por los generadores basados en contador
+TAMANO_BLOQUE = 256
+# Incremento de SplitMix64
+_GAMMA = 0x9E3779B97F4A7C15
+
+
+def derivar(semilla, *claves):
+    """
+    Deriva una semilla independiente de 64 bits.
+
+    Parámetros:
+    - semilla (int): Semilla base.
+    - claves: Enteros que identifican el flujo (proceso, mesa, mezcla...).
+
+    Retorna:
+    - int: Semilla de 64 bits.
+    """
+
+    texto = ":".join(str(valor) for valor in (semilla, *claves))
+    return int.from_bytes(hashlib.sha256(texto.encode()).digest()[:8], "little")
+
+
+class Mersenne(random.Random):
+    """
+    Mersenne Twister de la biblioteca estándar. Es secuencial: situarse en la
+    mezcla k repite las k mezclas anteriores sobre una baraja auxiliar.
+
+    Parámetros:
+    - semilla (int): Semilla del generador.
+    - flujo (int): Flujo independiente, por defecto 0.
+
+    Atributos:
+    - mezclas (int): Índice de la siguiente mezcla.
+    """
+
+    nombre = "mt"
+
+    def __init__(self, semilla=0, flujo=0):
+        self.semilla = semilla
+        self.flujo = flujo
+        self.mezclas = 0
+        self.pendiente = None  # Mezcla en la que situarse antes de mezclar
+        super().__init__(derivar(semilla, flujo))
+
+    def situar(self, mezcla):
+        """ Hace que la siguiente mezcla sea la indicada. """
+        self.pendiente = mezcla if mezcla != self.mezclas else None
+
+    def shuffle(self, cartas):
+        """ Mezcla las cartas en el sitio con la siguiente mezcla del flujo. """
+        if self.pendiente is not None:
+            self.seed(derivar(self.semilla, self.flujo))
+            auxiliar = list(range(len(cartas)))
+            for _ in range(self.pendiente):
+                super().shuffle(auxiliar)
+            self.mezclas, self.pendiente = self.pendiente, None
+        self.mezclas += 1
+        super().shuffle(cartas)
+
+
+class PCG64:
+    """
+    Generador PCG64 de NumPy. Cada mezcla avanza el estado a su propio tramo
+    del flujo, así que situarse en una mezcla cuesta lo mismo que cualquier
+    otra.
+
+    Parámetros:
+    - semilla (int): Semilla del generador.
+    - flujo (int): Flujo independiente, por defecto 0.
+
+    Atributos:
+    - mezclas (int): Índice de la siguiente mezcla.
+    """
+
+    nombre = "pcg64"
+
+    def __init__(self, semilla=0, flujo=0):
+        import numpy as np
+
+        self.semilla = semilla
+        self.flujo = flujo
+        self.mezclas = 0
+        self.np = np
+        # SeedSequence solo admite enteros no negativos: las semillas
+        # negativas se reducen a 64 bits como en los generadores por contador
+        entropia = semilla if semilla >= 0 else derivar(semilla)
+        self.bits = np.random.PCG64(np.random.SeedSequence(entropia, spawn_key=(flujo,)))
+        self.inicial = self.bits.state
+        self.generador = np.random.Generator(self.bits)
+
+    def situar(self, mezcla):
+        """ Hace que la siguiente mezcla sea la indicada. """
+        self.mezclas = mezcla
+
+    def shuffle(self, cartas):
+        """ Mezcla las cartas en el sitio con el tramo de la mezcla actual. """
+        self.bits.state = self.inicial
+        self.bits.advance(self.mezclas * _SALTO)
+        self.mezclas += 1
+        self.generador.shuffle(self.np.frombuffer(cartas, dtype=self.np.uint8))
+
+
+class _PorContador:
+    """
+    Base de los generadores basados en contador. Como la mezcla k es una
+    función pura de la clave y k, las permutaciones se calculan por bloques
+    de TAMANO_BLOQUE mezclas con una sola llamada a NumPy y situarse en
+    cualquier mezcla no tiene coste.
+
+    Parámetros:
+    - semilla (int): Semilla del generador.
+    - flujo (int): Flujo independiente, por defecto 0.
+
+    Atributos:
+    - mezclas (int): Índice de la siguiente mezcla.
+    """
+
+    def __init__(self, semilla=0, flujo=0):
+        import numpy as np
+
+        self.semilla = semilla
+        self.flujo = flujo
+        self.mezclas = 0
+        self.np = np
+        self.clave = derivar(semilla, flujo)
+        self.bloque = None  # (índice del bloque, número de cartas, permutaciones)
+
+    def situar(self, mezcla):
+        """ Hace que la siguiente mezcla sea la indicada. """
+        self.mezclas = mezcla
+
+    def valores(self, bloque, n):
+        """ Retorna una matriz (TAMANO_BLOQUE, n) de valores aleatorios del bloque. """
+        raise NotImplementedError
+
+    def shuffle(self, cartas):
+        """ Mezcla las cartas en el sitio con la permutación de la mezcla actual. """
+        np = self.np
+        vista = np.frombuffer(cartas, dtype=np.uint8)
+        bloque, fila = divmod(self.mezclas, TAMANO_BLOQUE)
+        if self.bloque is None or self.bloque[:2] != (bloque, len(vista)):
+            self.bloque = (bloque, len(vista), np.argsort(self.valores(bloque, len(vista)), axis=1, kind="stable"))
+        self.mezclas += 1
+        vista[:] = vista[self.bloque[2][fila]]
+
+
+class Philox(_PorContador):
+    """
+    Generador Philox de NumPy, basado en contador: el bloque b de mezclas
+    usa el contador b, de modo que los flujos y las mezclas son
+    independientes sin coordinación entre procesos.
+    """
+
+    nombre = "philox"
+
+    def valores(self, bloque, n):
+        """ Retorna una matriz (TAMANO_BLOQUE, n) de valores aleatorios del bloque. """
+        bits = self.np.random.Philox(key=self.clave, counter=[0, bloque, 0, 0])
+        return self.np.random.Generator(bits).random((TAMANO_BLOQUE, n))
+
+
+class SplitMix(_PorContador):
+    """
+    Generador SplitMix64 basado en contador: el valor i de la mezcla k es la
+    función de mezcla de SplitMix64 aplicada a la clave del flujo más el
+    contador (k, i).
+    """
+
+    nombre = "splitmix"
+
+    def valores(self, bloque, n):
+        """ Retorna una matriz (TAMANO_BLOQUE, n) de valores aleatorios del bloque. """
+        np = self.np
+        mezclas = np.arange(bloque * TAMANO_BLOQUE, (bloque + 1) * TAMANO_BLOQUE, dtype=np.uint64)
+        contador = (mezclas[:, None] << np.uint64(32)) + np.arange(n, dtype=np.uint64)
+        x = np.uint64(self.clave) + contador * np.uint64(_GAMMA)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+
+# Generadores por nombre
+GENERADORES = {clase.nombre: clase for clase in (Mersenne, PCG64, Philox, SplitMix)}
+
+
+def crear(nombre="mt", semilla=None, flujo=0):
+    """
+    Crea un generador por su nombre.
+
+    Parámetros:
+    - nombre (str): Nombre en GENERADORES, por defecto "mt".
+    - semilla (int): Semilla explícita. Por defecto, None (una semilla
+      aleatoria del sistema, que queda en el atributo ``semilla``).
+    - flujo (int): Flujo independiente, por defecto 0.
+
+    Retorna:
+    - Generador con los métodos shuffle() y situar().
+    """
+
+    if nombre not in GENERADORES:
+        raise ValueError(f"Generador desconocido: {nombre} (disponibles: {', '.join(GENERADORES)})")
+    if semilla is None:
+        semilla = random.SystemRandom().getrandbits(63)
+    return GENERADORES[nombre](semilla, flujo)
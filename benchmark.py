@@ -0,0 +1,287 @@
+"""
+Benchmarks de los caminos críticos del motor y de la interfaz.
+
+Mide operaciones por segundo y latencias p50/p99 de la puntuación, la
+baraja, el reparto y el ganador del motor, y el tiempo de construir la
+ventana, preparar la mesa y reiniciarla con la plataforma ``offscreen`` de
+Qt. Los resultados se guardan en JSON y pueden compararse con una línea base.
+
+Uso:
+    python benchmark.py --salida benchmark.json
+    python benchmark.py --comparar base.json --tolerancia 0.15
+    python benchmark.py --comparar base.json --salida actual.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from helpers import absPath
+
+# Versión del formato del fichero de resultados
+FORMATO = 1
+
+
+def percentil(valores, p):
+    """
+    Obtiene un percentil de una lista de valores.
+
+    Parámetros:
+    - valores (list): Valores ordenados.
+    - p (float): Percentil entre 0 y 100.
+
+    Retorna:
+    - float: El valor del percentil.
+    """
+
+    if not valores:
+        return 0.0
+    return valores[min(len(valores) - 1, int(len(valores) * p / 100))]
+
+
+def medir(funcion, n=1, muestras=200, antes=None):
+    """
+    Mide una operación repitiéndola en muestras de n llamadas.
+
+    Parámetros:
+    - funcion (callable): Operación a medir.
+    - n (int): Llamadas por muestra, por defecto 1.
+    - muestras (int): Número de muestras, por defecto 200.
+    - antes (callable): Preparación sin medir antes de cada muestra.
+
+    Retorna:
+    - dict: Operaciones por segundo y latencias p50/p99 en microsegundos.
+    """
+
+    latencias = []
+    total = 0.0
+    for _ in range(muestras):
+        if antes is not None:
+            antes()
+        inicio = time.perf_counter()
+        for _ in range(n):
+            funcion()
+        duracion = time.perf_counter() - inicio
+        total += duracion
+        latencias.append(duracion / n * 1e6)
+    latencias.sort()
+    return {
+        "ops_por_segundo": n * muestras / total if total else 0.0,
+        "p50_us": percentil(latencias, 50),
+        "p99_us": percentil(latencias, 99),
+        "muestras": muestras,
+    }
+
+
+def casos_motor():
+    """
+    Casos del motor sin interfaz.
+
+    Retorna:
+    - dict: Resultados por nombre de caso.
+    """
+
+    from itertools import cycle
+    from azar import crear
+    from conteo import Conteo
+    from motor import Blackjack, Jugador, Mazo
+
+    resultados = {}
+    # Puntuación incremental de una mano nueva de cuatro cartas (As, Diez,
+    # Diez, As: blanda, dura y pasada), el camino que sigue el juego
+    jugadores = []
+    cartas = cycle((0, 9, 22, 26))
+
+    def mano_nueva():
+        jugadores[:] = [Jugador("Jugador 1")]
+
+    resultados["Jugador.sumar"] = medir(lambda: jugadores[0].sumar(next(cartas)), n=4, muestras=2000, antes=mano_nueva)
+    # Recalcular la mano entera, solo como referencia (el juego no lo usa)
+    jugador = Jugador("Jugador 1")
+    for carta in (0, 9, 22):
+        jugador.sumar(carta)
+    resultados["Jugador.calcular"] = medir(jugador.calcular, n=1000)
+
+    mazo = Mazo()
+    resultados["Mazo.extraer"] = medir(mazo.extraer, n=40, antes=mazo.mezclar)
+    resultados["Mazo.reiniciar"] = medir(mazo.reiniciar, n=100)
+    contado = Mazo(conteo=Conteo())
+    resultados["Mazo.extraer (conteo)"] = medir(contado.extraer, n=40, antes=contado.mezclar)
+
+    bj = Blackjack()
+
+    def nueva_mano():
+        bj.reiniciar()
+
+    resultados["Blackjack.repartir"] = medir(lambda: bj.repartir(bj.humano), n=10, antes=nueva_mano)
+    bj.reiniciar()
+    bj.preparar()
+    resultados["Blackjack.ganador"] = medir(bj.ganador, n=1000)
+    # Instantáneas con un generador de azar (el de la ventana y la simulación)
+    mesa = Blackjack(Mazo(crear("mt", 1)))
+    mesa.preparar()
+    instantanea = mesa.capturar()
+    resultados["Mesa.capturar"] = medir(mesa.capturar, n=1000)
+    resultados["Mesa.restaurar"] = medir(lambda: mesa.restaurar(instantanea), n=1000)
+    return resultados
+
+
+def casos_interfaz(render="widgets"):
+    """
+    Casos de la interfaz con la plataforma offscreen de Qt.
+
+    Parámetros:
+    - render (str): Representación de la mesa ("widgets" o "escena"). Los
+      casos se llaman igual con las dos, para compararlas con --comparar.
+
+    Retorna:
+    - dict: Resultados por nombre de caso.
+    """
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6 import QtWidgets
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    import programa
+    if render == "escena":
+        from escena import BarajaEscena as Baraja
+    else:
+        from cartas import Baraja
+
+    resultados = {}
+    ventanas = []
+
+    def construir():
+        ventanas.append(programa.MainWindow(turbo=True, render=render))
+
+    resultados["MainWindow.__init__"] = medir(construir, muestras=20)
+    for ventana in ventanas:
+        ventana.deleteLater()
+    app.processEvents()
+
+    baraja = Baraja()
+
+    def recoger():
+        baraja.reiniciar()
+        baraja.mazo.reiniciar()
+        baraja.apilar()
+
+    resultados["Baraja.extraer"] = medir(baraja.extraer, n=10, antes=recoger)
+    resultados["Baraja.reiniciar"] = medir(recoger, n=10, antes=lambda: [baraja.extraer() for _ in range(10)])
+
+    ventana = programa.MainWindow(turbo=True, asientos=7, render=render)
+
+    def recoger_mesa():
+        ventana.cola.vaciar()
+        ventana.baraja.reiniciar()
+        ventana.bj.reiniciar()
+
+    resultados["MainWindow.preparar"] = medir(ventana.preparar, antes=recoger_mesa)
+    resultados["MainWindow.reiniciar"] = medir(ventana.reiniciar)
+
+    # Un fotograma con todas las cartas de la mesa animándose a la vez: las
+    # animaciones se pausan y se avanzan a mano como lo haría su temporizador
+    ventana.show()
+    app.processEvents()
+    grupos = []
+    for i, mano in enumerate(ventana.manos.values()):
+        for j, carta in enumerate(mano):
+            grupo = carta.mover(200 + j * 30, 150 + i * 40, 1000, 0.8)
+            grupo.pause()
+            grupos.append(grupo)
+    tiempo = [0]
+
+    def fotograma():
+        tiempo[0] = (tiempo[0] + 16) % 1000
+        for grupo in grupos:
+            grupo.setCurrentTime(tiempo[0])
+        app.processEvents()  # Actualizaciones pendientes de la escena
+        app.processEvents()  # Pintado
+
+    resultados["Fotograma"] = medir(fotograma, muestras=100)
+    ventana.close()
+    app.processEvents()
+    return resultados
+
+
+def comparar(actual, base, tolerancia):
+    """
+    Compara unos resultados con una línea base.
+
+    Parámetros:
+    - actual (dict): Resultados por caso.
+    - base (dict): Resultados de la línea base por caso.
+    - tolerancia (float): Empeoramiento relativo permitido (0.15 = 15%).
+
+    Retorna:
+    - list: Tuplas (caso, p50 base, p50 actual, cambio relativo) de los casos
+      más lentos que la tolerancia.
+    """
+
+    lentos = []
+    for caso, medida in actual.items():
+        if caso not in base or not base[caso]["p50_us"]:
+            continue
+        cambio = medida["p50_us"] / base[caso]["p50_us"] - 1
+        if cambio > tolerancia:
+            lentos.append((caso, base[caso]["p50_us"], medida["p50_us"], cambio))
+    return lentos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del Blackjack")
+    parser.add_argument("--salida", default=None, help="Fichero JSON de resultados (por defecto benchmark.json, o ninguno al comparar)")
+    parser.add_argument("--comparar", default=None, help="Fichero JSON con la línea base")
+    parser.add_argument("--tolerancia", type=float, default=0.15, help="Empeoramiento relativo permitido del p50")
+    parser.add_argument("--sin-interfaz", action="store_true", help="Mide solo el motor")
+    parser.add_argument("--render", choices=("widgets", "escena"), default="widgets", help="Representación de la mesa a medir")
+    parser.add_argument("--comprobar", action="store_true", help="Comprueba antes las tablas de puntuación del motor en todas las manos alcanzables")
+    args = parser.parse_args()
+    salida = args.salida
+    if salida is None and not args.comparar:
+        salida = absPath("benchmark.json")
+    if salida and args.comparar and os.path.abspath(salida) == os.path.abspath(args.comparar):
+        parser.error("--salida no puede ser el fichero de --comparar (se sobrescribiría la línea base)")
+
+    # La línea base se lee antes de medir
+    base = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)["resultados"]
+
+    if args.comprobar:
+        from motor import comprobar_tablas
+        comprobado = comprobar_tablas()
+        print(f"Tablas correctas: {comprobado['manos']:,} manos y {comprobado['pares']:,} pares de puntuaciones")
+
+    resultados = casos_motor()
+    if not args.sin_interfaz:
+        resultados.update(casos_interfaz(args.render))
+    informe = {
+        "formato": FORMATO,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "resultados": resultados,
+    }
+    if salida:
+        with open(salida, "w", encoding="utf-8") as f:
+            json.dump(informe, f, indent=2)
+
+    for caso, medida in resultados.items():
+        print(f"{caso:24} {medida['ops_por_segundo']:>14,.0f} ops/s  p50 {medida['p50_us']:>10.2f} us  p99 {medida['p99_us']:>10.2f} us")
+
+    if base is not None:
+        lentos = comparar(resultados, base, args.tolerancia)
+        for caso, antes, ahora, cambio in lentos:
+            print(f"MÁS LENTO: {caso}: p50 {antes:.2f} us -> {ahora:.2f} us ({cambio:+.0%})")
+        if lentos:
+            raise SystemExit(1)
+        print(f"Sin empeoramientos mayores del {args.tolerancia:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+Generador de carga para el servidor de mesas.
+
+Abre varias conexiones concurrentes con el servidor, crea varias mesas en
+cada una y juega rondas con la política de plantarse en un umbral. Mide la
+latencia de cada orden (desde que se envía hasta que llega la respuesta) y
+al terminar informa de las mesas servidas, las acciones por segundo y los
+percentiles de latencia.
+
+Uso:
+    python servidor.py &
+    python carga.py --conexiones 50 --mesas 4 --rondas 100
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from benchmark import percentil
+from servidor import PUERTO
+
+
+async def ordenar(reader, writer, orden, latencias):
+    """
+    Envía una orden y espera su respuesta.
+
+    Parámetros:
+    - reader (asyncio.StreamReader): Flujo de entrada de la conexión.
+    - writer (asyncio.StreamWriter): Flujo de salida de la conexión.
+    - orden (str): Orden del protocolo.
+    - latencias (list): Lista donde se añade la latencia en microsegundos.
+
+    Retorna:
+    - dict: Respuesta del servidor.
+    """
+
+    inicio = time.perf_counter()
+    writer.write(orden.encode() + b"\n")
+    await writer.drain()
+    linea = await reader.readline()
+    latencias.append((time.perf_counter() - inicio) * 1e6)
+    if not linea:
+        raise ConnectionError("El servidor ha cerrado la conexión")
+    respuesta = json.loads(linea)
+    if not respuesta["ok"]:
+        raise RuntimeError(f"{orden}: {respuesta['error']}")
+    return respuesta
+
+
+async def cliente(args, latencias, resultados):
+    """
+    Juega las rondas de las mesas de una conexión.
+
+    Parámetros:
+    - args (argparse.Namespace): Opciones de la línea de órdenes.
+    - latencias (list): Lista compartida de latencias.
+    - resultados (list): Conteo compartido de [empates, victorias, derrotas].
+
+    Retorna:
+    - int: Mesas creadas por la conexión.
+    """
+
+    if args.unix:
+        reader, writer = await asyncio.open_unix_connection(args.unix)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.puerto)
+    try:
+        mesas = [await ordenar(reader, writer, "NUEVA", latencias) for _ in range(args.mesas)]
+        for ronda in range(args.rondas):
+            for i, estado in enumerate(mesas):
+                mesa = estado["mesa"]
+                if ronda:
+                    estado = await ordenar(reader, writer, f"REINICIAR {mesa}", latencias)
+                # Pide carta mientras no alcance el umbral
+                while not estado["terminada"] and estado["jugador"]["puntos"] < args.plantarse:
+                    estado = await ordenar(reader, writer, f"PEDIR {mesa}", latencias)
+                if not estado["terminada"]:
+                    estado = await ordenar(reader, writer, f"PLANTAR {mesa}", latencias)
+                resultados[estado["ganador"]] += 1
+                mesas[i] = estado
+        for estado in mesas:
+            await ordenar(reader, writer, f"CERRAR {estado['mesa']}", latencias)
+        writer.write(b"SALIR\n")
+        await writer.drain()
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    return len(mesas)
+
+
+async def generar(args):
+    """
+    Lanza las conexiones concurrentes y agrega las medidas.
+
+    Parámetros:
+    - args (argparse.Namespace): Opciones de la línea de órdenes.
+
+    Retorna:
+    - dict: Mesas servidas, rondas, acciones, acciones por segundo y
+      latencias p50/p90/p99 en microsegundos.
+    """
+
+    latencias = []
+    resultados = [0, 0, 0]
+    inicio = time.perf_counter()
+    mesas = await asyncio.gather(*(cliente(args, latencias, resultados) for _ in range(args.conexiones)))
+    duracion = time.perf_counter() - inicio
+    latencias.sort()
+    return {
+        "conexiones": args.conexiones,
+        "mesas": sum(mesas),
+        "rondas": sum(resultados),
+        "acciones": len(latencias),
+        "acciones_por_segundo": len(latencias) / duracion if duracion else 0.0,
+        "p50_us": percentil(latencias, 50),
+        "p90_us": percentil(latencias, 90),
+        "p99_us": percentil(latencias, 99),
+        "empates": resultados[0],
+        "victorias": resultados[1],
+        "derrotas": resultados[2],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga del servidor de mesas")
+    parser.add_argument("--host", default="127.0.0.1", help="Dirección TCP del servidor")
+    parser.add_argument("--puerto", type=int, default=PUERTO, help="Puerto TCP del servidor")
+    parser.add_argument("--unix", default=None, help="Ruta del socket Unix del servidor")
+    parser.add_argument("--conexiones", type=int, default=50, help="Conexiones concurrentes")
+    parser.add_argument("--mesas", type=int, default=4, help="Mesas por conexión")
+    parser.add_argument("--rondas", type=int, default=100, help="Rondas por mesa")
+    parser.add_argument("--plantarse", type=int, default=17, help="Puntuación con la que se planta el jugador")
+    parser.add_argument("--json", action="store_true", help="Imprime el resultado en formato JSON")
+    args = parser.parse_args()
+
+    resultado = asyncio.run(generar(args))
+    if args.json:
+        print(json.dumps(resultado))
+        return
+    print(f"Mesas servidas: {resultado['mesas']} ({resultado['conexiones']} conexiones, {resultado['rondas']} rondas)")
+    print(f"Acciones: {resultado['acciones']} ({resultado['acciones_por_segundo']:,.0f} por segundo)")
+    print(f"Latencia: p50 {resultado['p50_us']:.0f} us  p90 {resultado['p90_us']:.0f} us  p99 {resultado['p99_us']:.0f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,58 +1,239 @@
+from collections import deque
+from functools import partial
 from PySide6 import QtCore, QtGui, QtWidgets
 from helpers import absPath
-import random
+from motor import Mazo, TOTAL_CARTAS, imagen, numero, nombre, palo
 
+# Escalas con las que se muestran las cartas (jugador y banca)
+ESCALAS = (1.0, 0.8)
+# Desplazamiento de cada carta de la pila respecto a la de debajo
+DESPLAZAMIENTO_PILA = 0.25
 
-class Carta(QtWidgets.QLabel):
+
+def capas_pila(cartas):
+    """ Retorna el número de posiciones distintas (en píxeles) de una pila de cartas. """
+    return int((cartas - 1) * DESPLAZAMIENTO_PILA) + 1 if cartas else 0
+
+
+class CachePixmaps:
+    """
+        Caché de imágenes compartida por todas las cartas.
+
+        Cada imagen se decodifica una sola vez y se guarda junto con sus
+        variantes reescaladas, de modo que voltear o reiniciar una carta solo
+        cambia el pixmap que muestra.
+
+        Atributos:
+        - aciertos (int): Consultas resueltas desde la caché.
+        - fallos (int): Consultas que han tenido que cargar o reescalar la imagen.
     """
-        Clase que representa una carta en el juego.
+
+    def __init__(self):
+        self.pixmaps = {}
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, imagenPath, escala=1.0):
+        """
+        Obtiene el pixmap de una imagen, cargándolo si es necesario.
 
         Parámetros:
+        - imagenPath (str): Nombre de la imagen (sin extensión).
+        - escala (float): Factor de escala de la variante, por defecto 1.
+
+        Retorna:
+        - QPixmap: El pixmap compartido.
+        """
+        
+        clave = (imagenPath, escala)
+        pixmap = self.pixmaps.get(clave)
+        if pixmap is not None:
+            self.aciertos += 1
+            return pixmap
+        self.fallos += 1
+        if escala == 1.0:
+            pixmap = QtGui.QPixmap(absPath(f"images/{imagenPath}.png"))
+        else:
+            # Reescalado suave de la imagen original
+            original = self.obtener(imagenPath)
+            pixmap = QtGui.QPixmap(original.size() * escala)
+            pixmap.fill(QtGui.QColor(0, 0, 0, 0))
+            pintor = QtGui.QPainter(pixmap)
+            pintor.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+            pintor.drawPixmap(pixmap.rect(), original)
+            pintor.end()
+        self.pixmaps[clave] = pixmap
+        return pixmap
+
+    def pila(self, cartas):
+        """
+        Obtiene la imagen de una pila de cartas boca abajo, dibujada una sola vez.
+
+        Las cartas se desplazan DESPLAZAMIENTO_PILA píxeles respecto a la de
+        debajo, así que varias cartas caen en el mismo píxel: la imagen se
+        dibuja con una carta por capa visible y se comparte entre las pilas
+        con las mismas capas.
+
+        Parámetros:
+        - cartas (int): Número de cartas de la pila.
+
+        Retorna:
+        - QPixmap: El pixmap compartido de la pila.
+        """
+        
+        capas = capas_pila(cartas)
+        clave = ("Pila", capas)
+        pixmap = self.pixmaps.get(clave)
+        if pixmap is not None:
+            self.aciertos += 1
+            return pixmap
+        self.fallos += 1
+        reverso = self.obtener("Reverso")
+        pixmap = QtGui.QPixmap(reverso.width() + capas - 1, reverso.height() + capas - 1)
+        pixmap.fill(QtGui.QColor(0, 0, 0, 0))
+        pintor = QtGui.QPainter(pixmap)
+        for offset in range(capas):
+            pintor.drawPixmap(offset, offset, reverso)
+        pintor.end()
+        self.pixmaps[clave] = pixmap
+        return pixmap
+
+    def precargar(self, escalas=ESCALAS):
+        """
+        Carga de antemano todas las caras y el reverso en las escalas indicadas.
+
+        Parámetros:
+        - escalas (tuple): Factores de escala a preparar.
+        """
+        
+        for codigo in (*range(TOTAL_CARTAS), None):
+            for escala in escalas:
+                self.obtener("Reverso" if codigo is None else imagen(codigo), escala)
+
+    def estadisticas(self):
+        """
+        Retorna un diccionario con los aciertos, fallos e imágenes en caché.
+        """
+        
+        return {"aciertos": self.aciertos, "fallos": self.fallos, "imagenes": len(self.pixmaps)}
+
+
+# Caché compartida por todo el proceso
+pixmaps = CachePixmaps()
+
+
+class BaseCarta:
+    """
+        Identidad y cara de una carta de la interfaz, común a ``Carta`` y a
+        ``escena.CartaEscena``.
+
+        Se combina con la clase de Qt que dibuja la carta, que implementa
+        ``pintar()`` (mostrar la cara actual) y los movimientos.
+
+        Atributos:
         - imagenPath (str): Nombre de la imagen de la carta.
         - numero (int): Número de la carta.
         - nombre (str): Nombre de la carta (As, Dos, Tres, ...).
         - palo (str): Palo de la carta (Treboles, Diamantes, Corazones, Picas).
-        - parent (QWidget): Widget padre, por defecto es None.
+        - visible (bool): True si la carta está boca arriba.
+        - escala (float): Escala final de la carta.
     """
+
+    def identificar(self, imagenPath, numero, nombre, palo):
+        """
+        Inicializa la identidad de la carta, boca abajo y a escala 1.
+
+        Parámetros:
+        - imagenPath (str): Nombre de la imagen de la carta.
+        - numero (int): Número de la carta.
+        - nombre (str): Nombre de la carta.
+        - palo (str): Palo de la carta.
+        """
         
-    def __init__(self, imagenPath, numero, nombre, palo, parent=None):
-        super().__init__(parent)
-        # Propiedades de la carta
         self.imagenPath = imagenPath
         self.numero = numero
         self.nombre = nombre
         self.palo = palo
         self.visible = False
+        self.escala = 1.0
+
+    def cara(self):
+        """ Retorna el nombre de la imagen que muestra la carta. """
+        return self.imagenPath if self.visible else "Reverso"
+
+    def asignar(self, codigo):
+        """
+        Asigna a la carta la identidad de una carta del motor.
+
+        Parámetros:
+        - codigo (int): Carta del motor.
+        """
         
-        # Configuración de la imagen
-        self.imagen = QtGui.QPixmap(absPath("images/Reverso.png"))
-        self.setPixmap(self.imagen)
-        # self.setAttribute(QtCore.Qt.WA_TranslucentBackground)  # Fix Alpha
-        self.setScaledContents(True) 
-        # Tamaño base de la carta
-        self.anchoBase = self.sizeHint().width()
-        self.altoBase = self.sizeHint().height()
-        
-        # Grupo de animaciones para movimiento y reescalado
-        self.animaciones = QtCore.QParallelAnimationGroup()
+        self.imagenPath = imagen(codigo)
+        self.numero = numero(codigo)
+        self.nombre = nombre(codigo)
+        self.palo = palo(codigo)
+        if self.visible:
+            self.pintar()
 
     def mostrar(self):
         """
         Muestra la imagen de la carta.
         """
 
-        self.imagen = QtGui.QPixmap(absPath(f"images/{self.imagenPath}.png"))
-        self.setPixmap(self.imagen)
         self.visible = True
+        self.pintar()
 
     def esconder(self):
         """
         Esconde la carta mostrando la imagen reversa.
         """
         
-        self.imagen = QtGui.QPixmap(absPath("images/Reverso.png"))
-        self.setPixmap(self.imagen)
         self.visible = False
+        self.pintar()
+
+    def pintar(self):
+        """ Dibuja la cara actual de la carta. """
+        raise NotImplementedError
+
+
+class Carta(BaseCarta, QtWidgets.QLabel):
+    """
+        Clase que representa una carta en el juego.
+
+        Parámetros:
+        - imagenPath (str): Nombre de la imagen de la carta.
+        - numero (int): Número de la carta.
+        - nombre (str): Nombre de la carta (As, Dos, Tres, ...).
+        - palo (str): Palo de la carta (Treboles, Diamantes, Corazones, Picas).
+        - parent (QWidget): Widget padre, por defecto es None.
+    """
+        
+    def __init__(self, imagenPath, numero, nombre, palo, parent=None):
+        super().__init__(parent)
+        # Propiedades de la carta
+        self.identificar(imagenPath, numero, nombre, palo)
+        
+        # Configuración de la imagen
+        self.pintar()
+        # self.setAttribute(QtCore.Qt.WA_TranslucentBackground)  # Fix Alpha
+        self.setScaledContents(True) 
+        # Tamaño base de la carta
+        self.anchoBase = self.sizeHint().width()
+        self.altoBase = self.sizeHint().height()
+        
+        # Grupo de animaciones para movimiento y reescalado; se crea una vez
+        # y cada movimiento solo cambia sus valores, sin crear objetos de Qt
+        self.animaciones = QtCore.QParallelAnimationGroup(self)
+        self.animacionPos = QtCore.QPropertyAnimation(self, b"pos")
+        self.animacionTamano = QtCore.QPropertyAnimation(self, b"size")
+        self.animaciones.addAnimation(self.animacionPos)
+        self.animaciones.addAnimation(self.animacionTamano)
+
+    def pintar(self):
+        """ Muestra la variante de la cara actual para la escala de la carta. """
+        self.imagen = pixmaps.obtener(self.cara(), self.escala)
+        self.setPixmap(self.imagen)
 
     def posicionar(self, x, y, sobreponer=True):
         """
@@ -78,92 +259,332 @@ class Carta(QtWidgets.QLabel):
         - duracion (int): Duración de la animación en milisegundos, por defecto es 1000.
         - escalado (float): Factor de escala para la animación de reescalado, por defecto es 1.
         - sobreponer (bool): True para sobreponer la carta, False en caso contrario.
+
+        Retorna:
+        - QParallelAnimationGroup: El grupo de animaciones iniciado.
         """
         
         if sobreponer:
             self.raise_()  # sobreponer la carta
-        self.animaciones = QtCore.QParallelAnimationGroup()
+        self.animaciones.stop()
         self.raise_()  # sobreponer la carta
-        # Animación de movimiento
-        pos = QtCore.QPropertyAnimation(self, b"pos")
-        pos.setEndValue(QtCore.QPoint(x, y))
-        pos.setDuration(duracion)
+        self.reescalar(escalado)
+        # Animación de movimiento (empieza en la posición actual)
+        self.animacionPos.setEndValue(QtCore.QPoint(x, y))
+        self.animacionPos.setDuration(duracion)
         # Animación de reescalado
-        self.animaciones.addAnimation(pos)
-        size = QtCore.QPropertyAnimation(self, b"size")
-        size.setStartValue(QtCore.QSize(self.anchoBase, self.altoBase))
-        size.setEndValue(QtCore.QSize(self.anchoBase * escalado, self.altoBase * escalado))
-        size.setDuration(duracion)
-        self.animaciones.addAnimation(size)
+        self.animacionTamano.setStartValue(QtCore.QSize(self.anchoBase, self.altoBase))
+        self.animacionTamano.setEndValue(QtCore.QSize(self.anchoBase * escalado, self.altoBase * escalado))
+        self.animacionTamano.setDuration(duracion)
         # Iniciar las animaciones
         self.animaciones.start()
+        return self.animaciones
+
+    def colocar(self, x, y, escalado=1, sobreponer=True):
+        """
+        Coloca la carta en su posición y tamaño finales sin animación.
+
+        Parámetros:
+        - x (int): Coordenada x final.
+        - y (int): Coordenada y final.
+        - escalado (float): Factor de escala final, por defecto es 1.
+        - sobreponer (bool): True para sobreponer la carta, False en caso contrario.
+        """
+        
+        self.animaciones.stop()
+        self.reescalar(escalado)
+        self.resize(int(self.anchoBase * escalado), int(self.altoBase * escalado))
+        self.posicionar(x, y, sobreponer)
 
     def reestablecer(self):
         """
         Detiene las animaciones actuales y restaura los tamaños originales.
         """
         
-        # Detener las animaciones actuales
+        # Detener las animaciones actuales (el grupo se reutiliza)
         self.animaciones.stop()
-        # Reiniciar el grupo de animaciones
-        self.animaciones = QtCore.QParallelAnimationGroup()
         # Restaurar los tamaños originales
         self.resize(self.anchoBase, self.altoBase)
+        self.reescalar(1.0)
+
+    def reescalar(self, escala):
+        """
+        Cambia a la variante de la imagen precalculada para la escala indicada.
 
+        Parámetros:
+        - escala (float): Factor de escala de la carta.
+        """
+        
+        if escala != self.escala:
+            self.escala = escala
+            self.pintar()
 
 
-class Baraja(QtWidgets.QWidget):
+
+class ColaAnimaciones(QtCore.QObject):
     """
-        Clase que representa la baraja de cartas en el juego.
+        Cola de pasos de animación que se ejecutan uno detrás de otro.
+
+        El estado del juego lo avanza el motor de inmediato; la cola solo se
+        encarga de que la interfaz lo alcance paso a paso. En modo turbo los
+        movimientos se aplican al instante, sin animación.
 
         Parámetros:
-        - parent (QWidget): Widget padre, por defecto es None.
+        - parent (QObject): Objeto padre, por defecto es None.
+        - turbo (bool): True para omitir las animaciones, por defecto False.
+
+        Señales:
+        - terminada: Se emite cuando la cola se vacía.
     """
-    
-    def __init__(self, parent=None):
+
+    terminada = QtCore.Signal()
+
+    def __init__(self, parent=None, turbo=False):
         super().__init__(parent)
-        # Nombres y palos de las cartas
-        nombres = ["As", "Dos", "Tres", "Cuatro", "Cinco", "Seis", "Siete", "Ocho", "Nueve", "Diez", "Jota", "Reina", "Rey"]
-        palos = ["Treboles", "Diamantes", "Corazones", "Picas"]
-        # Listas de cartas en la pila y cartas fuera de la pila
-        self.cartas = []  # Lista de cartas en la pila
-        self.jugadas = []  # Lista de cartas fuera de la pila
-        # Crear cartas y añadirlas a la lista
-        for palo in palos:
-            for i, nombre in enumerate(nombres):
-                carta = Carta(f"{i+1}{palo[0]}", i+1, nombre, palo, self)
-                self.cartas.append(carta)  # Añadir a la lista
-        self.mezclar()  # Mezclar las cartas
+        self.turbo = turbo
+        self.pasos = deque()  # Pasos pendientes
+        self.actual = None  # Animación en curso
+        self.ejecutando = False  # Evita ejecutar la cola de forma reentrante
+
+    def mover(self, carta, x, y, duracion=500, escalado=1):
+        """
+        Añade a la cola el movimiento de una carta.
+
+        Parámetros:
+        - carta (Carta): Carta a mover.
+        - x (int): Coordenada x final.
+        - y (int): Coordenada y final.
+        - duracion (int): Duración de la animación en milisegundos, por defecto 500.
+        - escalado (float): Factor de escala final, por defecto es 1.
+        """
+        
+        self.pasos.append((carta, x, y, duracion, escalado))
+        self.continuar()
+
+    def llamar(self, funcion, *args):
+        """
+        Añade a la cola una llamada que se ejecuta al llegar su turno.
+
+        Parámetros:
+        - funcion (callable): Función a llamar.
+        - args: Argumentos de la llamada.
+        """
+        
+        self.pasos.append((partial(funcion, *args),))
+        self.continuar()
+
+    def ocupada(self):
+        """ Indica si quedan pasos pendientes o en curso. """
+        return self.actual is not None or bool(self.pasos)
+
+    def vaciar(self):
+        """
+        Descarta los pasos pendientes y detiene la animación en curso.
+        """
+        
+        self.pasos.clear()
+        if self.actual is not None:
+            self.actual.finished.disconnect(self.siguiente)
+            self.actual.stop()
+            self.actual = None
+
+    def siguiente(self):
+        """ Pasa al siguiente paso al terminar la animación en curso. """
+        self.actual.finished.disconnect(self.siguiente)  # Los grupos de las cartas se reutilizan
+        self.actual = None
+        self.continuar()
+
+    def continuar(self):
+        """
+        Ejecuta los pasos pendientes hasta llegar a una animación o vaciar la cola.
+        """
+        
+        if self.ejecutando or self.actual is not None:
+            return
+        self.ejecutando = True
+        while self.pasos and self.actual is None:
+            paso = self.pasos.popleft()
+            if len(paso) == 1:
+                paso[0]()
+                continue
+            carta, x, y, duracion, escalado = paso
+            if self.turbo:
+                carta.colocar(x, y, escalado)
+            else:
+                self.actual = carta.mover(x, y, duracion, escalado)
+                self.actual.finished.connect(self.siguiente)
+        self.ejecutando = False
+        if self.actual is None:
+            self.terminada.emit()
+
+
+class BaseBaraja:
+    """
+        Reparto de las cartas de la interfaz, común a ``Baraja`` y a
+        ``escena.BarajaEscena``.
+
+        El orden y el reparto los lleva el Mazo del motor. La pila se dibuja
+        como una sola imagen de cartas boca abajo y las cartas se crean al
+        repartirlas y se reutilizan después: cada carta repartida toma la
+        identidad de la carta del motor, de modo que un zapato de varias
+        barajas no necesita una carta de Qt por carta física.
+
+        Se combina con la clase de Qt que dibuja la mesa, que implementa
+        ``situarPila(x, y)`` y ``pintarPila(pixmap)``.
+
+        Atributos:
+        - mazo (Mazo): Baraja del motor representada.
+        - pila: Elemento de Qt con la imagen de la pila.
+        - fabrica (callable): Crea una carta nueva boca abajo.
+        - origen (tuple): Posición de la carta de abajo de la pila.
+        - apiladas (int): Cartas dibujadas en la pila.
+        - enJuego (list): Cartas repartidas en la mano actual.
+        - libres (list): Cartas disponibles para reutilizar.
+    """
+
+    def iniciarPila(self, mazo, pila, fabrica):
+        """
+        Inicializa la pila y dibuja las cartas que quedan en el mazo.
+
+        Parámetros:
+        - mazo (Mazo): Baraja del motor a representar, o None para una nueva.
+        - pila: Elemento de Qt que muestra la imagen de la pila.
+        - fabrica (callable): Crea una carta nueva boca abajo, sin argumentos.
+        """
+        
+        self.mazo = mazo if mazo is not None else Mazo()
+        self.pila = pila
+        self.fabrica = fabrica
+        self.origen = (45, 205)
+        self.apiladas = 0
+        self.situarPila(*self.origen)
+        self.pila.hide()
+        self.enJuego = []
+        self.libres = []
+        self.apilar()
+
+    @property
+    def jugadas(self):
+        """ Lista de cartas fuera de la pila. """
+        return self.enJuego
+
+    def tomar(self):
+        """
+        Obtiene una carta libre o crea una nueva si no hay ninguna.
+
+        Retorna:
+        - BaseCarta: Una carta boca abajo, todavía sin mostrar.
+        """
+        
+        if self.libres:
+            return self.libres.pop()
+        return self.fabrica()
+
+    def apilar(self, x=None, y=None):
+        """
+        Dibuja la pila con las cartas que quedan en el mazo (como mucho, una
+        baraja) y esconde las cartas libres.
+
+        Parámetros:
+        - x (int): Coordenada x de la pila, por defecto la anterior.
+        - y (int): Coordenada y de la pila, por defecto la anterior.
+        """
+        
+        if x is not None and y is not None:
+            self.origen = (x, y)
+            self.situarPila(x, y)
+        self.dibujar()
+        for carta in self.libres:
+            carta.hide()
+
+    def dibujar(self):
+        """
+        Actualiza la imagen de la pila con las cartas que quedan en el mazo.
+        """
+        
+        apiladas = min(self.mazo.restantes(), TOTAL_CARTAS)
+        if capas_pila(apiladas) != capas_pila(self.apiladas):
+            if apiladas:
+                self.pintarPila(pixmaps.pila(apiladas))
+            self.pila.setVisible(apiladas > 0)
+        self.apiladas = apiladas
+
+    def cima(self):
+        """ Retorna la posición (x, y) de la carta de arriba de la pila. """
+        offset = max(capas_pila(self.apiladas) - 1, 0)
+        return self.origen[0] + offset, self.origen[1] + offset
+
+    def sacar(self, codigo):
+        """
+        Saca la carta de arriba de la pila y le asigna una carta del motor.
+
+        Parámetros:
+        - codigo (int): Carta del motor.
+
+        Retorna:
+        - BaseCarta: La carta que la representa.
+        """
+        
+        carta = self.tomar()
+        carta.asignar(codigo)
+        carta.posicionar(*self.cima())  # Sale de la cima antes de reducir la pila
+        carta.show()
+        self.dibujar()
+        self.enJuego.append(carta)
+        return carta
 
     def mezclar(self):
         """
         Mezcla las cartas en la pila.
         """
         
-        random.shuffle(self.cartas)
+        self.mazo.mezclar()
 
     def extraer(self):
         """
         Extrae una carta de la pila.
 
         Retorna:
-        - Carta or None: La carta extraída o None si la pila está vacía.
+        - BaseCarta or None: La carta extraída o None si la pila está vacía.
         """
         
-        if len(self.cartas) > 0:
-            carta = self.cartas.pop() # Sacar la última carta (la de arriba)
-            self.jugadas.append(carta) # Añadir a la lista de cartas jugadas
-            return carta
+        codigo = self.mazo.extraer()
+        if codigo is not None:
+            return self.sacar(codigo)
         return None
 
     def reiniciar(self):
         """
-        Reinicia el juego: esconde, restablece y mezcla las cartas.
+        Esconde, restablece y libera las cartas jugadas. La mezcla la realiza
+        el motor al reiniciar el juego.
         """
         
-        for carta in self.jugadas:
+        for carta in self.enJuego:
             carta.esconder()  # Esconder las cartas jugadas
             carta.reestablecer()  # Restablecer tamaños y animaciones
-            self.cartas.append(carta)  # Recuperar las cartas jugadas
-        self.jugadas = []  # Borrar todas las cartas jugadas
-        self.mezclar()  # Mezclar la baraja
+            self.libres.append(carta)  # Recuperar las cartas jugadas
+        self.enJuego = []  # Borrar todas las cartas jugadas
+
+
+class Baraja(BaseBaraja, QtWidgets.QWidget):
+    """
+        Clase que representa la baraja de cartas en el juego, con widgets.
+
+        Parámetros:
+        - parent (QWidget): Widget padre, por defecto es None.
+        - mazo (Mazo): Baraja del motor a representar, por defecto una nueva.
+    """
+    
+    def __init__(self, parent=None, mazo=None):
+        super().__init__(parent)
+        # Imagen de la pila boca abajo; las cartas son widgets hijos
+        self.iniciarPila(mazo, QtWidgets.QLabel(self), partial(Carta, imagen(0), numero(0), nombre(0), palo(0), self))
+
+    def situarPila(self, x, y):
+        """ Mueve la imagen de la pila a la posición indicada. """
+        self.pila.move(x, y)
+
+    def pintarPila(self, pixmap):
+        """ Cambia la imagen de la pila y ajusta su tamaño. """
+        self.pila.setPixmap(pixmap)
+        self.pila.adjustSize()
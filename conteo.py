@@ -0,0 +1,105 @@
+"""
+Conteo de cartas y composición del zapato con actualizaciones en O(1).
+
+``Conteo`` se engancha a un ``motor.Mazo``: cada carta que sale por
+``extraer`` descuenta su rango de la composición restante y cada carta que
+queda boca arriba (al repartirla o al voltear la carta oculta de la banca
+con ``Mesa.revelar``) suma su valor Hi-Lo a la cuenta corriente. Mezclar el
+zapato lo reinicia. Así la cuenta no se recalcula recorriendo las cartas
+jugadas después de cada carta.
+"""
+
+from motor import CARTAS_POR_PALO, PALOS, TOTAL_CARTAS, VALORES
+
+# Valor Hi-Lo de cada carta: 2-6 suman 1, 7-9 nada, dieces y ases restan 1
+HILO = tuple(1 if 2 <= VALORES[c] <= 6 else (-1 if VALORES[c] in (1, 10) else 0) for c in range(TOTAL_CARTAS))
+
+
+class Conteo:
+    """
+    Composición restante del zapato y cuenta Hi-Lo.
+
+    Parámetros:
+    - mazos (int): Número de barajas del zapato, por defecto 1.
+
+    Atributos:
+    - restantes (list): Cartas que quedan en el zapato por rango (0 = As, 12 = Rey).
+    - repartidas (int): Cartas extraídas desde la última mezcla.
+    - corriente (int): Cuenta Hi-Lo de las cartas vistas desde la última mezcla.
+    - vistas (int): Cartas vistas desde la última mezcla.
+    """
+
+    __slots__ = ("mazos", "total", "restantes", "repartidas", "corriente", "vistas")
+
+    def __init__(self, mazos=1):
+        self.mazos = mazos
+        self.total = TOTAL_CARTAS * mazos
+        self.reiniciar()
+
+    def reiniciar(self):
+        """ Vuelve al zapato completo y a la cuenta cero (al mezclar). """
+        self.restantes = [len(PALOS) * self.mazos] * CARTAS_POR_PALO
+        self.repartidas = 0
+        self.corriente = 0
+        self.vistas = 0
+
+    def extraida(self, carta):
+        """
+        Descuenta una carta que sale del zapato.
+
+        Parámetros:
+        - carta (int): Carta del motor.
+        """
+
+        self.restantes[carta % CARTAS_POR_PALO] -= 1
+        self.repartidas += 1
+
+    def vista(self, carta):
+        """
+        Suma a la cuenta una carta que queda boca arriba.
+
+        Parámetros:
+        - carta (int): Carta del motor.
+        """
+
+        self.corriente += HILO[carta]
+        self.vistas += 1
+
+    def cartasRestantes(self):
+        """ Retorna el número de cartas que quedan en el zapato. """
+        return self.total - self.repartidas
+
+    def penetracion(self):
+        """ Retorna la fracción del zapato repartida desde la última mezcla. """
+        return self.repartidas / self.total
+
+    def verdadera(self):
+        """
+        Retorna la cuenta verdadera: la cuenta corriente por baraja que queda
+        en el zapato (como mínimo, media baraja).
+        """
+
+        return self.corriente * TOTAL_CARTAS / max(self.cartasRestantes(), TOTAL_CARTAS // 2)
+
+    def composicion(self):
+        """
+        Retorna la composición restante por valor, como ``probabilidades.composicion``.
+
+        Retorna:
+        - tuple: Diez conteos, del As (índice 0) a las cartas de valor 10 (índice 9).
+        """
+
+        return tuple(self.restantes[:9]) + (sum(self.restantes[9:]),)
+
+    def resumen(self):
+        """
+        Retorna un diccionario con la cuenta corriente y verdadera, la
+        penetración y las cartas restantes.
+        """
+
+        return {
+            "corriente": self.corriente,
+            "verdadera": self.verdadera(),
+            "penetracion": self.penetracion(),
+            "restantes": self.cartasRestantes(),
+        }
@@ -0,0 +1,196 @@
+"""
+Representación de la mesa con QGraphicsScene.
+
+Alternativa a los widgets de ``cartas``: la mesa es una escena con un fondo
+estático en caché y cada carta es un elemento que dibuja el pixmap
+compartido a escala 1. Mover y reescalar una carta cambia su transformación
+(posición y escala) en lugar de redimensionar un widget, así que no se
+reescala ningún pixmap ni se recoloca ningún widget en cada fotograma y
+muchas cartas pueden animarse a la vez.
+
+``BarajaEscena`` y ``CartaEscena`` comparten con ``Baraja`` y ``Carta`` el
+reparto y la identidad de las cartas (``cartas.BaseBaraja`` y
+``cartas.BaseCarta``) y solo cambian cómo se dibujan y se mueven, de modo que
+``MainWindow`` y ``ColaAnimaciones`` las usan igual
+(``python programa.py --render escena``).
+"""
+
+from itertools import count
+from PySide6 import QtCore, QtGui, QtWidgets
+from cartas import BaseBaraja, BaseCarta, pixmaps
+from motor import imagen, numero, nombre, palo
+
+# Tamaño de la escena (el de la ventana)
+ANCHO, ALTO = 900, 630
+# Orden de apilado: cada carta sobrepuesta queda por encima de las anteriores
+_capas = count(1)
+
+
+class CartaEscena(BaseCarta, QtWidgets.QGraphicsObject):
+    """
+        Carta de la mesa como elemento de la escena.
+
+        Parámetros:
+        - imagenPath (str): Nombre de la imagen de la carta.
+        - numero (int): Número de la carta.
+        - nombre (str): Nombre de la carta (As, Dos, Tres, ...).
+        - palo (str): Palo de la carta (Treboles, Diamantes, Corazones, Picas).
+        - escena (QGraphicsScene): Escena a la que se añade, por defecto None.
+    """
+
+    def __init__(self, imagenPath, numero, nombre, palo, escena=None):
+        super().__init__()
+        # Propiedades de la carta
+        self.identificar(imagenPath, numero, nombre, palo)
+        # Imagen a escala 1; la escala la aplica la transformación
+        self.imagen = pixmaps.obtener("Reverso")
+        self.rectangulo = QtCore.QRectF(self.imagen.rect())
+        self.anchoBase = self.imagen.width()
+        self.altoBase = self.imagen.height()
+        # Grupo de animaciones para movimiento y reescalado, reutilizado en cada movimiento
+        self.animaciones = QtCore.QParallelAnimationGroup(self)
+        self.animacionPos = QtCore.QPropertyAnimation(self, b"pos")
+        self.animacionEscala = QtCore.QPropertyAnimation(self, b"scale")
+        self.animaciones.addAnimation(self.animacionPos)
+        self.animaciones.addAnimation(self.animacionEscala)
+        if escena is not None:
+            escena.addItem(self)
+
+    def boundingRect(self):
+        return self.rectangulo
+
+    def paint(self, pintor, opcion, widget=None):
+        escala = self.scale()
+        if escala != 1.0 and escala == self.escala:
+            # En reposo se dibuja la variante reescalada de la caché sin
+            # transformar cada píxel; durante la animación, la imagen a escala 1
+            pintor.scale(1 / escala, 1 / escala)
+            pintor.drawPixmap(0, 0, pixmaps.obtener(self.cara(), escala))
+        else:
+            pintor.drawPixmap(0, 0, self.imagen)
+
+    def pintar(self):
+        """ Cambia a la imagen a escala 1 de la cara actual y redibuja la carta. """
+        self.imagen = pixmaps.obtener(self.cara())
+        self.update()
+
+    def raise_(self):
+        """ Sobrepone la carta a las demás. """
+        self.setZValue(next(_capas))
+
+    def posicionar(self, x, y, sobreponer=True):
+        """
+        Posiciona la carta en la posición especificada.
+
+        Parámetros:
+        - x (int): Coordenada x.
+        - y (int): Coordenada y.
+        - sobreponer (bool): True para sobreponer la carta, False en caso contrario.
+        """
+
+        if sobreponer:
+            self.raise_()
+        self.setPos(x, y)
+
+    def mover(self, x, y, duracion=1000, escalado=1, sobreponer=True):
+        """
+        Mueve la carta animando su posición y su escala.
+
+        Parámetros:
+        - x (int): Coordenada x final.
+        - y (int): Coordenada y final.
+        - duracion (int): Duración de la animación en milisegundos, por defecto es 1000.
+        - escalado (float): Factor de escala final, por defecto es 1.
+        - sobreponer (bool): True para sobreponer la carta, False en caso contrario.
+
+        Retorna:
+        - QParallelAnimationGroup: El grupo de animaciones iniciado.
+        """
+
+        if sobreponer:
+            self.raise_()
+        self.escala = escalado
+        self.animaciones.stop()
+        # Animación de movimiento (empieza en la posición actual)
+        self.animacionPos.setEndValue(QtCore.QPointF(x, y))
+        self.animacionPos.setDuration(duracion)
+        # Animación de reescalado (transformación, sin reescalar la imagen)
+        self.animacionEscala.setEndValue(float(escalado))
+        self.animacionEscala.setDuration(duracion)
+        # Iniciar las animaciones
+        self.animaciones.start()
+        return self.animaciones
+
+    def colocar(self, x, y, escalado=1, sobreponer=True):
+        """
+        Coloca la carta en su posición y escala finales sin animación.
+
+        Parámetros:
+        - x (int): Coordenada x final.
+        - y (int): Coordenada y final.
+        - escalado (float): Factor de escala final, por defecto es 1.
+        - sobreponer (bool): True para sobreponer la carta, False en caso contrario.
+        """
+
+        self.animaciones.stop()
+        self.escala = escalado
+        self.setScale(escalado)
+        self.posicionar(x, y, sobreponer)
+
+    def reestablecer(self):
+        """
+        Detiene las animaciones actuales y restaura la escala original.
+        """
+
+        self.animaciones.stop()
+        self.escala = 1.0
+        self.setScale(1.0)
+
+
+class BarajaEscena(BaseBaraja, QtWidgets.QGraphicsView):
+    """
+        Baraja y mesa dibujadas en una QGraphicsScene.
+
+        El fondo se dibuja una vez y queda en la caché de la vista; la pila es
+        un elemento con la imagen compartida de ``CachePixmaps.pila`` y las
+        cartas son elementos de la escena, que se reutilizan como en ``Baraja``.
+
+        Parámetros:
+        - parent (QWidget): Widget padre, por defecto es None.
+        - mazo (Mazo): Baraja del motor a representar, por defecto una nueva.
+    """
+
+    def __init__(self, parent=None, mazo=None):
+        super().__init__(parent)
+        self.escena = QtWidgets.QGraphicsScene(0, 0, ANCHO, ALTO, self)
+        self.escena.setItemIndexMethod(QtWidgets.QGraphicsScene.NoIndex)  # Elementos en movimiento
+        self.setScene(self.escena)
+        # Vista fija del tamaño de la ventana, sin marco ni barras
+        self.setFrameShape(QtWidgets.QFrame.NoFrame)
+        self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+        self.setAlignment(QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop)
+        self.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+        self.setOptimizationFlag(QtWidgets.QGraphicsView.DontSavePainterState)
+        # Fondo estático
+        self.fondo = pixmaps.obtener("Tablero")
+        self.setCacheMode(QtWidgets.QGraphicsView.CacheBackground)
+        # Pila boca abajo
+        self.iniciarPila(mazo, self.escena.addPixmap(QtGui.QPixmap()), self.crearCarta)
+
+    def drawBackground(self, pintor, rectangulo):
+        pintor.drawPixmap(0, 0, self.fondo)
+
+    def situarPila(self, x, y):
+        """ Mueve el elemento de la pila a la posición indicada. """
+        self.pila.setPos(x, y)
+
+    def pintarPila(self, pixmap):
+        """ Cambia la imagen del elemento de la pila. """
+        self.pila.setPixmap(pixmap)
+
+    def crearCarta(self):
+        """ Crea una carta nueva en la escena, escondida hasta sacarla. """
+        carta = CartaEscena(imagen(0), numero(0), nombre(0), palo(0), self.escena)
+        carta.hide()
+        return carta
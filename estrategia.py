@@ -0,0 +1,220 @@
+"""
+Tabla de valor esperado de pedir o plantarse.
+
+Para cada estado (puntuación del jugador, mano blanda, carta visible de la
+banca) calcula el valor esperado de pedir carta y de plantarse con las reglas
+de ``Blackjack`` (incluida la regla de la banca de plantarse si supera al
+jugador), usando la distribución exacta de ``probabilidades``. La composición
+es la de un zapato completo sin la carta visible de la banca.
+
+La tabla se guarda en un fichero binario versionado que se mapea en memoria
+al cargarlo, de modo que un consejo es una sola consulta por índice. La
+cabecera guarda un hash de las reglas y la tabla se regenera sola si cambian.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+
+from helpers import absPath, existsFile
+from motor import Reglas
+from probabilidades import BLACKJACK, PASADA, composicion, distribucion_banca, quitar
+
+# Versión del formato del fichero y de la tabla
+FORMATO = 1
+_MAGIA = b"BJEV"
+_CABECERA = struct.Struct("<4sH32sI")
+# Dimensiones: puntos (0-21), blanda (0-1), carta visible (1-10), acción
+_PUNTOS, _BLANDA, _VISIBLES, _ACCIONES = 22, 2, 10, 2
+TAMANO = _PUNTOS * _BLANDA * _VISIBLES * _ACCIONES
+# Índices de las acciones
+PEDIR = 0
+PLANTARSE = 1
+
+
+def huella(reglas):
+    """
+    Calcula el hash de las reglas con el que se valida el fichero.
+
+    Parámetros:
+    - reglas (Reglas): Reglas de la mesa.
+
+    Retorna:
+    - bytes: Resumen SHA-256 de las reglas y la versión del formato.
+    """
+
+    return hashlib.sha256(repr((FORMATO, reglas.clave())).encode()).digest()
+
+
+def indice(puntos, blanda, visible, accion):
+    """ Retorna la posición de un valor en la tabla plana. """
+    return ((puntos * _BLANDA + blanda) * _VISIBLES + visible - 1) * _ACCIONES + accion
+
+
+def _valor_plantarse(distribucion, puntos):
+    # Valor esperado de plantarse con una puntuación frente a la banca
+    valor = 0.0
+    for resultado, p in distribucion.items():
+        banca = 21 if resultado == BLACKJACK else resultado
+        if resultado == PASADA or banca < puntos:
+            valor += p
+        elif banca > puntos:
+            valor -= p
+    return valor
+
+
+def generar(reglas=None):
+    """
+    Calcula la tabla de valor esperado para unas reglas.
+
+    Parámetros:
+    - reglas (Reglas): Reglas de la mesa, por defecto las estándar.
+
+    Retorna:
+    - array: Tabla plana de floats indexada con indice().
+    """
+
+    reglas = reglas if reglas is not None else Reglas()
+    tabla = array("f", bytes(4 * TAMANO))
+    zapato = composicion(mazos=reglas.mazos)
+    for visible in range(1, 11):
+        conteo = quitar(zapato, visible)
+        total = sum(conteo)
+        probabilidades = [n / total for n in conteo]
+        plantarse = [
+            _valor_plantarse(distribucion_banca(visible, conteo, puntos, reglas.plantaBanca, reglas.superaJugador), puntos)
+            for puntos in range(_PUNTOS)
+        ]
+        pedir = {}
+
+        def valor_pedir(puntos, blanda):
+            # Pedir una carta y seguir con la mejor acción
+            if (puntos, blanda) not in pedir:
+                duras = puntos - 10 if blanda else puntos
+                valor = 0.0
+                for i, p in enumerate(probabilidades):
+                    nuevas = duras + i + 1
+                    nuevos = nuevas + 10 if (blanda or i == 0) and nuevas <= 11 else nuevas
+                    if nuevos > 21:
+                        valor -= p
+                    elif nuevos == 21:
+                        valor += p * plantarse[21]  # Con 21 el jugador se planta
+                    else:
+                        valor += p * max(plantarse[nuevos], valor_pedir(nuevos, nuevos != nuevas))
+                pedir[(puntos, blanda)] = valor
+            return pedir[(puntos, blanda)]
+
+        for blanda in (0, 1):
+            for puntos in range(12 if blanda else 2, _PUNTOS):
+                tabla[indice(puntos, blanda, visible, PEDIR)] = valor_pedir(puntos, blanda)
+                tabla[indice(puntos, blanda, visible, PLANTARSE)] = plantarse[puntos]
+    return tabla
+
+
+def guardar(tabla, reglas, ruta):
+    """
+    Guarda la tabla en un fichero binario con cabecera versionada.
+
+    Parámetros:
+    - tabla (array): Tabla generada con generar().
+    - reglas (Reglas): Reglas con las que se generó.
+    - ruta (str): Ruta del fichero.
+    """
+
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "wb") as f:
+        f.write(_CABECERA.pack(_MAGIA, FORMATO, huella(reglas), len(tabla)))
+        tabla.tofile(f)
+    os.replace(temporal, ruta)  # Reemplazo atómico
+
+
+class TablaEstrategia:
+    """
+    Tabla de valor esperado mapeada en memoria.
+
+    Parámetros:
+    - reglas (Reglas): Reglas de la mesa, por defecto las estándar.
+    - ruta (str): Ruta del fichero, por defecto ``estrategia.bin`` junto al
+      programa. Se genera si no existe o si corresponde a otras reglas.
+    """
+
+    def __init__(self, reglas=None, ruta=None):
+        self.reglas = reglas if reglas is not None else Reglas()
+        self.ruta = ruta if ruta is not None else absPath("estrategia.bin")
+        if not self.valida():
+            guardar(generar(self.reglas), self.reglas, self.ruta)
+        with open(self.ruta, "rb") as f:
+            self.mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.valores = memoryview(self.mapa)[_CABECERA.size:].cast("f")
+
+    def valida(self):
+        """
+        Comprueba si el fichero existe y corresponde a las reglas y al formato.
+
+        Retorna:
+        - bool: True si puede usarse sin regenerar.
+        """
+
+        if not existsFile(self.ruta):
+            return False
+        with open(self.ruta, "rb") as f:
+            cabecera = f.read(_CABECERA.size)
+        if len(cabecera) < _CABECERA.size:
+            return False
+        magia, formato, resumen, tamano = _CABECERA.unpack(cabecera)
+        return magia == _MAGIA and formato == FORMATO and resumen == huella(self.reglas) and tamano == TAMANO
+
+    def valor(self, puntos, blanda, visible, accion):
+        """
+        Consulta el valor esperado de una acción.
+
+        Parámetros:
+        - puntos (int): Puntuación del jugador (0-21).
+        - blanda (bool): Si la mano tiene un as contando como 11.
+        - visible (int): Valor de la carta visible de la banca (1-10).
+        - accion (int): PEDIR o PLANTARSE.
+
+        Retorna:
+        - float: Valor esperado por unidad apostada.
+        """
+
+        return self.valores[indice(puntos, blanda, visible, accion)]
+
+    def consultar(self, puntos, blanda, visible):
+        """
+        Consulta los valores esperados de pedir y de plantarse.
+
+        Parámetros:
+        - puntos (int): Puntuación del jugador (0-21).
+        - blanda (bool): Si la mano tiene un as contando como 11.
+        - visible (int): Valor de la carta visible de la banca (1-10).
+
+        Retorna:
+        - tuple: Valor esperado de pedir y de plantarse.
+        """
+
+        i = indice(puntos, blanda, visible, PEDIR)
+        return self.valores[i], self.valores[i + 1]
+
+    def pedir(self, puntos, blanda, visible):
+        """
+        Indica si conviene pedir carta.
+
+        Parámetros:
+        - puntos (int): Puntuación del jugador (0-21).
+        - blanda (bool): Si la mano tiene un as contando como 11.
+        - visible (int): Valor de la carta visible de la banca (1-10).
+
+        Retorna:
+        - bool: True si pedir tiene mayor valor esperado que plantarse.
+        """
+
+        i = indice(puntos, blanda, visible, PEDIR)
+        return self.valores[i] > self.valores[i + 1]
+
+    def cerrar(self):
+        """ Libera el mapeo del fichero. """
+        self.valores.release()
+        self.mapa.close()
@@ -0,0 +1,90 @@
+"""
+Historial de manos en un fichero JSONL de solo anexado.
+
+Los eventos (reparto, volteo, plantarse, resultado) se encolan en O(1) desde
+el hilo de la interfaz y un hilo en segundo plano los escribe por lotes, de
+modo que el coste por evento no crece con la duración de la sesión.
+"""
+
+import json
+import queue
+import threading
+import time
+
+# Número máximo de eventos escritos por lote
+TAMANO_LOTE = 256
+
+_FIN = object()  # Marca de cierre de la cola
+
+
+class Historial:
+    """
+    Escritor del historial de manos en segundo plano.
+
+    Parámetros:
+    - ruta (str): Ruta del fichero JSONL donde se añaden los eventos.
+    - lote (int): Número máximo de eventos por escritura, por defecto TAMANO_LOTE.
+
+    Atributos:
+    - mano (int): Número de la mano actual en la sesión.
+    - escritos (int): Eventos escritos en el fichero.
+    """
+
+    def __init__(self, ruta, lote=TAMANO_LOTE):
+        self.ruta = ruta
+        self.lote = lote
+        self.mano = 0
+        self.escritos = 0
+        self.cola = queue.SimpleQueue()
+        self.hilo = threading.Thread(target=self.escribir, name="historial", daemon=True)
+        self.hilo.start()
+
+    def registrar(self, tipo, **datos):
+        """
+        Encola un evento de la mano actual.
+
+        Parámetros:
+        - tipo (str): Tipo de evento ("inicio", "reparto", "volteo", "plantado", "resultado").
+        - datos: Campos adicionales del evento.
+        """
+
+        if tipo == "inicio":
+            self.mano += 1
+        datos["tipo"] = tipo
+        datos["mano"] = self.mano
+        datos["t"] = time.time()
+        self.cola.put(datos)
+
+    def escribir(self):
+        """
+        Bucle del hilo escritor: espera un evento, reúne los pendientes hasta
+        completar un lote y los escribe de una vez.
+        """
+
+        with open(self.ruta, "a", encoding="utf-8") as f:
+            while True:
+                evento = self.cola.get()
+                lineas = []
+                while evento is not _FIN:
+                    lineas.append(json.dumps(evento, separators=(",", ":")))
+                    if len(lineas) >= self.lote:
+                        break
+                    try:
+                        evento = self.cola.get_nowait()
+                    except queue.Empty:
+                        break
+                if lineas:
+                    f.write("\n".join(lineas) + "\n")
+                    f.flush()
+                    self.escritos += len(lineas)
+                if evento is _FIN:
+                    return
+
+    def cerrar(self):
+        """
+        Escribe los eventos pendientes y detiene el hilo escritor.
+        """
+
+        if self.hilo.is_alive():
+            self.cola.put(_FIN)
+            self.hilo.join()
@@ -0,0 +1,367 @@
+"""
+Métricas de la sesión: contadores, histogramas de latencia y estadísticas
+del juego.
+
+La instrumentación se instala envolviendo los métodos de las clases solo al
+activarla (``activar``) y se retira con ``Metricas.restaurar``: sin activar,
+el motor y la interfaz no pagan ningún coste. Se miden:
+- Motor: ``Mesa.repartir``, la puntuación de cada carta visible
+  (``Jugador.contar``, al repartirla o al voltearla), ``Mazo.reiniciar`` y
+  el turno de la banca (``Mesa.jugarBanca``).
+- Interfaz: ``Baraja.reiniciar``, el inicio y el final de las animaciones de
+  ``Carta.mover`` (en las dos representaciones de la mesa) y
+  ``MainWindow.jugarBanca``.
+- Juego: manos jugadas, jugadores pasados y cartas que pide la banca por ronda.
+
+``Exportador`` escribe periódicamente una instantánea en formato de texto de
+Prometheus (para el textfile collector de node_exporter) o en JSON, según la
+extensión del fichero.
+"""
+
+import json
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from functools import partial
+
+# Límites superiores de las cubetas de los histogramas, en segundos (1 us - 5 s)
+LIMITES = tuple(m * 10.0 ** e for e in range(-6, 1) for m in (1, 2.5, 5))
+# Prefijo de las métricas exportadas a Prometheus
+PREFIJO = "blackjack"
+# Segundos entre exportaciones
+INTERVALO = 10.0
+
+
+def formatear_tiempo(segundos):
+    """ Retorna una duración legible en us, ms o s. """
+    if segundos < 1e-3:
+        return f"{segundos * 1e6:.0f}us"
+    if segundos < 1:
+        return f"{segundos * 1e3:.1f}ms"
+    return f"{segundos:.2f}s"
+
+
+class Histograma:
+    """
+    Histograma de duraciones con cubetas fijas.
+
+    Atributos:
+    - cubetas (list): Observaciones por cubeta de LIMITES (la última, sin límite).
+    - cuenta (int): Número de observaciones.
+    - suma (float): Suma de las observaciones en segundos.
+    """
+
+    __slots__ = ("cubetas", "cuenta", "suma")
+
+    def __init__(self):
+        self.cubetas = [0] * (len(LIMITES) + 1)
+        self.cuenta = 0
+        self.suma = 0.0
+
+    def observar(self, valor):
+        """
+        Añade una observación.
+
+        Parámetros:
+        - valor (float): Duración en segundos.
+        """
+
+        self.cubetas[bisect_left(LIMITES, valor)] += 1
+        self.cuenta += 1
+        self.suma += valor
+
+    def percentil(self, p):
+        """
+        Retorna una cota superior del percentil p (el límite de su cubeta).
+
+        Parámetros:
+        - p (float): Percentil entre 0 y 100.
+        """
+
+        objetivo = self.cuenta * p / 100
+        acumulado = 0
+        for limite, cubeta in zip(LIMITES, self.cubetas):
+            acumulado += cubeta
+            if acumulado >= objetivo:
+                return limite
+        return float("inf")
+
+
+class Metricas:
+    """
+    Registro de contadores e histogramas y de la instrumentación instalada.
+
+    Atributos:
+    - contadores (dict): Valor de cada contador por nombre.
+    - histogramas (dict): Histograma de cada método medido por nombre.
+    """
+
+    def __init__(self):
+        self.contadores = {}
+        self.histogramas = {}
+        self.originales = []  # (clase, método, función original)
+
+    def incrementar(self, nombre, n=1):
+        """ Suma n al contador indicado. """
+        self.contadores[nombre] = self.contadores.get(nombre, 0) + n
+
+    def histograma(self, nombre):
+        """ Retorna el histograma indicado, creándolo si no existe. """
+        if nombre not in self.histogramas:
+            self.histogramas[nombre] = Histograma()
+        return self.histogramas[nombre]
+
+    def instrumentar(self, clase, metodo, nombre, despues=None):
+        """
+        Envuelve un método de una clase para medir su duración.
+
+        Parámetros:
+        - clase (type): Clase que define el método.
+        - metodo (str): Nombre del método.
+        - nombre (str): Nombre del histograma.
+        - despues (callable): Función opcional que recibe la instancia tras
+          cada llamada. Por defecto, None.
+        """
+
+        original = getattr(clase, metodo)
+        histograma = self.histograma(nombre)
+        reloj = time.perf_counter
+
+        def medido(objeto, *args, **kwargs):
+            inicio = reloj()
+            try:
+                return original(objeto, *args, **kwargs)
+            finally:
+                histograma.observar(reloj() - inicio)
+                if despues is not None:
+                    despues(objeto)
+
+        medido.__name__ = original.__name__
+        medido.__doc__ = original.__doc__
+        self.originales.append((clase, metodo, clase.__dict__.get(metodo)))
+        setattr(clase, metodo, medido)
+
+    def instrumentarAnimaciones(self, clase):
+        """
+        Envuelve ``Carta.mover`` para contar las animaciones iniciadas y
+        terminadas y medir cuánto tardan de verdad en terminar.
+
+        Parámetros:
+        - clase (type): Clase de las cartas de la interfaz.
+        """
+
+        original = clase.mover
+        histograma = self.histograma("animacion")
+        reloj = time.perf_counter
+        inicios = {}  # Inicio de la animación en curso de cada grupo
+        conectados = weakref.WeakSet()
+
+        def terminada(grupo):
+            self.incrementar("animaciones_terminadas")
+            histograma.observar(reloj() - inicios.pop(id(grupo)))
+
+        def mover(carta, *args, **kwargs):
+            grupo = original(carta, *args, **kwargs)
+            self.incrementar("animaciones_iniciadas")
+            inicios[id(grupo)] = reloj()
+            if grupo not in conectados:
+                # Cada carta reutiliza su grupo: se conecta una sola vez
+                conectados.add(grupo)
+                grupo.finished.connect(partial(terminada, grupo))
+            return grupo
+
+        mover.__name__ = original.__name__
+        mover.__doc__ = original.__doc__
+        self.originales.append((clase, "mover", clase.__dict__.get("mover")))
+        clase.mover = mover
+
+    def restaurar(self):
+        """ Retira toda la instrumentación instalada. """
+        while self.originales:
+            clase, metodo, original = self.originales.pop()
+            if original is None:
+                delattr(clase, metodo)  # El método era heredado
+            else:
+                setattr(clase, metodo, original)
+
+    def registrarMano(self, mesa):
+        """
+        Anota las estadísticas de una mano al terminar el turno de la banca.
+
+        Parámetros:
+        - mesa (Mesa): Mesa con la mano terminada.
+        """
+
+        self.incrementar("rondas")
+        self.incrementar("manos", len(mesa.jugadores))
+        self.incrementar("pasadas", sum(1 for jugador in mesa.jugadores if jugador.is_bust))
+        self.incrementar("robos_banca", max(len(mesa.banca.mano) - 2, 0))
+        self.incrementar("banca_pasada", mesa.banca.is_bust)
+
+    def juego(self):
+        """
+        Retorna las estadísticas del juego derivadas de los contadores.
+
+        Retorna:
+        - dict: Manos y rondas jugadas, tasa de jugadores pasados, cartas
+          pedidas por la banca por ronda y tasa de banca pasada.
+        """
+
+        c = self.contadores
+        rondas = c.get("rondas", 0)
+        manos = c.get("manos", 0)
+        return {
+            "rondas": rondas,
+            "manos": manos,
+            "tasa_pasadas": c.get("pasadas", 0) / manos if manos else 0.0,
+            "robos_banca_por_ronda": c.get("robos_banca", 0) / rondas if rondas else 0.0,
+            "tasa_banca_pasada": c.get("banca_pasada", 0) / rondas if rondas else 0.0,
+        }
+
+    def instantanea(self):
+        """
+        Retorna una instantánea serializable a JSON de todas las métricas.
+        """
+
+        return {
+            "t": time.time(),
+            "contadores": dict(self.contadores),
+            "histogramas": {
+                nombre: {
+                    "cuenta": h.cuenta,
+                    "suma": h.suma,
+                    "p50": h.percentil(50),
+                    "p99": h.percentil(99),
+                    "cubetas": list(h.cubetas),
+                }
+                for nombre, h in list(self.histogramas.items())
+            },
+            "limites": list(LIMITES),
+            "juego": self.juego(),
+        }
+
+    def prometheus(self):
+        """
+        Retorna las métricas en el formato de texto de Prometheus.
+        """
+
+        lineas = []
+        for nombre, valor in sorted(self.contadores.items()):
+            lineas.append(f"# TYPE {PREFIJO}_{nombre}_total counter")
+            lineas.append(f"{PREFIJO}_{nombre}_total {valor}")
+        for nombre, valor in self.juego().items():
+            if isinstance(valor, float):
+                lineas.append(f"# TYPE {PREFIJO}_{nombre} gauge")
+                lineas.append(f"{PREFIJO}_{nombre} {valor}")
+        for nombre, h in sorted(self.histogramas.items()):
+            metrica = f"{PREFIJO}_{nombre}_segundos"
+            lineas.append(f"# TYPE {metrica} histogram")
+            acumulado = 0
+            for limite, cubeta in zip(LIMITES, h.cubetas):
+                acumulado += cubeta
+                lineas.append(f'{metrica}_bucket{{le="{limite:g}"}} {acumulado}')
+            lineas.append(f'{metrica}_bucket{{le="+Inf"}} {h.cuenta}')
+            lineas.append(f"{metrica}_sum {h.suma}")
+            lineas.append(f"{metrica}_count {h.cuenta}")
+        return "\n".join(lineas) + "\n"
+
+    def guardar(self, ruta):
+        """
+        Escribe la instantánea en un fichero de forma atómica: en JSON si la
+        ruta termina en ``.json`` y en formato de Prometheus en otro caso.
+
+        Parámetros:
+        - ruta (str): Fichero de destino.
+        """
+
+        if ruta.endswith(".json"):
+            texto = json.dumps(self.instantanea())
+        else:
+            texto = self.prometheus()
+        temporal = f"{ruta}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            f.write(texto)
+        os.replace(temporal, ruta)  # El lector nunca ve un fichero a medias
+
+    def resumen(self):
+        """
+        Retorna un texto de varias líneas para el panel de depuración.
+        """
+
+        lineas = []
+        for nombre, h in list(self.histogramas.items()):
+            if h.cuenta:
+                lineas.append(f"{nombre:<16}{h.cuenta:>7}  p50 {formatear_tiempo(h.percentil(50)):>7}"
+                              f"  p99 {formatear_tiempo(h.percentil(99)):>7}")
+        c = self.contadores
+        if "animaciones_iniciadas" in c:
+            lineas.append(f"animaciones     {c.get('animaciones_terminadas', 0)}/{c['animaciones_iniciadas']} terminadas")
+        juego = self.juego()
+        lineas.append(f"manos {juego['manos']}  pasadas {juego['tasa_pasadas']:.1%}")
+        lineas.append(f"banca: {juego['robos_banca_por_ronda']:.2f} cartas/ronda  pasada {juego['tasa_banca_pasada']:.1%}")
+        return "\n".join(lineas)
+
+
+class Exportador:
+    """
+    Hilo que guarda las métricas periódicamente en un fichero.
+
+    Parámetros:
+    - metricas (Metricas): Métricas a exportar.
+    - ruta (str): Fichero de destino (``.json`` o texto de Prometheus).
+    - intervalo (float): Segundos entre exportaciones, por defecto INTERVALO.
+    """
+
+    def __init__(self, metricas, ruta, intervalo=INTERVALO):
+        self.metricas = metricas
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self.parar = threading.Event()
+        self.hilo = threading.Thread(target=self.exportar, name="metricas", daemon=True)
+        self.hilo.start()
+
+    def exportar(self):
+        """ Bucle del hilo: guarda las métricas cada intervalo hasta cerrarse. """
+        while not self.parar.wait(self.intervalo):
+            self.metricas.guardar(self.ruta)
+
+    def cerrar(self):
+        """ Detiene el hilo y guarda la última instantánea. """
+        if self.hilo.is_alive():
+            self.parar.set()
+            self.hilo.join()
+        self.metricas.guardar(self.ruta)
+
+
+def activar(ventana=None):
+    """
+    Instala la instrumentación del motor y, si se indica la clase de la
+    ventana, la de la interfaz.
+
+    Parámetros:
+    - ventana (type): Clase de la ventana principal (``MainWindow``). Por
+      defecto, None (solo el motor).
+
+    Retorna:
+    - Metricas: Registro con la instrumentación instalada.
+    """
+
+    from motor import Jugador, Mazo, Mesa
+
+    metricas = Metricas()
+    metricas.instrumentar(Mesa, "repartir", "repartir")
+    metricas.instrumentar(Jugador, "contar", "puntuar")
+    metricas.instrumentar(Mazo, "reiniciar", "mazo_reiniciar")
+    metricas.instrumentar(Mesa, "jugarBanca", "banca", despues=metricas.registrarMano)
+    if ventana is not None:
+        from cartas import Baraja, Carta
+        from escena import BarajaEscena, CartaEscena
+
+        for baraja, carta in ((Baraja, Carta), (BarajaEscena, CartaEscena)):
+            metricas.instrumentar(baraja, "reiniciar", "baraja_reiniciar")
+            metricas.instrumentarAnimaciones(carta)
+        # La ventana juega la banca sin llamar a Mesa.jugarBanca
+        metricas.instrumentar(ventana, "jugarBanca", "jugar_banca", despues=lambda v: metricas.registrarMano(v.bj))
+    return metricas
@@ -0,0 +1,941 @@
+"""
+Motor del juego de Blackjack sin dependencias de Qt.
+
+Las cartas se representan como enteros pequeños (0-51): ``palo * 13 + rango``,
+donde ``rango`` va de 0 (As) a 12 (Rey). La baraja guarda el orden de las
+cartas en un ``array`` y reparte avanzando un cursor, de modo que la lógica
+del juego puede ejecutarse sin crear widgets ni una ``QApplication``.
+
+La puntuación no compara cartas: cada mano se lleva empaquetada en un
+entero (suma dura y número de ases) que indexa tablas precalculadas con su
+puntuación, si es blanda y si se ha pasado, y el resultado de un asiento se
+lee de una tabla indexada por las dos puntuaciones (``comprobar_tablas``
+las verifica en todas las manos alcanzables).
+"""
+
+from array import array
+import random
+import struct
+
+# Nombres y palos de las cartas (mismo orden que las imágenes)
+NOMBRES = ("As", "Dos", "Tres", "Cuatro", "Cinco", "Seis", "Siete", "Ocho", "Nueve", "Diez", "Jota", "Reina", "Rey")
+PALOS = ("Treboles", "Diamantes", "Corazones", "Picas")
+CARTAS_POR_PALO = len(NOMBRES)
+TOTAL_CARTAS = CARTAS_POR_PALO * len(PALOS)
+# Valor de cada carta contando el As como 1 (indexado por carta)
+VALORES = tuple(min(c % CARTAS_POR_PALO + 1, 10) for c in range(TOTAL_CARTAS))
+# Número máximo de asientos de una mesa
+MAX_ASIENTOS = 7
+# Baraja en su orden inicial
+_ORDEN = array("B", range(TOTAL_CARTAS))
+# Formato binario de las instantáneas: cabecera, mano y conteo
+_CABECERA = struct.Struct("<4sHHBBB")
+_MANO = struct.Struct("<BBH?d")
+_CONTEO = struct.Struct(f"<{CARTAS_POR_PALO}HHhH")
+_ESTADO_RANDOM = struct.Struct("<B625Id")
+_MAGIA = b"BJI2"
+# Mano empaquetada en un entero: suma dura (ases = 1) << BITS_ASES | número de ases
+BITS_ASES = 6
+_MASCARA_ASES = (1 << BITS_ASES) - 1
+# Suma dura máxima de las tablas: sin pedir con 21 o más, la mayor alcanzable
+# es 30; las manos que siguen pidiendo después de pasarse se calculan aparte
+MAX_DURAS = 63
+_FUERA_DE_TABLA = (MAX_DURAS + 1) << BITS_ASES
+# Lo que suma cada carta a la mano empaquetada (indexado por carta)
+EMPAQUETADAS = tuple(VALORES[c] << BITS_ASES | (VALORES[c] == 1) for c in range(TOTAL_CARTAS))
+
+
+def puntuar(duras, ases):
+    """
+    Calcula la puntuación de una mano: un as cuenta como 11 si no se supera 21
+    (nunca pueden valer 11 dos ases).
+
+    Parámetros:
+    - duras (int): Suma de las cartas contando los ases como 1.
+    - ases (int): Número de ases.
+
+    Retorna:
+    - int: La puntuación de la mano.
+    """
+
+    return duras + 10 if ases and duras <= 11 else duras
+
+
+# Puntuación, mano blanda y mano pasada de cada mano empaquetada
+_MANOS = range(_FUERA_DE_TABLA)
+PUNTOS = tuple(puntuar(m >> BITS_ASES, m & _MASCARA_ASES) for m in _MANOS)
+BLANDAS = tuple(PUNTOS[m] != m >> BITS_ASES for m in _MANOS)
+PASADAS = tuple(m >> BITS_ASES > 21 for m in _MANOS)
+
+
+def decidir(jugador, banca):
+    """
+    Determina el resultado de un asiento a partir de las puntuaciones.
+
+    Parámetros:
+    - jugador (int): Puntuación del jugador.
+    - banca (int): Puntuación de la banca.
+
+    Retorna:
+    - int: 0 si hay empate, 1 si gana el jugador, o 2 si gana la banca.
+    """
+
+    if jugador > 21:
+        return 2
+    if banca > 21:
+        return 1
+    if jugador > banca:
+        return 1
+    elif banca > jugador:
+        return 2
+    else:
+        return 0
+
+
+# Resultado de un asiento indexado por [puntos del jugador][puntos de la banca]
+GANADORES = tuple(tuple(decidir(j, b) for b in range(MAX_DURAS + 1)) for j in range(MAX_DURAS + 1))
+
+
+def crear_carta(numero, palo):
+    """
+    Obtiene el entero que representa una carta.
+
+    Parámetros:
+    - numero (int): Número de la carta (1-13).
+    - palo (int): Índice del palo en PALOS (0-3).
+
+    Retorna:
+    - int: La carta codificada.
+    """
+    return palo * CARTAS_POR_PALO + numero - 1
+
+
+def numero(carta):
+    """ Retorna el número de la carta (1-13). """
+    return carta % CARTAS_POR_PALO + 1
+
+
+def nombre(carta):
+    """ Retorna el nombre de la carta (As, Dos, Tres, ...). """
+    return NOMBRES[carta % CARTAS_POR_PALO]
+
+
+def palo(carta):
+    """ Retorna el palo de la carta (Treboles, Diamantes, Corazones, Picas). """
+    return PALOS[carta // CARTAS_POR_PALO]
+
+
+def imagen(carta):
+    """ Retorna el nombre de la imagen de la carta (por ejemplo, "1T"). """
+    return f"{numero(carta)}{palo(carta)[0]}"
+
+
+def describir(carta):
+    """ Retorna una descripción legible de la carta (por ejemplo, "As de Picas"). """
+    return f"{nombre(carta)} de {palo(carta)}"
+
+
+class Reglas:
+    """
+    Parámetros de las reglas de la mesa.
+
+    Atributos:
+    - mazos (int): Número de barajas del zapato.
+    - plantaBanca (int): Puntuación con la que la banca se planta.
+    - superaJugador (bool): Si la banca se planta al superar al jugador.
+    - pagoBlackjack (float): Pago por unidad apostada de un blackjack natural.
+    """
+
+    __slots__ = ("mazos", "plantaBanca", "superaJugador", "pagoBlackjack")
+
+    def __init__(self, mazos=1, plantaBanca=17, superaJugador=True, pagoBlackjack=1.5):
+        self.mazos = mazos
+        self.plantaBanca = plantaBanca
+        self.superaJugador = superaJugador
+        self.pagoBlackjack = pagoBlackjack
+
+    def clave(self):
+        """ Retorna una tupla con los parámetros que afectan al juego, útil para cachés y hashes. """
+        # El pago del blackjack no cambia las decisiones, así que no invalida la tabla de estrategia
+        return (self.mazos, self.plantaBanca, self.superaJugador)
+
+
+class Mazo:
+    """
+    Clase que representa la baraja (o el zapato de varias barajas) sin
+    interfaz gráfica.
+
+    El orden de las cartas se guarda en un array plano y se reparte avanzando
+    un cursor. Con una penetración indicada, la carta de corte se coloca en
+    esa fracción del zapato y solo se vuelve a mezclar al alcanzarla; sin
+    ella, se mezcla después de cada mano.
+
+    Cada mezcla parte del orden inicial, de modo que el resultado depende
+    solo del generador y no de las manos anteriores: con un generador de
+    ``azar`` una mano se reproduce a partir de su semilla.
+
+    Parámetros:
+    - rng: Generador para mezclar con un método ``shuffle`` (random.Random o
+      uno de ``azar``), por defecto el global de random.
+    - mazos (int): Número de barajas de 52 cartas en el zapato, por defecto 1.
+    - penetracion (float): Fracción del zapato que se reparte antes de volver
+      a mezclar (por ejemplo, 0.75). Por defecto, None (mezclar en cada mano).
+    - conteo (Conteo): Conteo de cartas a mantener al extraer y mezclar, por
+      defecto None.
+
+    Atributos:
+    - cartas (array): Orden de las cartas en el zapato.
+    - posicion (int): Índice de la siguiente carta a extraer.
+    - corte (int): Posición de la carta de corte.
+    - conteo (Conteo): Conteo de cartas enganchado, o None.
+    - recogido (bool): Si el zapato actual viene de recoger() a mitad de
+      mano; su orden ya no depende solo de la mezcla.
+    """
+
+    __slots__ = ("cartas", "posicion", "corte", "rng", "conteo", "recogido")
+
+    def __init__(self, rng=None, mazos=1, penetracion=None, conteo=None):
+        self.cartas = array("B", range(TOTAL_CARTAS)) * mazos
+        self.posicion = 0
+        self.corte = 0 if penetracion is None else int(len(self.cartas) * penetracion)
+        self.rng = rng if rng is not None else random
+        self.conteo = conteo
+        self.recogido = False
+        self.mezclar()  # Mezclar las cartas
+
+    def mezclar(self):
+        """
+        Mezcla todas las cartas del zapato desde el orden inicial y vuelve al principio.
+
+        No mezcla en el sitio: crea un array nuevo con el orden inicial y lo
+        mezcla. Las instantáneas (Mesa.capturar) comparten el array de la
+        baraja sin copiarlo, así que mezclar el mismo array cambiaría el
+        orden de las cartas que guardan.
+        """
+
+        self.posicion = 0
+        self.recogido = False
+        self.cartas = _ORDEN * (len(self.cartas) // TOTAL_CARTAS)
+        self.rng.shuffle(self.cartas)
+        if self.conteo is not None:
+            self.conteo.reiniciar()
+
+    def extraer(self):
+        """
+        Extrae una carta de la pila.
+
+        Retorna:
+        - int or None: La carta extraída o None si la pila está vacía.
+        """
+
+        if self.posicion < len(self.cartas):
+            carta = self.cartas[self.posicion]
+            self.posicion += 1  # Avanzar el cursor en lugar de mover la carta
+            if self.conteo is not None:
+                self.conteo.extraida(carta)
+            return carta
+        return None
+
+    def recoger(self, enJuego, visibles=()):
+        """
+        Vuelve a mezclar los descartes cuando el zapato se agota a mitad de
+        mano: mezcla el zapato completo y pasa al principio, como ya
+        extraídas, las cartas que siguen en la mesa, de modo que la mano
+        continúa con las demás. El conteo vuelve a empezar con las cartas de
+        la mesa: todas descontadas del zapato y las boca arriba en la cuenta.
+
+        Parámetros:
+        - enJuego (iterable): Cartas que siguen en la mesa.
+        - visibles (iterable): Si cada carta de la mesa está boca arriba, en
+          el mismo orden. Por defecto, ninguna.
+        """
+
+        self.mezclar()
+        cartas = self.cartas
+        for carta in enJuego:
+            # Intercambiar la primera copia de la carta con la siguiente por extraer
+            i = cartas.index(carta, self.posicion)
+            cartas[self.posicion], cartas[i] = carta, cartas[self.posicion]
+            self.posicion += 1
+            if self.conteo is not None:
+                self.conteo.extraida(carta)
+        if self.conteo is not None:
+            for carta, visible in zip(cartas[:self.posicion], visibles):
+                if visible:
+                    self.conteo.vista(carta)
+        self.recogido = True
+
+    def pendientes(self):
+        """ Retorna las cartas que quedan en la pila, en orden de extracción. """
+        return self.cartas[self.posicion:]
+
+    def jugadas(self):
+        """ Retorna las cartas extraídas desde la última mezcla, en orden de extracción. """
+        return self.cartas[:self.posicion]
+
+    def restantes(self):
+        """ Retorna el número de cartas que quedan en la pila. """
+        return len(self.cartas) - self.posicion
+
+    def corteAlcanzado(self):
+        """ Indica si se ha alcanzado la carta de corte. """
+        return self.posicion >= self.corte
+
+    def reiniciar(self, minimo=0):
+        """
+        Prepara la siguiente mano: recupera las cartas jugadas y las mezcla si
+        se ha alcanzado la carta de corte o si no quedan cartas para el
+        reparto inicial.
+
+        Parámetros:
+        - minimo (int): Cartas que necesita el reparto inicial, por defecto 0.
+
+        Retorna:
+        - bool: True si se ha mezclado el zapato.
+        """
+
+        if self.corteAlcanzado() or self.restantes() < minimo:
+            self.mezclar()
+            return True
+        return False
+
+
+class Jugador:
+    """
+    Clase que representa a un jugador en el juego de Blackjack.
+
+    La puntuación se mantiene de forma incremental: ``empaquetada`` guarda
+    en un solo entero la suma de las cartas visibles contando los ases como
+    1 y el número de ases visibles, cada carta le suma su entrada de
+    EMPAQUETADAS y la puntuación, si la mano es blanda y si se ha pasado se
+    leen de las tablas PUNTOS, BLANDAS y PASADAS, sin comparaciones.
+
+    Atributos:
+    - mano: Lista de cartas en la mano del jugador.
+    - visibles: Lista que indica qué cartas de la mano están boca arriba.
+    - nombre: Nombre del jugador.
+    - puntos: Puntuación total de las cartas visibles en la mano.
+    - empaquetada: Mano visible empaquetada (duras << BITS_ASES | ases).
+    - duras: Suma de las cartas visibles contando los ases como 1.
+    - ases: Número de ases visibles.
+    - plantado: Indica si el jugador ha decidido plantarse en el juego.
+    - apuesta: Cantidad apostada en la mano (0 si no hay apuesta).
+    """
+
+    __slots__ = ("mano", "visibles", "nombre", "puntos", "empaquetada", "plantado", "apuesta")
+
+    def __init__(self, nombre):
+        """
+        Inicializa un nuevo jugador con el nombre proporcionado.
+
+        Parámetros:
+        - nombre (str): El nombre del jugador.
+        """
+
+        self.mano = []  # Lista para almacenar las cartas en la mano del jugador
+        self.visibles = []  # Cartas boca arriba (paralela a la mano)
+        self.nombre = nombre  # Asigna el nombre proporcionado al jugador
+        self.puntos = 0  # Inicializa la puntuación del jugador en 0
+        self.empaquetada = 0  # Suma con los ases valiendo 1 y ases visibles
+        self.plantado = False  # Inicialmente, el jugador no está plantado en el juego
+        self.apuesta = 0  # Sin apuesta hasta que se indique
+
+    def sumar(self, carta, visible=True):
+        """
+        Agrega una carta a la mano del jugador y actualiza la puntuación.
+
+        Parámetros:
+        - carta (int): La carta que se agrega a la mano del jugador.
+        - visible (bool): Indica si la carta se agrega boca arriba. Por defecto, True.
+        """
+
+        self.mano.append(carta)  # Agrega la carta a la mano del jugador
+        self.visibles.append(visible)
+        if visible:
+            self.contar(carta)
+
+    def revelar(self, indice=-1):
+        """
+        Voltea una carta de la mano y actualiza la puntuación.
+
+        Parámetros:
+        - indice (int): Posición de la carta en la mano. Por defecto, la última.
+        """
+
+        if not self.visibles[indice]:
+            self.visibles[indice] = True
+            self.contar(self.mano[indice])
+
+    def contar(self, carta):
+        """
+        Suma una carta visible a la puntuación en tiempo constante.
+
+        Parámetros:
+        - carta (int): La carta que pasa a contar en la puntuación.
+        """
+
+        empaquetada = self.empaquetada + EMPAQUETADAS[carta]
+        self.empaquetada = empaquetada
+        try:
+            self.puntos = PUNTOS[empaquetada]
+        except IndexError:  # Fuera de las tablas (muy pasada de 21)
+            self.puntos = empaquetada >> BITS_ASES
+
+    def calcular(self):
+        """
+        Recalcula desde cero la puntuación total de las cartas visibles en la
+        mano del jugador, considerando la lógica de los ases.
+        """
+
+        empaquetada = 0
+        for carta, visible in zip(self.mano, self.visibles):
+            if visible:
+                empaquetada += EMPAQUETADAS[carta]
+        self.empaquetada = empaquetada
+        try:
+            self.puntos = PUNTOS[empaquetada]
+        except IndexError:  # Fuera de las tablas (muy pasada de 21)
+            self.puntos = empaquetada >> BITS_ASES
+
+    @property
+    def duras(self):
+        """ Suma de las cartas visibles contando los ases como 1. """
+        return self.empaquetada >> BITS_ASES
+
+    @property
+    def ases(self):
+        """ Número de ases visibles. """
+        return self.empaquetada & _MASCARA_ASES
+
+    @property
+    def is_soft(self):
+        """ Indica si la mano tiene un as contando como 11. """
+        empaquetada = self.empaquetada
+        return empaquetada < _FUERA_DE_TABLA and BLANDAS[empaquetada]
+
+    @property
+    def is_blackjack(self):
+        """ Indica si la mano es un 21 con las dos primeras cartas visibles. """
+        return self.puntos == 21 and len(self.mano) == 2 and self.visibles[0] and self.visibles[1]
+
+    @property
+    def is_bust(self):
+        """ Indica si la mano supera 21. """
+        empaquetada = self.empaquetada
+        return empaquetada >= _FUERA_DE_TABLA or PASADAS[empaquetada]
+
+    def consultar(self):
+        """
+        Imprime en la consola la información de la mano del jugador,
+        mostrando solo las cartas visibles y la puntuación total.
+        """
+
+        print(f"{self.nombre}: {[describir(c) for c, v in zip(self.mano, self.visibles) if v]} ({self.puntos})")
+
+
+class Instantanea:
+    """
+    Estado de una mesa en un instante: cursor de la baraja, manos, plantados,
+    conteo y posición del generador.
+
+    Las mezclas crean un array nuevo en lugar de reordenar el anterior, así
+    que la instantánea guarda una referencia al orden de la baraja en vez de
+    copiarlo (copia en escritura) y las manos como tuplas. Capturar y
+    restaurar cuestan unos pocos microsegundos, lo bastante poco para
+    explorar miles de jugadas desde el mismo punto.
+
+    Atributos:
+    - cartas (array): Orden de la baraja (compartido, no se modifica).
+    - posicion (int): Cursor de la baraja.
+    - azar: Índice de la siguiente mezcla (generadores de ``azar``) o el
+      estado de ``random.getstate()``.
+    - manos (tuple): Por jugador (asientos y banca al final): cartas,
+      visibles, puntos, mano empaquetada, plantado y apuesta.
+    - conteo (tuple): Estado del conteo de cartas, o None.
+    """
+
+    __slots__ = ("cartas", "posicion", "azar", "manos", "conteo")
+
+    def __init__(self, cartas, posicion, azar, manos, conteo=None):
+        self.cartas = cartas
+        self.posicion = posicion
+        self.azar = azar
+        self.manos = manos
+        self.conteo = conteo
+
+    def serializar(self):
+        """
+        Convierte la instantánea en bytes, por ejemplo para enviarla a otro proceso.
+
+        Retorna:
+        - bytes: La instantánea en formato binario.
+        """
+
+        porMezclas = isinstance(self.azar, int)
+        partes = [_CABECERA.pack(_MAGIA, len(self.cartas), self.posicion, len(self.manos), porMezclas, self.conteo is not None)]
+        if porMezclas:
+            partes.append(struct.pack("<Q", self.azar))
+        else:
+            version, interno, gauss = self.azar
+            partes.append(_ESTADO_RANDOM.pack(version, *interno, float("nan") if gauss is None else gauss))
+        partes.append(self.cartas.tobytes())
+        for mano, visibles, puntos, empaquetada, plantado, apuesta in self.manos:
+            partes.append(_MANO.pack(len(mano), puntos, empaquetada, plantado, apuesta))
+            partes.append(bytes(mano))
+            partes.append(bytes(visibles))
+        if self.conteo is not None:
+            restantes, repartidas, corriente, vistas = self.conteo
+            partes.append(_CONTEO.pack(*restantes, repartidas, corriente, vistas))
+        return b"".join(partes)
+
+    @classmethod
+    def deserializar(cls, datos):
+        """
+        Reconstruye una instantánea a partir de serializar().
+
+        Parámetros:
+        - datos (bytes): La instantánea en formato binario.
+
+        Retorna:
+        - Instantanea: La instantánea reconstruida.
+        """
+
+        magia, total, posicion, jugadores, porMezclas, conConteo = _CABECERA.unpack_from(datos)
+        if magia != _MAGIA:
+            raise ValueError("Los datos no son una instantánea de la mesa")
+        desplazamiento = _CABECERA.size
+        if porMezclas:
+            (azar,) = struct.unpack_from("<Q", datos, desplazamiento)
+            desplazamiento += 8
+        else:
+            version, *interno, gauss = _ESTADO_RANDOM.unpack_from(datos, desplazamiento)
+            azar = (version, tuple(interno), None if gauss != gauss else gauss)
+            desplazamiento += _ESTADO_RANDOM.size
+        cartas = array("B", datos[desplazamiento:desplazamiento + total])
+        desplazamiento += total
+        manos = []
+        for _ in range(jugadores):
+            n, puntos, empaquetada, plantado, apuesta = _MANO.unpack_from(datos, desplazamiento)
+            desplazamiento += _MANO.size
+            mano = tuple(datos[desplazamiento:desplazamiento + n])
+            visibles = tuple(map(bool, datos[desplazamiento + n:desplazamiento + 2 * n]))
+            desplazamiento += 2 * n
+            manos.append((mano, visibles, puntos, empaquetada, plantado, apuesta))
+        conteo = None
+        if conConteo:
+            *restantes, repartidas, corriente, vistas = _CONTEO.unpack_from(datos, desplazamiento)
+            conteo = (tuple(restantes), repartidas, corriente, vistas)
+        return cls(cartas, posicion, azar, tuple(manos), conteo)
+
+    def __reduce__(self):
+        # pickle (multiprocessing) usa el mismo formato binario
+        return (Instantanea.deserializar, (self.serializar(),))
+
+
+class Mesa:
+    """
+    Clase que representa una mesa de Blackjack con varios asientos contra una
+    sola banca.
+
+    Cada asiento tiene su propia mano y su estado de plantado. El reparto
+    inicial va en ronda desde la baraja compartida, la banca juega una sola
+    vez para todos los asientos y el resultado de todos ellos se obtiene en
+    una sola pasada con resultados().
+
+    Atributos:
+    - baraja (Mazo): La baraja compartida por la mesa.
+    - reglas (Reglas): Reglas de la mesa.
+    - jugadores (list): Un Jugador por asiento, en orden de juego.
+    - humano (Jugador): El jugador del primer asiento.
+    - banca (Jugador): El jugador que representa la banca del casino.
+    - inicio (tuple): Posición de la baraja y mezcla del generador al
+      empezar la mano, con las que se reproduce (aunque se mezcle a mitad
+      de ella), o None si la mano empieza en un zapato recogido a mitad de
+      una mano anterior, cuyo orden no se obtiene solo de la mezcla.
+    """
+
+    def __init__(self, baraja=None, reglas=None, asientos=1):
+        """
+        Inicializa una mesa con los asientos indicados.
+
+        Parámetros:
+        - baraja (Mazo): La baraja de cartas que se utilizará en el juego.
+          Si no se indica, se crea una nueva.
+        - reglas (Reglas): Reglas de la mesa, por defecto las estándar.
+        - asientos (int): Número de asientos (1 a MAX_ASIENTOS), por defecto 1.
+        """
+
+        if not 1 <= asientos <= MAX_ASIENTOS:
+            raise ValueError(f"El número de asientos debe estar entre 1 y {MAX_ASIENTOS}")
+        self.baraja = baraja if baraja is not None else Mazo()  # Asigna la baraja al juego
+        self.reglas = reglas if reglas is not None else Reglas()
+        self.asientos = asientos
+        self.sentar()
+
+    def sentar(self):
+        """
+        Crea jugadores nuevos para todos los asientos y para la banca y
+        anota dónde empieza la mano.
+        """
+
+        self.jugadores = [Jugador(f"Jugador {i + 1}") for i in range(self.asientos)]
+        self.humano = self.jugadores[0]
+        self.banca = Jugador("Banca")  # Crea un jugador que representa la banca
+        baraja = self.baraja
+        self.inicio = None if baraja.recogido else (baraja.posicion, max(getattr(baraja.rng, "mezclas", 0) - 1, 0))
+
+    def repartir(self, jugador, voltear=True):
+        """
+        Reparte una carta al jugador especificado. Si el zapato se agota a
+        mitad de mano, vuelve a mezclar los descartes (Mazo.recoger) en lugar
+        de cortar la jugada.
+
+        Parámetros:
+        - jugador (Jugador): El jugador al que se le repartirá la carta.
+        - voltear (bool): Indica si la carta debe mostrarse volteada. Por defecto, True.
+
+        Retorna:
+        - int or None: La carta repartida al jugador (None solo si todas las
+          cartas del zapato están en la mesa).
+        """
+
+        carta = self.baraja.extraer()  # Extrae una carta de la baraja
+        if carta is None:
+            self.baraja.recoger(self.enJuego(), self.visiblesEnJuego())
+            carta = self.baraja.extraer()
+        if carta is not None:
+            jugador.sumar(carta, voltear)  # Añade la carta al jugador
+            if voltear and self.baraja.conteo is not None:
+                self.baraja.conteo.vista(carta)
+        return carta
+
+    def enJuego(self):
+        """ Retorna las cartas que están en la mesa (de los asientos y de la banca). """
+        return [carta for jugador in self.jugadores for carta in jugador.mano] + self.banca.mano
+
+    def visiblesEnJuego(self):
+        """ Retorna si cada carta de enJuego() está boca arriba, en el mismo orden. """
+        return [visible for jugador in self.jugadores for visible in jugador.visibles] + self.banca.visibles
+
+    def revelar(self, jugador, indice=-1):
+        """
+        Voltea una carta de la mano de un jugador y la anota en el conteo.
+
+        Parámetros:
+        - jugador (Jugador): Jugador dueño de la carta.
+        - indice (int): Posición de la carta en la mano. Por defecto, la última.
+        """
+
+        if not jugador.visibles[indice]:
+            jugador.revelar(indice)
+            if self.baraja.conteo is not None:
+                self.baraja.conteo.vista(jugador.mano[indice])
+
+    def ordenReparto(self):
+        """
+        Orden del reparto inicial: una carta a cada asiento y a la banca, y
+        después otra a cada asiento y a la banca boca abajo.
+
+        Retorna:
+        - list: Pares (jugador, voltear) en orden de reparto.
+        """
+
+        orden = []
+        for voltear in (True, False):
+            orden.extend((jugador, True) for jugador in self.jugadores)
+            orden.append((self.banca, voltear))
+        return orden
+
+    def preparar(self):
+        """
+        Realiza el reparto inicial según ordenReparto().
+        """
+
+        for jugador, voltear in self.ordenReparto():
+            self.repartir(jugador, voltear)
+
+    def vivos(self):
+        """ Retorna los jugadores que no se han pasado. """
+        return [jugador for jugador in self.jugadores if jugador.puntos <= 21]
+
+    def objetivo(self):
+        """ Retorna la mayor puntuación de los jugadores que no se han pasado (0 si no queda ninguno). """
+        return max((jugador.puntos for jugador in self.jugadores if jugador.puntos <= 21), default=0)
+
+    def plantaBanca(self):
+        """
+        Indica si la banca debe plantarse: con 17 puntos o más, o si tiene
+        más puntos que todos los jugadores que siguen en juego (según las
+        reglas de la mesa).
+
+        Retorna:
+        - bool: True si la banca se planta.
+        """
+
+        puntos = self.banca.puntos
+        return puntos >= self.reglas.plantaBanca or (self.reglas.superaJugador and puntos > self.objetivo())
+
+    def turnoBanca(self):
+        """
+        Juega el turno de la banca paso a paso: voltea sus cartas y, si algún
+        jugador no se ha pasado, pide cartas hasta que deba plantarse. Cada
+        carta se entrega ya repartida, con la mesa en el estado de ese
+        momento, para que la interfaz pueda animarla.
+
+        Retorna:
+        - Generador de las cartas repartidas a la banca; al agotarse, la
+          banca queda plantada.
+        """
+
+        for i in range(len(self.banca.mano)):
+            self.revelar(self.banca, i)
+        if self.vivos():
+            while not self.plantaBanca():
+                carta = self.repartir(self.banca)
+                if carta is None:
+                    break
+                yield carta
+        self.banca.plantado = True
+
+    def jugarBanca(self):
+        """
+        Juega el turno completo de la banca una sola vez para todos los
+        asientos (turnoBanca() de una vez).
+
+        Retorna:
+        - list: Cartas repartidas a la banca durante el turno.
+        """
+
+        return list(self.turnoBanca())
+
+    def ganador(self, asiento=0):
+        """
+        Determina el ganador de un asiento.
+
+        Parámetros:
+        - asiento (int): Índice del asiento, por defecto el primero.
+
+        Retorna:
+        - int: 0 si hay empate, 1 si gana el jugador, o 2 si gana la banca.
+        """
+
+        jugador = self.jugadores[asiento].puntos
+        try:
+            return GANADORES[jugador][self.banca.puntos]
+        except IndexError:  # Fuera de las tablas (muy pasada de 21)
+            return decidir(jugador, self.banca.puntos)
+
+    def resultados(self):
+        """
+        Determina el ganador de todos los asientos en una sola pasada.
+
+        Retorna:
+        - list: Por asiento, 0 si hay empate, 1 si gana el jugador, o 2 si
+          gana la banca.
+        """
+
+        banca = self.banca.puntos
+        try:
+            fila = [GANADORES[p][banca] for p in [jugador.puntos for jugador in self.jugadores]]
+        except IndexError:  # Fuera de las tablas (muy pasada de 21)
+            fila = [decidir(jugador.puntos, banca) for jugador in self.jugadores]
+        return fila
+
+    def liquidar(self):
+        """
+        Calcula la ganancia neta de la apuesta de cada asiento: la apuesta
+        se paga 1:1 al ganar, reglas.pagoBlackjack:1 con un blackjack natural
+        y se devuelve al empatar. Como en el casino, un blackjack natural gana
+        a cualquier 21 que no lo sea, también al de la banca.
+
+        Retorna:
+        - list: Ganancia neta por asiento (negativa si pierde la apuesta).
+        """
+
+        naturalBanca = self.banca.is_blackjack
+        netos = []
+        for jugador, resultado in zip(self.jugadores, self.resultados()):
+            natural = jugador.is_blackjack
+            if natural != naturalBanca:
+                factor = self.reglas.pagoBlackjack if natural else -1
+            elif natural:
+                factor = 0  # Los dos con blackjack natural
+            else:
+                factor = (0, 1, -1)[resultado]
+            netos.append(jugador.apuesta * factor)
+        return netos
+
+    def comprobarGanador(self):
+        """
+        Imprime en la consola el resultado de cada asiento (Ganador, Perdedor o Empate).
+        """
+
+        for jugador, ganador in zip(self.jugadores, self.resultados()):
+            prefijo = f"{jugador.nombre}: " if self.asientos > 1 else ""
+            if ganador == 2:
+                print(f"{prefijo}Gana la banca")
+            elif ganador == 1:
+                print(f"{prefijo}Gana el jugador")
+            else:
+                print(f"{prefijo}Empate")
+
+    def capturar(self):
+        """
+        Captura el estado de la mesa.
+
+        Retorna:
+        - Instantanea: Estado actual, para restaurar() más tarde.
+        """
+
+        baraja = self.baraja
+        rng = baraja.rng
+        conteo = baraja.conteo
+        return Instantanea(
+            baraja.cartas,
+            baraja.posicion,
+            rng.mezclas if hasattr(rng, "situar") else rng.getstate(),
+            tuple((tuple(j.mano), tuple(j.visibles), j.puntos, j.empaquetada, j.plantado, j.apuesta) for j in (*self.jugadores, self.banca)),
+            None if conteo is None else (tuple(conteo.restantes), conteo.repartidas, conteo.corriente, conteo.vistas),
+        )
+
+    def restaurar(self, instantanea):
+        """
+        Devuelve la mesa al estado de una instantánea. Los jugadores se
+        conservan (solo cambian sus manos), así que las referencias a ellos
+        siguen siendo válidas. La mesa debe tener los mismos asientos y el
+        mismo generador (semilla y flujo) que cuando se capturó.
+
+        Parámetros:
+        - instantanea (Instantanea): Estado capturado con capturar().
+        """
+
+        if len(instantanea.manos) != self.asientos + 1:
+            raise ValueError("La instantánea es de una mesa con otro número de asientos")
+        baraja = self.baraja
+        baraja.cartas = instantanea.cartas
+        baraja.posicion = instantanea.posicion
+        rng = baraja.rng
+        if hasattr(rng, "situar"):
+            if rng.mezclas != instantanea.azar:
+                rng.situar(instantanea.azar)
+        else:
+            rng.setstate(instantanea.azar)
+        for jugador, (mano, visibles, puntos, empaquetada, plantado, apuesta) in zip((*self.jugadores, self.banca), instantanea.manos):
+            jugador.mano = list(mano)
+            jugador.visibles = list(visibles)
+            jugador.puntos = puntos
+            jugador.empaquetada = empaquetada
+            jugador.plantado = plantado
+            jugador.apuesta = apuesta
+        if baraja.conteo is not None and instantanea.conteo is not None:
+            conteo = baraja.conteo
+            restantes, conteo.repartidas, conteo.corriente, conteo.vistas = instantanea.conteo
+            conteo.restantes = list(restantes)
+
+    def reiniciar(self):
+        """
+        Reinicia el juego restableciendo la baraja y creando nuevos jugadores.
+        La baraja se mezcla también si no quedan cartas para el reparto
+        inicial de todos los asientos.
+        """
+
+        self.baraja.reiniciar(2 * (self.asientos + 1))  # Restablece la baraja
+        self.sentar()
+
+
+class Blackjack(Mesa):
+    """
+    Clase que representa el juego de Blackjack con un solo jugador.
+
+    Es una Mesa de un asiento que conserva el reparto inicial clásico: dos
+    cartas al jugador y dos a la banca.
+
+    Atributos:
+    - baraja (Mazo): La baraja de cartas utilizada en el juego.
+    - humano (Jugador): El jugador humano.
+    - banca (Jugador): El jugador que representa la banca del casino.
+    - reglas (Reglas): Reglas de la mesa.
+    """
+
+    def __init__(self, baraja=None, reglas=None):
+        """
+        Inicializa una nueva instancia del juego de Blackjack.
+
+        Parámetros:
+        - baraja (Mazo): La baraja de cartas que se utilizará en el juego.
+          Si no se indica, se crea una nueva.
+        - reglas (Reglas): Reglas de la mesa, por defecto las estándar.
+        """
+
+        super().__init__(baraja, reglas, 1)
+
+    def ordenReparto(self):
+        """
+        Orden del reparto inicial: dos cartas al jugador y dos a la banca, la
+        segunda de ellas boca abajo.
+
+        Retorna:
+        - list: Pares (jugador, voltear) en orden de reparto.
+        """
+
+        return [(self.humano, True), (self.humano, True), (self.banca, True), (self.banca, False)]
+
+
+def comprobar_tablas():
+    """
+    Comprueba las tablas de puntuación y de resultados contra las reglas
+    calculadas de otra forma, en todas las manos alcanzables: las que se
+    obtienen pidiendo carta mientras la puntuación no llegue a 21, con
+    cualquier número de barajas.
+
+    Retorna:
+    - dict: Manos y pares de puntuaciones comprobados.
+
+    Lanza:
+    - ValueError: Si alguna mano o algún resultado no coincide.
+    """
+
+    # Carta de cada valor (1 = As, 10 = Diez)
+    cartas = {valor: valor - 1 for valor in range(1, 11)}
+    manos = set()
+    pendientes = [()]
+    while pendientes:
+        base = pendientes.pop()
+        for valor in range(1, 11):
+            mano = tuple(sorted(base + (valor,)))
+            if mano in manos:
+                continue
+            manos.add(mano)
+            duras = sum(mano)
+            # Referencia: la mayor suma que no se pasa contando cada as como 1 u 11
+            puntos = max((duras + 10 * k for k in range(mano.count(1) + 1) if duras + 10 * k <= 21), default=duras)
+            jugador = Jugador("Prueba")
+            for v in mano:
+                jugador.sumar(cartas[v])
+            recalculado = Jugador("Prueba")
+            recalculado.mano = jugador.mano[:]
+            recalculado.visibles = jugador.visibles[:]
+            recalculado.calcular()
+            for j in (jugador, recalculado):
+                if (j.puntos, j.is_soft, j.is_bust, j.duras, j.ases) != (puntos, puntos != duras, duras > 21, duras, mano.count(1)):
+                    raise ValueError(f"Puntuación incorrecta de la mano {mano}: {j.puntos}")
+            if puntos < 21:
+                pendientes.append(mano)
+
+    # Resultados: todas las puntuaciones finales alcanzables contra todas
+    finales = sorted({PUNTOS[sum(EMPAQUETADAS[cartas[v]] for v in mano)] for mano in manos})
+    mesa = Blackjack()
+    for jugador in finales:
+        for banca in finales:
+            if jugador > 21:
+                esperado = 2
+            elif banca > 21:
+                esperado = 1
+            elif jugador != banca:
+                esperado = 1 if jugador > banca else 2
+            else:
+                esperado = 0
+            mesa.humano.puntos, mesa.banca.puntos = jugador, banca
+            if mesa.ganador() != esperado or mesa.resultados() != [esperado]:
+                raise ValueError(f"Resultado incorrecto con {jugador} contra {banca}")
+    return {"manos": len(manos), "pares": len(finales) ** 2}
@@ -0,0 +1,145 @@
+"""
+Distribución exacta del resultado final de la banca.
+
+Calcula, para una carta visible de la banca y la composición restante del
+zapato, la probabilidad de cada puntuación final de la banca, de pasarse y de
+hacer blackjack. Sigue la regla de ``Blackjack.plantaBanca``: la banca se
+planta con 17 o más o si supera al jugador, así que la puntuación del jugador
+es parte de la consulta y la banca puede plantarse por debajo de 17. Ambos
+criterios pueden ajustarse con los parámetros de ``Reglas``.
+
+La recursión sobre los conteos de cartas restantes está memorizada con una
+caché LRU acotada, de modo que las consultas repetidas durante un zapato
+cuestan microsegundos.
+"""
+
+from functools import lru_cache
+
+from motor import TOTAL_CARTAS, VALORES
+
+# Claves de la distribución además de las puntuaciones
+PASADA = "pasada"
+BLACKJACK = "blackjack"
+# Tamaño máximo de la caché de la recursión
+TAMANO_CACHE = 1 << 18
+
+_PASADA = 22  # Índice de la probabilidad de pasarse en los vectores internos
+
+
+def composicion(cartas=None, mazos=1):
+    """
+    Cuenta las cartas por valor (As, 2, ..., 9, 10/figuras).
+
+    Parámetros:
+    - cartas (iterable): Cartas del motor a contar, por ejemplo
+      ``Mazo.pendientes()``. Por defecto, un zapato completo.
+    - mazos (int): Número de barajas del zapato completo, por defecto 1.
+
+    Retorna:
+    - tuple: Diez conteos, del As (índice 0) a las cartas de valor 10 (índice 9).
+    """
+
+    conteo = [0] * 10
+    for carta in (range(TOTAL_CARTAS) if cartas is None else cartas):
+        conteo[VALORES[carta] - 1] += 1
+    if cartas is None:
+        conteo = [n * mazos for n in conteo]
+    return tuple(conteo)
+
+
+def quitar(conteo, valor):
+    """
+    Retira una carta de una composición.
+
+    Parámetros:
+    - conteo (tuple): Composición por valor.
+    - valor (int): Valor de la carta a retirar (1 para el As, 10 para figuras).
+
+    Retorna:
+    - tuple: La nueva composición.
+    """
+
+    i = valor - 1
+    return conteo[:i] + (conteo[i] - 1,) + conteo[i + 1:]
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def _final(duras, ases, conteo, jugador, planta, supera):
+    # Vector de probabilidades de la banca desde una mano sin blackjack
+    puntos = duras + 10 if ases and duras <= 11 else duras
+    resultado = [0.0] * 23
+    if puntos > 21:
+        resultado[_PASADA] = 1.0
+        return tuple(resultado)
+    total = sum(conteo)
+    # Se planta con 17 o más, si supera al jugador o si no quedan cartas
+    if puntos >= planta or (supera and puntos > jugador) or total == 0:
+        resultado[puntos] = 1.0
+        return tuple(resultado)
+    for i, n in enumerate(conteo):
+        if n:
+            p = n / total
+            siguiente = _final(duras + i + 1, ases or i == 0, conteo[:i] + (n - 1,) + conteo[i + 1:], jugador, planta, supera)
+            for k, q in enumerate(siguiente):
+                if q:
+                    resultado[k] += p * q
+    return tuple(resultado)
+
+
+def distribucion_banca(visible, conteo, jugador, planta=17, supera=True):
+    """
+    Calcula la distribución exacta del resultado final de la banca.
+
+    Parámetros:
+    - visible (int): Valor de la carta visible de la banca (1 para el As,
+      10 para figuras).
+    - conteo (tuple): Composición restante del zapato, sin la carta visible.
+    - jugador (int): Puntuación con la que se ha plantado el jugador. Si
+      supera 21, la banca solo voltea su carta.
+    - planta (int): Puntuación con la que se planta la banca, por defecto 17.
+    - supera (bool): Si la banca se planta al superar al jugador, por defecto True.
+
+    Retorna:
+    - dict: Probabilidad de cada puntuación final (int), de PASADA y de
+      BLACKJACK. Solo incluye los resultados posibles.
+    """
+
+    return dict(_distribucion(visible, conteo, jugador, planta, supera))
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def _distribucion(visible, conteo, jugador, planta, supera):
+    # Pares (resultado, probabilidad) de distribucion_banca
+    total = sum(conteo)
+    distribucion = {}
+    for i, n in enumerate(conteo):
+        if not n:
+            continue
+        p = n / total
+        duras = visible + i + 1
+        ases = visible == 1 or i == 0
+        # Blackjack: 21 con las dos primeras cartas
+        if ases and duras == 11:
+            distribucion[BLACKJACK] = distribucion.get(BLACKJACK, 0.0) + p
+            continue
+        if jugador > 21:
+            puntos = duras + 10 if ases and duras <= 11 else duras
+            distribucion[puntos] = distribucion.get(puntos, 0.0) + p
+            continue
+        siguiente = _final(duras, ases, conteo[:i] + (n - 1,) + conteo[i + 1:], jugador, planta, supera)
+        for k, q in enumerate(siguiente):
+            if q:
+                clave = PASADA if k == _PASADA else k
+                distribucion[clave] = distribucion.get(clave, 0.0) + p * q
+    return tuple(distribucion.items())
+
+
+def estadisticas_cache():
+    """ Retorna la información de la caché de la recursión (aciertos, fallos, tamaño). """
+    return _final.cache_info()
+
+
+def limpiar_cache():
+    """ Vacía las cachés de las consultas y de la recursión. """
+    _distribucion.cache_clear()
+    _final.cache_clear()
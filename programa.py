@@ -1,189 +1,102 @@
 import sys
+import time
+_inicio = time.perf_counter()  # Referencia para --profile-startup
 from PySide6 import QtCore, QtGui, QtWidgets
-from functools import partial
 from helpers import absPath
-from cartas import *
+from azar import GENERADORES, crear
+from cartas import Baraja, ColaAnimaciones
+from motor import Blackjack, Mazo, Mesa, Reglas, VALORES
 
+# Representaciones de la mesa: widgets (cartas.Baraja) o escena (escena.BarajaEscena)
+RENDERS = ("widgets", "escena")
+# Número máximo de líneas del registro en pantalla
+MAX_REGISTRO = 200
+# Resultado de un asiento en el registro (empate, gana, pierde)
+RESULTADOS = ("Empate", "Gana", "Pierde")
 
-class Jugador:
-    """
-    Clase que representa a un jugador en el juego de Blackjack.
-
-    Atributos:
-    - mano: Lista de cartas en la mano del jugador.
-    - nombre: Nombre del jugador.
-    - puntos: Puntuación total de las cartas en la mano.
-    - plantado: Indica si el jugador ha decidido plantarse en el juego.
-    """
-    
-    def __init__(self, nombre):
-        """
-        Inicializa un nuevo jugador con el nombre proporcionado.
-
-        Parámetros:
-        - nombre (str): El nombre del jugador.
-        """
-        
-        self.mano = []  # Lista para almacenar las cartas en la mano del jugador
-        self.nombre = nombre  # Asigna el nombre proporcionado al jugador
-        self.puntos = 0  # Inicializa la puntuación del jugador en 0
-        self.plantado = False  # Inicialmente, el jugador no está plantado en el juego
-    
-    def sumar(self, carta):
-        """
-        Agrega una carta a la mano del jugador y recalcula la puntuación.
 
-        Parámetros:
-        - carta (Carta): La carta que se agrega a la mano del jugador.
-        """
-        
-        self.mano.append(carta)  # Agrega la carta a la mano del jugador
-        self.calcular()  # Recalcula la puntuación total
-    
-    def calcular(self):
-        """
-        Calcula la puntuación total de las cartas en la mano del jugador,
-        considerando la lógica de los ases.
-        """
-        
-        self.puntos = 0 # Reinicia la puntuación
-        # Suma las cartas que no son ases y que son visibles
-        for carta in self.mano:
-            if carta.visible:
-                if carta.nombre not in ["As", "Jota", "Reina", "Rey"]:
-                    self.puntos += carta.numero
-                elif carta.nombre in ["Jota", "Reina", "Rey"]:
-                    self.puntos += 10
-        # Sumamos los ases que son visibles
-        for carta in self.mano:
-            if carta.visible:
-                if carta.nombre == "As":
-                    self.manejar_ases() # Llamada a la función para manejar la lógica de los ases
-    
-    def manejar_ases(self):
-        """
-        Maneja la lógica de los ases en la mano del jugador.
-        Si la suma de los puntos con un as igual a 11 no supera 21, se suma 11; 
-        de lo contrario, se suma 1 por cada as.
-        """
-        
-        for carta in self.mano:
-            if carta.visible and carta.nombre == "As":
-                if self.puntos + 11 <= 21:
-                    self.puntos += 11
-                else:
-                    self.puntos += 1
-                    
-
-    def consultar(self):
-        """
-        Imprime en la consola la información de la mano del jugador,
-        mostrando solo las cartas visibles y la puntuación total.
-        """
-        
-        print(f"{self.nombre}: {[f'{c.nombre} de {c.palo}' for c in self.mano if c.visible]} ({self.puntos})")
-
-
-class Blackjack:
+class MainWindow(QtWidgets.QMainWindow):
     """
-    Clase que representa el juego de Blackjack.
+        Clase principal que representa la ventana principal del juego de 21.
 
-    Atributos:
-    - baraja (Baraja): La baraja de cartas utilizada en el juego.
-    - humano (Jugador): El jugador humano.
-    - banca (Jugador): El jugador que representa la banca del casino.
     """
     
-    def __init__(self, baraja):
+    def __init__(self, mazos=1, penetracion=None, consejos=False, turbo=False, historial=None, asientos=1, semilla=None, generador="mt", conteo=False, metricas=None, render="widgets", almacen=None):
         """
-        Inicializa una nueva instancia del juego de Blackjack.
-
         Parámetros:
-        - baraja (Baraja): La baraja de cartas que se utilizará en el juego.
+        - mazos (int): Número de barajas del zapato, por defecto 1.
+        - penetracion (float): Fracción del zapato que se reparte antes de
+          volver a mezclar. Por defecto, None (mezclar en cada mano).
+        - consejos (bool): Muestra el consejo de la tabla de estrategia junto
+          a los botones. Por defecto, False.
+        - turbo (bool): Coloca las cartas sin animaciones. Por defecto, False.
+        - historial (str): Ruta del fichero JSONL del historial de manos.
+          Por defecto, None (sin historial).
+        - asientos (int): Asientos de la mesa. El primero es el del usuario y
+          el resto los ocupan bots que se plantan con 17. Por defecto, 1.
+        - semilla (int): Semilla del generador de la baraja. Por defecto,
+          None (aleatoria; se anota en el historial para reproducir las manos).
+        - generador (str): Nombre del generador de ``azar``, por defecto "mt".
+        - conteo (bool): Muestra la cuenta Hi-Lo y la penetración del zapato.
+          Por defecto, False.
+        - metricas (Metricas): Métricas activas de ``metricas.activar`` a
+          mostrar en el panel de depuración (F12). Por defecto, None.
+        - render (str): Representación de la mesa, "widgets" (un QLabel por
+          carta) o "escena" (QGraphicsScene). Por defecto, "widgets".
+        - almacen (str): Directorio del ``almacen`` binario donde guardar las
+          manos terminadas. Por defecto, None (no se guardan).
         """
         
-        self.baraja = baraja  # Asigna la baraja proporcionada al juego
-        self.humano = Jugador("Jugador 1")  # Crea un jugador humano con nombre "Jugador 1"
-        self.banca = Jugador("Banca")  # Crea un jugador que representa la banca
-        
-    
-    def repartir(self, jugador, voltear=True):  
-        """
-        Reparte una carta al jugador especificado.
-
-        Parámetros:
-        - jugador (Jugador): El jugador al que se le repartirá la carta.
-        - voltear (bool): Indica si la carta debe mostrarse volteada. Por defecto, True.
-
-        Retorna:
-        - carta (Carta): La carta repartida al jugador.
-        """
-        
-        carta = self.baraja.extraer()  # Extrae una carta de la baraja
-        if carta:
-            if voltear:
-                carta.mostrar()  # Muestra la carta si es necesario voltearla
-            jugador.sumar(carta)  # Añade la carta al jugador
-        return carta
-
-    def ganador(self):
-        """
-        Determina el ganador del juego.
-
-        Retorna:
-        - int: 0 si hay empate, 1 si gana el jugador humano, o 2 si gana la banca.
-        """
-        
-        if self.humano.puntos > 21:
-            return 2
-        if self.banca.puntos > 21:
-            return 1
-        if self.humano.puntos > self.banca.puntos:
-            return 1
-        elif self.banca.puntos > self.humano.puntos:
-            return 2
-        else:
-            return 0
-    
-    def comprobarGanador(self):
-        """
-        Imprime en la consola el resultado del juego (Ganador, Perdedor o Empate).
-        """
-        
-        ganador = self.ganador()
-        if ganador == 2:
-            print("Gana la banca")
-        elif ganador == 1:
-            print("Gana el jugador")
-        else:
-            print("Empate")      
-    
-    def reiniciar(self):
-        """
-        Reinicia el juego restableciendo la baraja y creando nuevos jugadores.
-        """
-        
-        self.baraja.reiniciar()  # Restablece la baraja
-        self.humano = Jugador("Jugador 1")  # Crea un nuevo jugador humano
-        self.banca = Jugador("Banca")  # Crea un nuevo jugador que representa la banca 
-        
-              
-class MainWindow(QtWidgets.QMainWindow):
-    """
-        Clase principal que representa la ventana principal del juego de 21.
-
-    """
-    
-    def __init__(self):
         super().__init__()
         # Configuramos la ventana y el fondo
         self.setWindowTitle("21")
         self.setFixedSize(900, 630)
-        # Configuración de la baraja
-        self.baraja = Baraja(self)
+        # Crear el juego (motor sin interfaz)
+        # Conteo de cartas del zapato (opcional)
+        self.conteo = None
+        if conteo:
+            from conteo import Conteo
+            self.conteo = Conteo(mazos)
+        mazo = Mazo(crear(generador, semilla), mazos, penetracion, self.conteo)
+        if asientos == 1:
+            self.bj = Blackjack(mazo, Reglas(mazos=mazos))
+        else:
+            self.bj = Mesa(mazo, Reglas(mazos=mazos), asientos)
+        # Política de los bots de los demás asientos
+        self.politica = None
+        if asientos > 1:
+            from simulacion import PlantarseEn
+            self.politica = PlantarseEn()
+        # Historial de manos en segundo plano (opcional)
+        self.historial = None
+        if historial:
+            from historial import Historial
+            self.historial = Historial(historial)
+        # Almacén binario de manos (opcional)
+        self.almacen = None
+        if almacen:
+            from almacen import Escritor
+            self.almacen = Escritor(almacen, semilla=semilla)
+        # Tabla de estrategia para los consejos (opcional)
+        self.tabla = None
+        if consejos:
+            from estrategia import TablaEstrategia
+            self.tabla = TablaEstrategia(self.bj.reglas)
+        self.metricas = metricas
+        # Configuración de la baraja (widgets de las cartas del motor)
+        if render == "escena":
+            from escena import BarajaEscena
+            self.baraja = BarajaEscena(self, self.bj.baraja)
+        else:
+            self.baraja = Baraja(self, self.bj.baraja)
         self.setCentralWidget(self.baraja)
-        # Crear el juego
-        self.bj = Blackjack(self.baraja)
+        # Cola de animaciones: la interfaz alcanza al motor paso a paso
+        self.cola = ColaAnimaciones(self, turbo)
+        self.cola.terminada.connect(self.alTerminarCola)
+        # fINALIZACIÓN
+        self.finalizado = False
+        # Estados anteriores a cada decisión del usuario en la mano (deshacer)
+        self.instantaneas = []
         # Interfaz (después de asignar el widget central para sobreponerla)
         self.setupUi()
         # Posicionamos las cartas y hacemos el reparto inicial
@@ -192,23 +105,24 @@ class MainWindow(QtWidgets.QMainWindow):
         self.btnPedir.clicked.connect(self.pedir)
         self.btnPlantar.clicked.connect(self.plantar)
         self.btnReiniciar.clicked.connect(self.reiniciar)
-        # fINALIZACIÓN
-        self.finalizado = False
+        self.btnDeshacer.clicked.connect(self.deshacer)
 
     def preparar(self):
         """ Posiciona la baraja inicial y ejecuta los primeros repartos"""
-        self.registro.append(f"== Inicio ==")
-        offset = 0
-        for carta in self.baraja.cartas:
-            carta.posicionar(45 + offset, 205 + offset)
-            offset += 0.25
-        # activar los botones
-        self.habilitar_botones()
+        self.anotar("== Inicio ==")
+        rng = self.bj.baraja.rng
+        self.evento("inicio", mazos=self.bj.reglas.mazos, generador=rng.nombre, semilla=rng.semilla,
+                    mezcla=rng.mezclas - 1, posicion=self.bj.baraja.posicion)
+        # Cartas de cada mano en la interfaz
+        self.manos = {jugador: [] for jugador in self.bj.jugadores}
+        self.manos[self.bj.banca] = []
+        self.baraja.apilar(45, 205)
+        self.actualizarConteo()  # El zapato puede haberse mezclado
+        # los botones se activan al terminar el reparto
+        self.deshabilitar_botones()
         # Haremos el reparto inicial de cartas
-        self.repartir(self.bj.humano)
-        self.repartir(self.bj.humano)
-        self.repartir(self.bj.banca)
-        self.repartir(self.bj.banca, False)
+        for jugador, voltear in self.bj.ordenReparto():
+            self.repartir(jugador, voltear)
 
     def repartir(self, jugador, voltear=True):
         """
@@ -217,102 +131,321 @@ class MainWindow(QtWidgets.QMainWindow):
         Parámetros:
         - jugador (Jugador): Jugador al que se le repartirá la carta.
         - voltear (bool): True para mostrar la carta, False para ocultarla.
+
+        Retorna:
+        - int or None: La carta repartida (None si no queda ninguna fuera de la mesa).
+        """
+        
+        codigo = self.bj.repartir(jugador, voltear)
+        if codigo is not None:
+            self.mostrarReparto(jugador, codigo, voltear)
+        return codigo
+
+    def mostrarReparto(self, jugador, codigo, voltear=True):
+        """
+        Anota y anima una carta que el motor ya ha repartido.
+
+        Parámetros:
+        - jugador (Jugador): Jugador que ha recibido la carta.
+        - codigo (int): Carta del motor.
+        - voltear (bool): True si la carta está boca arriba.
+        """
+        
+        self.evento("reparto", jugador=jugador.nombre, carta=codigo, visible=voltear, puntos=jugador.puntos)
+        carta = self.baraja.sacar(codigo)
+        self.manos[jugador].append(carta)
+        if voltear:
+            self.cola.llamar(carta.mostrar)  # Muestra la carta si es necesario voltearla
+            self.actualizarConteo()
+        x, y, escalado = self.destino(jugador, len(jugador.mano))
+        self.cola.mover(carta, x, y, escalado=escalado)
+        if jugador in (self.bj.humano, self.bj.banca):
+            self.cola.llamar(self.marcadores, self.bj.humano.puntos, self.bj.banca.puntos)
+        else:
+            self.cola.llamar(self.marcadorAsiento, self.bj.jugadores.index(jugador), jugador.puntos)
+
+    def destino(self, jugador, n):
+        """
+        Posición de una carta en la mesa.
+
+        Parámetros:
+        - jugador (Jugador): Dueño de la carta.
+        - n (int): Número de la carta en la mano (1 la primera).
+
+        Retorna:
+        - tuple: Coordenadas (x, y) y escala de la carta.
         """
         
-        carta = self.bj.repartir(jugador, voltear)
         if jugador == self.bj.humano:
-            offset_x = len(self.bj.humano.mano) * 40
-            carta.mover(195+offset_x, 320, duracion=750)
-        elif jugador == self.bj.banca:
-            offset_x = len(self.bj.banca.mano) * 25
-            carta.mover(251+offset_x, 110, duracion=750, escalado=0.8)
-        self.marcadores()
+            # Con más asientos las cartas se juntan para dejar sitio a los bots
+            return 195 + n * (40 if self.bj.asientos == 1 else 25), 320, 1
+        if jugador == self.bj.banca:
+            return 251 + n * 25, 110, 0.8
+        # Asientos de los bots: una fila pequeña por asiento a la derecha
+        return 498 + n * 14, 80 * self.bj.jugadores.index(jugador), 0.4
 
 
     def pedir(self):
         """ Desactiva los botones de la interfaz y pide una carta """
         self.deshabilitar_botones()
+        self.instantaneas.append(self.bj.capturar())
         self.repartir(self.bj.humano)
         self.comprobar()
     
     def comprobar(self):
         """
-        Comprueba la puntuación del jugador y habilita los botones correspondientes.
+        Comprueba la puntuación del jugador y, si llega a 21 o se pasa, juega la banca.
         """
         
-        self.habilitar_botones()
         if self.bj.humano.puntos >= 21:
             self.bj.humano.plantado = True
+            self.evento("plantado", jugador=self.bj.humano.nombre, puntos=self.bj.humano.puntos)
             self.jugarBanca()
 
     def plantar(self):
         """ Planta al usuario e inicia la jugada de la banca """
         self.deshabilitar_botones()
+        self.instantaneas.append(self.bj.capturar())
         self.bj.humano.plantado = True
+        self.evento("plantado", jugador=self.bj.humano.nombre, puntos=self.bj.humano.puntos)
         self.jugarBanca()
     
     def jugarBanca(self):
         """
-        Lógica de la jugada de la banca, incluyendo la animación de las cartas.
+        Lógica de la jugada de la banca. El motor resuelve la jugada
+        (Mesa.turnoBanca) y las animaciones de las cartas se encolan en orden.
         """
         
-        if self.bj.humano.puntos > 21:
-            self.bj.banca.plantado = True 
-            self.mostrar_cartas_banca()
-        else:
-            # si la banca tiene dos cartas voltearemos la segunda y calcularemos su puntuación
-            if len(self.bj.banca.mano) == 2:
-                self.bj.banca.mano[-1].mostrar()
-                self.bj.banca.calcular()
-                # además actualizamos el marcador
-                self.marcadores()
-            # si la banca tiene 17 puntos o más la plantamos
-            # o si la banca tiene más puntos que el jugador
-            if self.bj.banca.puntos >= 17 or self.bj.banca.puntos > self.bj.humano.puntos:
-                self.bj.banca.plantado = True
-            # si la banca no se ha plantado, le repartiremos una carta
-            if not self.bj.banca.plantado:
-                self.repartir(self.bj.banca)
-                self.jugarBanca()
+        # los bots de los demás asientos juegan antes que la banca
+        self.jugarBots()
+        # voltearemos las cartas de la banca y calcularemos su puntuación
+        self.mostrar_cartas_banca()
+        # el motor decide cuándo se planta la banca; cada carta se anima al repartirla
+        for codigo in self.bj.turnoBanca():
+            self.mostrarReparto(self.bj.banca, codigo)
+        datos = {"resultados": self.bj.resultados()} if self.bj.asientos > 1 else {}
+        self.evento("resultado", ganador=self.bj.ganador(), jugador=self.bj.humano.puntos, banca=self.bj.banca.puntos, **datos)
         # comprobamos el ganador siempre al final del turno de la banca
-        self.ganador()
-        self.habilitar_botones()
+        self.cola.llamar(self.ganador)
 
 
+    def jugarBots(self):
+        """
+        Juega el turno de los asientos de los bots según su política.
+        """
+        
+        visible = self.bj.banca.mano[0]
+        for jugador in self.bj.jugadores[1:]:
+            while jugador.puntos < 21 and self.politica(jugador, visible):
+                if self.repartir(jugador) is None:
+                    break
+            jugador.plantado = True
+            self.evento("plantado", jugador=jugador.nombre, puntos=jugador.puntos)
+
     def reiniciar(self):
         # Reiniciar el juego: esconder, reestablecer y mezclar las cartas
+        self.cola.vaciar()
         self.finalizado = False
         self.marcadorJugador.setText("0")
         self.marcadorBanca.setText("0")
-        self.registro.setText("")
+        for marcador in self.marcadoresAsientos:
+            marcador.setText("")
+        self.registro.clear()
+        self.instantaneas.clear()
+        self.baraja.reiniciar()
         self.bj.reiniciar()
         self.preparar()
+
+    def deshacer(self):
+        """
+        Devuelve la mano al estado anterior a la última decisión del usuario
+        (pedir o quedarse). Una mano ya liquidada no se deshace: su resultado
+        ya está anotado en el almacén, en el historial y en las métricas.
+        """
         
-    def marcadores(self):
+        if self.finalizado or not self.instantaneas:
+            return
+        self.cola.vaciar()
+        self.bj.restaurar(self.instantaneas.pop())
+        self.finalizado = False
+        self.anotar("== Deshacer ==")
+        self.evento("deshacer", jugador=self.bj.humano.nombre, puntos=self.bj.humano.puntos, posicion=self.bj.baraja.posicion)
+        self.redibujar()
+        self.alTerminarCola()
+
+    def redibujar(self):
+        """
+        Vuelve a colocar, sin animaciones, las cartas de todas las manos según
+        el estado del motor.
+        """
+        
+        self.baraja.reiniciar()
+        self.manos = {jugador: [] for jugador in self.bj.jugadores}
+        self.manos[self.bj.banca] = []
+        self.baraja.apilar()
+        for jugador, cartas in self.manos.items():
+            for n, (codigo, visible) in enumerate(zip(jugador.mano, jugador.visibles), 1):
+                carta = self.baraja.sacar(codigo)
+                if visible:
+                    carta.mostrar()
+                carta.colocar(*self.destino(jugador, n))
+                cartas.append(carta)
+        for asiento, jugador in enumerate(self.bj.jugadores[1:], 1):
+            self.marcadorAsiento(asiento, jugador.puntos)
+        self.marcadores()
+        self.actualizarConteo()
+        
+    def marcadores(self, puntosJugador=None, puntosBanca=None):
         """
         Actualiza los marcadores de puntuación en la interfaz.
+
+        Parámetros:
+        - puntosJugador (int): Puntuación a mostrar del jugador, por defecto la actual.
+        - puntosBanca (int): Puntuación a mostrar de la banca, por defecto la actual.
+        """
+        
+        if puntosJugador is None:
+            puntosJugador = self.bj.humano.puntos
+        if puntosBanca is None:
+            puntosBanca = self.bj.banca.puntos
+        self.marcadorJugador.setText(f"{puntosJugador}")
+        self.marcadorBanca.setText(f"{puntosBanca}")
+        self.anotar(f"{self.bj.humano.nombre} [{puntosJugador}], {self.bj.banca.nombre} [{puntosBanca}]")
+
+    def marcadorAsiento(self, asiento, puntos):
+        """
+        Actualiza el marcador de un asiento de bot.
+
+        Parámetros:
+        - asiento (int): Índice del asiento (1 en adelante).
+        - puntos (int): Puntuación a mostrar.
+        """
+        
+        self.marcadoresAsientos[asiento - 1].setText(f"J{asiento + 1}: {puntos}")
+
+    def actualizarConteo(self):
+        """
+        Encola la actualización del panel de conteo con la cuenta actual del
+        motor, para que cambie al voltearse la carta en la interfaz.
+        """
+        
+        if self.conteo is not None:
+            conteo = self.conteo
+            self.cola.llamar(self.marcadorConteo, conteo.corriente, conteo.verdadera(), conteo.penetracion(), conteo.cartasRestantes())
+
+    def marcadorConteo(self, corriente, verdadera, penetracion, restantes):
+        """
+        Actualiza el panel de conteo.
+
+        Parámetros:
+        - corriente (int): Cuenta Hi-Lo corriente.
+        - verdadera (float): Cuenta verdadera.
+        - penetracion (float): Fracción del zapato repartida.
+        - restantes (int): Cartas que quedan en el zapato.
         """
         
-        self.marcadorJugador.setText(f"{self.bj.humano.puntos}")
-        self.marcadorBanca.setText(f"{self.bj.banca.puntos}")
-        self.registro.append(f"{self.bj.humano.nombre} [{self.bj.humano.puntos}], {self.bj.banca.nombre} [{self.bj.banca.puntos}]")
+        self.panelConteo.setText(f"Cuenta: {corriente:+d} (verdadera {verdadera:+.1f})\n"
+                                 f"Penetración: {penetracion:.0%} ({restantes} cartas)")
+
+    def actualizarMetricas(self):
+        """
+        Actualiza el panel de depuración con las métricas de la sesión.
+        """
+        
+        if self.panelMetricas.isVisible():
+            self.panelMetricas.setText(self.metricas.resumen())
+            self.panelMetricas.raise_()  # Por encima de las cartas movidas
+
+    def alternarMetricas(self):
+        """
+        Muestra u oculta el panel de depuración.
+        """
+        
+        self.panelMetricas.setVisible(not self.panelMetricas.isVisible())
+        self.actualizarMetricas()
+
+    def anotar(self, texto):
+        """
+        Añade una línea al registro en pantalla y lo desplaza al final.
+
+        Parámetros:
+        - texto (str): Línea a añadir.
+        """
+        
+        self.registro.appendPlainText(texto)
         self.registro.verticalScrollBar().setValue(self.registro.verticalScrollBar().maximum())
 
+    def evento(self, tipo, **datos):
+        """
+        Envía un evento al historial de manos, si está activo.
+
+        Parámetros:
+        - tipo (str): Tipo de evento.
+        - datos: Campos del evento.
+        """
+        
+        if self.historial is not None:
+            self.historial.registrar(tipo, **datos)
+
+    def alTerminarCola(self):
+        """
+        Cuando la interfaz alcanza al motor, habilita los botones y actualiza el consejo.
+        """
+        
+        self.habilitar_botones()
+        self.aconsejar()
+
+    def aconsejar(self):
+        """
+        Actualiza el consejo de la tabla de estrategia para la mano del jugador.
+        """
+        
+        if self.tabla is None:
+            return
+        humano = self.bj.humano
+        if humano.plantado or humano.puntos >= 21 or not self.bj.banca.mano:
+            self.consejo.setText("")
+            return
+        visible = VALORES[self.bj.banca.mano[0]]
+        pedir, plantarse = self.tabla.consultar(humano.puntos, humano.is_soft, visible)
+        if pedir > plantarse:
+            self.consejo.setText(f"Consejo: pedir carta ({pedir:+.2f})")
+        else:
+            self.consejo.setText(f"Consejo: quedarse ({plantarse:+.2f})")
+
     def ganador(self):
         """
         Comprueba el ganador y actualiza el registro en la interfaz.
         """
         
         if self.bj.humano.plantado and self.bj.banca.plantado and not self.finalizado:
-            if self.bj.ganador() == 2:
-                self.registro.append(f"== Ganador {self.bj.banca.nombre} ==")
-            elif self.bj.ganador() == 1:
-                self.registro.append(f"== Ganador {self.bj.humano.nombre} ==")
+            # Todos los asientos se resuelven en una sola pasada
+            resultados = self.bj.resultados()
+            if self.almacen is not None:
+                self.almacen.anotar(self.bj, resultados)
+            if resultados[0] == 2:
+                self.anotar(f"== Ganador {self.bj.banca.nombre} ==")
+            elif resultados[0] == 1:
+                self.anotar(f"== Ganador {self.bj.humano.nombre} ==")
             else:
-                self.registro.append(f"====== Empate ======")
-            self.registro.verticalScrollBar().setValue(self.registro.verticalScrollBar().maximum())
+                self.anotar(f"====== Empate ======")
+            for jugador, resultado in zip(self.bj.jugadores[1:], resultados[1:]):
+                self.anotar(f"{jugador.nombre}: {RESULTADOS[resultado]} [{jugador.puntos}]")
             self.finalizado = True
+            # La mano liquidada se anota una sola vez: no se puede deshacer
+            self.instantaneas.clear()
     
+    def closeEvent(self, event):
+        """
+        Escribe el historial y las manos pendientes antes de cerrar la ventana.
+        """
+        
+        if self.historial is not None:
+            self.historial.cerrar()
+        if self.almacen is not None:
+            self.almacen.cerrar()
+        super().closeEvent(event)
+
     def habilitar_botones(self):
         """
         Habilita los botones de la interfaz.
@@ -321,6 +454,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.btnPedir.setEnabled(True)
         self.btnPlantar.setEnabled(True)
         self.btnReiniciar.setEnabled(True)
+        self.btnDeshacer.setEnabled(bool(self.instantaneas))
     
     def deshabilitar_botones(self):
         """
@@ -330,18 +464,22 @@ class MainWindow(QtWidgets.QMainWindow):
         self.btnPedir.setEnabled(False)
         self.btnPlantar.setEnabled(False)
         self.btnReiniciar.setEnabled(False)
+        self.btnDeshacer.setEnabled(False)
     
     def mostrar_cartas_banca(self):
-        # Mostrar las cartas de la banca cuando el jugador ha perdido
-        for carta in self.bj.banca.mano:
-            carta.mostrar()
-        self.bj.banca.calcular()
-        self.marcadores()
+        # Mostrar las cartas de la banca al comenzar su turno
+        for i, carta in enumerate(self.manos[self.bj.banca]):
+            if not self.bj.banca.visibles[i]:
+                self.bj.revelar(self.bj.banca, i)
+                self.evento("volteo", jugador=self.bj.banca.nombre, carta=self.bj.banca.mano[i], puntos=self.bj.banca.puntos)
+                self.cola.llamar(carta.mostrar)
+                self.actualizarConteo()
+        self.cola.llamar(self.marcadores, self.bj.humano.puntos, self.bj.banca.puntos)
 
 
     def setupUi(self):
         self.setStyleSheet("""
-            QTextEdit {background-color: #ddd; font-size:13px }
+            QPlainTextEdit {background-color: #ddd; font-size:13px }
             QLabel { color: white; font-size: 40px; font-weight: 500 }
             QPushButton { background-color: #20581e; color: white;font-size: 15px }
             QPushButton:disabled { background-color: #163914 }""")
@@ -367,15 +505,126 @@ class MainWindow(QtWidgets.QMainWindow):
         self.btnReiniciar = QtWidgets.QPushButton("Reiniciar", self)
         self.btnReiniciar.resize(175, 32)
         self.btnReiniciar.move(692, 575)
+        self.btnDeshacer = QtWidgets.QPushButton("Deshacer", self)
+        self.btnDeshacer.resize(175, 26)
+        self.btnDeshacer.move(692, 254)
         # Texto para el registro
-        self.registro = QtWidgets.QTextEdit(self)
+        self.registro = QtWidgets.QPlainTextEdit(self)
         self.registro.setReadOnly(True)
+        self.registro.setMaximumBlockCount(MAX_REGISTRO)  # Se descartan las líneas más antiguas
         self.registro.move(692, 285)
         self.registro.resize(175, 185)
+        # Consejo de la tabla de estrategia
+        self.consejo = QtWidgets.QLabel("", self)
+        self.consejo.setStyleSheet("font-size: 12px; font-weight: 400")
+        self.consejo.move(692, 472)
+        self.consejo.resize(175, 20)
+        # Marcadores de los asientos de los bots
+        self.marcadoresAsientos = []
+        for asiento in range(1, self.bj.asientos):
+            marcador = QtWidgets.QLabel("", self)
+            marcador.setStyleSheet("font-size: 12px; font-weight: 400")
+            marcador.move(440, 80 * asiento + 30)
+            marcador.resize(56, 20)
+            self.marcadoresAsientos.append(marcador)
+        # Panel de conteo de cartas (opcional)
+        if self.conteo is not None:
+            self.panelConteo = QtWidgets.QLabel("", self)
+            self.panelConteo.setStyleSheet("font-size: 12px; font-weight: 400")
+            self.panelConteo.move(20, 560)
+            self.panelConteo.resize(220, 40)
+        # Panel de depuración con las métricas (opcional, F12 lo alterna)
+        if self.metricas is not None:
+            self.panelMetricas = QtWidgets.QLabel("", self)
+            self.panelMetricas.setStyleSheet("background-color: rgba(0, 0, 0, 170); font-family: monospace;"
+                                             "font-size: 11px; font-weight: 400; padding: 4px")
+            self.panelMetricas.setAlignment(QtCore.Qt.AlignTop | QtCore.Qt.AlignLeft)
+            self.panelMetricas.move(10, 75)
+            self.panelMetricas.resize(370, 140)
+            QtGui.QShortcut(QtGui.QKeySequence("F12"), self, self.alternarMetricas)
+            self.temporizadorMetricas = QtCore.QTimer(self)
+            self.temporizadorMetricas.timeout.connect(self.actualizarMetricas)
+            self.temporizadorMetricas.start(1000)
  
 
+def perfil_arranque(importado, construido, ventana):
+    """
+    Imprime el desglose del tiempo de arranque al llegar el primer fotograma.
+
+    Parámetros:
+    - importado (float): Instante en que terminan las importaciones.
+    - construido (float): Instante en que termina de construirse la ventana.
+    - ventana (MainWindow): Ventana ya mostrada.
+    """
+    
+    def informe():
+        pintado = time.perf_counter()
+        print(f"Importación:     {(importado - _inicio) * 1000:8.1f} ms", file=sys.stderr)
+        print(f"Construcción:    {(construido - importado) * 1000:8.1f} ms", file=sys.stderr)
+        print(f"Primer pintado:  {(pintado - construido) * 1000:8.1f} ms", file=sys.stderr)
+        print(f"Total:           {(pintado - _inicio) * 1000:8.1f} ms", file=sys.stderr)
+
+    # El temporizador a 0 se ejecuta tras procesar los eventos de pintado pendientes
+    QtCore.QTimer.singleShot(0, informe)
+
+
 if __name__ == '__main__':
-    app = QtWidgets.QApplication(sys.argv)
-    window = MainWindow()
+    import argparse
+    from autojuego import POLITICAS
+    parser = argparse.ArgumentParser(description="Juego de 21")
+    parser.add_argument("--mazos", type=int, default=1, help="Número de barajas del zapato")
+    parser.add_argument("--penetracion", type=float, default=None, help="Fracción del zapato repartida antes de mezclar")
+    parser.add_argument("--consejos", action="store_true", help="Muestra el consejo de la tabla de estrategia")
+    parser.add_argument("--turbo", action="store_true", help="Coloca las cartas sin animaciones")
+    parser.add_argument("--historial", default=None, help="Fichero JSONL donde guardar el historial de manos (por defecto, ninguno)")
+    parser.add_argument("--sin-historial", action="store_true", help="No guarda el historial de manos aunque se indique --historial")
+    parser.add_argument("--almacen", default=None, help="Directorio donde guardar las manos en formato binario (ver almacen.py)")
+    parser.add_argument("--asientos", type=int, default=1, help="Asientos de la mesa (1-7); los demás asientos los juegan bots")
+    parser.add_argument("--semilla", type=int, default=None, help="Semilla de la baraja (por defecto, aleatoria)")
+    parser.add_argument("--generador", choices=sorted(GENERADORES), default="mt", help="Generador para mezclar")
+    parser.add_argument("--conteo", action="store_true", help="Muestra la cuenta Hi-Lo y la penetración del zapato")
+    parser.add_argument("--metricas", action="store_true", help="Mide la sesión y muestra el panel de depuración (F12)")
+    parser.add_argument("--exportar-metricas", default=None, help="Fichero donde exportar las métricas (.json o texto de Prometheus)")
+    parser.add_argument("--intervalo-metricas", type=float, default=10.0, help="Segundos entre exportaciones de las métricas")
+    parser.add_argument("--render", choices=RENDERS, default="widgets", help="Representación de la mesa")
+    parser.add_argument("--profile-startup", action="store_true", help="Imprime el desglose del tiempo de arranque")
+    parser.add_argument("--autojuego", type=int, default=0, help="Juega estas rondas automáticamente sin pantalla e informa del rendimiento y la memoria")
+    parser.add_argument("--politica", choices=sorted(POLITICAS), default="plantarse", help="Política del juego automático")
+    parser.add_argument("--muestreo", type=int, default=1000, help="Rondas entre muestras del juego automático")
+    parser.add_argument("--animado", action="store_true", help="En el juego automático, ejecuta las animaciones terminándolas al instante")
+    parser.add_argument("--json", action="store_true", help="Imprime las muestras del juego automático en formato JSON")
+    args, resto = parser.parse_known_args()
+    if args.almacen and args.semilla is not None:
+        from almacen import SEMILLAS
+        if args.semilla not in SEMILLAS:
+            parser.error("--semilla debe caber en 64 bits con signo para guardar las manos con --almacen")
+    importado = time.perf_counter()
+    if args.autojuego:
+        import os
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QtWidgets.QApplication(sys.argv[:1] + resto)
+    historial = None if args.sin_historial else args.historial
+    # Las métricas se instalan antes de crear la ventana (sin ellas no hay coste)
+    metricas = exportador = None
+    if args.metricas or args.exportar_metricas:
+        from metricas import Exportador, activar
+        metricas = activar(MainWindow)
+        if args.exportar_metricas:
+            exportador = Exportador(metricas, args.exportar_metricas, args.intervalo_metricas)
+    window = MainWindow(args.mazos, args.penetracion, args.consejos, args.turbo, historial, args.asientos, args.semilla, args.generador, args.conteo, metricas, args.render, args.almacen)
+    if metricas is not None and not args.metricas:
+        window.panelMetricas.hide()
+    construido = time.perf_counter()
     window.show()
-    sys.exit(app.exec())
+    if args.profile_startup:
+        perfil_arranque(importado, construido, window)
+    if args.autojuego:
+        from autojuego import autojugar
+        autojugar(window, args.autojuego, args.politica, args.muestreo, args.animado, args.json)
+        window.close()
+        codigo = 0
+    else:
+        codigo = app.exec()
+    if exportador is not None:
+        exportador.cerrar()
+    sys.exit(codigo)
@@ -0,0 +1,358 @@
+"""
+Servidor de mesas de Blackjack sin interfaz gráfica.
+
+Aloja muchas mesas independientes de ``motor.Blackjack`` en un solo proceso
+sobre un bucle de asyncio. Los clientes se conectan por TCP o por un socket
+Unix y envían una orden por línea; cada orden recibe una línea JSON de
+respuesta. Las acciones son las de la ventana principal: pedir carta,
+quedarse (la banca juega sin Qt, como en ``MainWindow.jugarBanca``) y
+reiniciar.
+
+Protocolo (una orden por línea):
+    NUEVA                Crea una mesa y hace el reparto inicial.
+    PEDIR <mesa>         Pide carta; con 21 o más juega la banca.
+    PLANTAR <mesa>       Se planta y juega la banca.
+    REINICIAR <mesa>     Empieza una mano nueva en la mesa.
+    ESTADO <mesa>        Consulta el estado de la mesa.
+    CERRAR <mesa>        Libera la mesa.
+    ESTADISTICAS         Mesas, conexiones y acciones del servidor.
+    SALIR                Cierra la conexión.
+
+Respuesta: ``{"ok": true, "mesa": 1, "jugador": {...}, "banca": {...},
+"terminada": false, "ganador": null}`` o ``{"ok": false, "error": "..."}``.
+Las cartas se envían como los enteros del motor; las de la banca que están
+boca abajo se envían como null.
+
+Las mesas pertenecen a la conexión que las crea y se liberan al cerrarla.
+Cada conexión procesa sus órdenes en orden y espera a que el cliente lea la
+respuesta antes de leer la siguiente orden, así que un cliente lento no
+acumula respuestas en memoria. Con Ctrl+C (o SIGTERM) el servidor deja de
+aceptar conexiones, termina la orden en curso de cada conexión y se cierra.
+
+Uso:
+    python servidor.py --puerto 8021
+    python servidor.py --unix /tmp/blackjack.sock
+"""
+
+import argparse
+import asyncio
+import json
+import signal
+import time
+
+from azar import GENERADORES, crear
+from motor import Blackjack, Mazo, Reglas
+
+# Puerto TCP por defecto
+PUERTO = 8021
+# Límites del servidor
+MAX_MESAS = 10_000  # Mesas en todo el servidor
+MAX_MESAS_CONEXION = 256  # Mesas por conexión
+MAX_LINEA = 256  # Bytes por orden
+TIEMPO_INACTIVO = 300  # Segundos sin órdenes antes de cerrar una conexión
+TIEMPO_CIERRE = 5  # Segundos de espera a las conexiones al cerrar
+# Órdenes del protocolo
+ORDENES = {"NUEVA", "PEDIR", "PLANTAR", "REINICIAR", "ESTADO", "CERRAR", "ESTADISTICAS", "SALIR"}
+
+
+class Sesion:
+    """
+    Estado de una mesa del servidor.
+
+    Parámetros:
+    - mesa (int): Identificador de la mesa.
+    - bj (Blackjack): Juego de la mesa.
+
+    Atributos:
+    - terminada (bool): Si la mano actual ya se ha resuelto.
+    - manos (int): Manos jugadas en la mesa.
+    """
+
+    __slots__ = ("mesa", "bj", "terminada", "manos")
+
+    def __init__(self, mesa, bj):
+        self.mesa = mesa
+        self.bj = bj
+        self.terminada = False
+        self.manos = 1
+        self.bj.preparar()  # La baraja nueva ya está mezclada
+
+    def pedir(self):
+        """ Reparte una carta al jugador y, si llega a 21 o se pasa, juega la banca. """
+        if self.terminada:
+            raise ValueError("La mano ha terminado")
+        self.bj.repartir(self.bj.humano)
+        if self.bj.humano.puntos >= 21:
+            self.plantar()
+
+    def plantar(self):
+        """ Planta al jugador y juega el turno completo de la banca. """
+        if self.terminada:
+            raise ValueError("La mano ha terminado")
+        self.bj.humano.plantado = True
+        self.bj.jugarBanca()
+        self.terminada = True
+
+    def reiniciar(self):
+        """ Recoge las cartas y hace el reparto inicial de una mano nueva. """
+        self.bj.reiniciar()
+        self.bj.preparar()
+        self.terminada = False
+        self.manos += 1
+
+    def estado(self):
+        """
+        Retorna el estado de la mesa visible para el jugador.
+
+        Retorna:
+        - dict: Cartas y puntos del jugador y de la banca, si la mano ha
+          terminado y, en ese caso, el ganador.
+        """
+
+        humano, banca = self.bj.humano, self.bj.banca
+        return {
+            "ok": True,
+            "mesa": self.mesa,
+            "jugador": {"cartas": humano.mano, "puntos": humano.puntos, "blanda": humano.is_soft},
+            "banca": {"cartas": [c if v else None for c, v in zip(banca.mano, banca.visibles)], "puntos": banca.puntos},
+            "terminada": self.terminada,
+            "ganador": self.bj.ganador() if self.terminada else None,
+        }
+
+
+class Servidor:
+    """
+    Servidor asyncio de mesas de Blackjack.
+
+    Parámetros:
+    - mazos (int): Número de barajas del zapato de cada mesa, por defecto 1.
+    - penetracion (float): Penetración del zapato de cada mesa, por defecto
+      None (mezclar en cada mano).
+    - semilla (int): Semilla de las mesas. Cada mesa usa el flujo de su
+      identificador. Por defecto, None (una semilla aleatoria por mesa).
+    - generador (str): Nombre del generador de ``azar``, por defecto "mt".
+    - max_mesas (int): Mesas como máximo en todo el servidor.
+    - max_mesas_conexion (int): Mesas como máximo por conexión.
+
+    Atributos:
+    - mesas (int): Mesas abiertas.
+    - servidas (int): Mesas creadas desde el arranque.
+    - acciones (int): Órdenes atendidas desde el arranque.
+    """
+
+    def __init__(self, mazos=1, penetracion=None, semilla=None, max_mesas=MAX_MESAS, max_mesas_conexion=MAX_MESAS_CONEXION, generador="mt"):
+        self.mazos = mazos
+        self.penetracion = penetracion
+        self.semilla = semilla
+        self.generador = generador
+        self.max_mesas = max_mesas
+        self.max_mesas_conexion = max_mesas_conexion
+        self.mesas = 0
+        self.servidas = 0
+        self.acciones = 0
+        self.conexiones = {}  # Instante de la última orden por tarea de conexión
+        self.servidor = None
+        self.vigilante = None
+        self.cerrando = False
+
+    def crear(self):
+        """
+        Crea una mesa nueva con su propio generador.
+
+        Retorna:
+        - Sesion: La mesa con el reparto inicial hecho.
+        """
+
+        self.servidas += 1
+        mazo = Mazo(crear(self.generador, self.semilla, self.servidas), self.mazos, self.penetracion)
+        return Sesion(self.servidas, Blackjack(mazo, Reglas(mazos=self.mazos)))
+
+    def ejecutar(self, linea, propias):
+        """
+        Ejecuta una orden del protocolo.
+
+        Parámetros:
+        - linea (str): Orden recibida, sin el salto de línea.
+        - propias (dict): Mesas de la conexión por identificador.
+
+        Retorna:
+        - dict: Respuesta a enviar. None para cerrar la conexión.
+        """
+
+        partes = linea.split()
+        if not partes:
+            return {"ok": False, "error": "Orden vacía"}
+        orden = partes[0].upper()
+        if orden not in ORDENES:
+            return {"ok": False, "error": f"Orden desconocida: {partes[0]}"}
+        self.acciones += 1
+        if orden == "SALIR":
+            return None
+        if orden == "ESTADISTICAS":
+            return {"ok": True, "mesas": self.mesas, "servidas": self.servidas, "conexiones": len(self.conexiones), "acciones": self.acciones}
+        if orden == "NUEVA":
+            if self.mesas >= self.max_mesas or len(propias) >= self.max_mesas_conexion:
+                return {"ok": False, "error": "Límite de mesas alcanzado"}
+            sesion = self.crear()
+            propias[sesion.mesa] = sesion
+            self.mesas += 1
+            return sesion.estado()
+        if len(partes) != 2 or not partes[1].isdigit():
+            return {"ok": False, "error": f"Uso: {orden} <mesa>"}
+        sesion = propias.get(int(partes[1]))
+        if sesion is None:
+            return {"ok": False, "error": f"Mesa desconocida: {partes[1]}"}
+        try:
+            if orden == "PEDIR":
+                sesion.pedir()
+            elif orden == "PLANTAR":
+                sesion.plantar()
+            elif orden == "REINICIAR":
+                sesion.reiniciar()
+            elif orden == "CERRAR":
+                del propias[sesion.mesa]
+                self.mesas -= 1
+                return {"ok": True, "mesa": sesion.mesa, "manos": sesion.manos}
+        except ValueError as error:
+            return {"ok": False, "error": str(error)}
+        return sesion.estado()
+
+    async def atender(self, reader, writer):
+        """
+        Atiende una conexión: lee órdenes, las ejecuta y responde en orden.
+
+        Parámetros:
+        - reader (asyncio.StreamReader): Flujo de entrada de la conexión.
+        - writer (asyncio.StreamWriter): Flujo de salida de la conexión.
+        """
+
+        tarea = asyncio.current_task()
+        self.conexiones[tarea] = time.monotonic()
+        propias = {}
+        try:
+            while not self.cerrando:
+                try:
+                    linea = await reader.readline()
+                except ValueError:
+                    # La orden supera MAX_LINEA: el flujo ya no está sincronizado
+                    writer.write(b'{"ok":false,"error":"Orden demasiado larga"}\n')
+                    break
+                if not linea:
+                    break
+                self.conexiones[tarea] = time.monotonic()
+                respuesta = self.ejecutar(linea.decode("utf-8", "replace"), propias)
+                if respuesta is None:
+                    break
+                writer.write(json.dumps(respuesta, separators=(",", ":")).encode() + b"\n")
+                await writer.drain()  # Contrapresión: no leer más hasta enviar la respuesta
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.mesas -= len(propias)
+            self.conexiones.pop(tarea, None)
+            writer.close()
+            try:
+                await asyncio.wait_for(writer.wait_closed(), TIEMPO_CIERRE)
+            except (ConnectionError, asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+
+    async def iniciar(self, host="127.0.0.1", puerto=PUERTO, unix=None):
+        """
+        Empieza a aceptar conexiones por TCP o por un socket Unix.
+
+        Parámetros:
+        - host (str): Dirección TCP, por defecto 127.0.0.1.
+        - puerto (int): Puerto TCP, por defecto PUERTO.
+        - unix (str): Ruta del socket Unix. Si se indica, no se usa TCP.
+        """
+
+        if unix:
+            self.servidor = await asyncio.start_unix_server(self.atender, unix, limit=MAX_LINEA)
+        else:
+            self.servidor = await asyncio.start_server(self.atender, host, puerto, limit=MAX_LINEA)
+        self.vigilante = asyncio.create_task(self.vigilar())
+
+    async def vigilar(self):
+        """
+        Cierra periódicamente las conexiones sin órdenes durante TIEMPO_INACTIVO.
+        Una sola tarea vigila todas las conexiones, en lugar de un temporizador
+        por cada lectura.
+        """
+
+        while True:
+            await asyncio.sleep(TIEMPO_INACTIVO / 4)
+            limite = time.monotonic() - TIEMPO_INACTIVO
+            for tarea, ultima in list(self.conexiones.items()):
+                if ultima < limite:
+                    tarea.cancel()
+
+    async def detener(self):
+        """
+        Cierre ordenado: deja de aceptar conexiones y cierra las abiertas
+        entre órdenes (ninguna orden queda aplicada a medias).
+        """
+
+        self.cerrando = True
+        if self.vigilante is not None:
+            self.vigilante.cancel()
+        if self.servidor is not None:
+            self.servidor.close()
+        for tarea in list(self.conexiones):
+            tarea.cancel()  # Las órdenes no esperan, así que se cancela entre órdenes
+        if self.conexiones:
+            await asyncio.wait(list(self.conexiones), timeout=TIEMPO_CIERRE)
+
+
+async def servir(args):
+    """
+    Arranca el servidor y lo mantiene hasta recibir SIGINT o SIGTERM.
+
+    Parámetros:
+    - args (argparse.Namespace): Opciones de la línea de órdenes.
+    """
+
+    exportador = None
+    if args.metricas:
+        from metricas import Exportador, activar
+        exportador = Exportador(activar(), args.metricas, args.intervalo_metricas)
+    servidor = Servidor(args.mazos, args.penetracion, args.semilla, args.max_mesas, args.max_mesas_conexion, args.generador)
+    await servidor.iniciar(args.host, args.puerto, args.unix)
+    parar = asyncio.Event()
+    bucle = asyncio.get_running_loop()
+    for senal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            bucle.add_signal_handler(senal, parar.set)
+        except NotImplementedError:
+            pass  # Windows: se detiene con KeyboardInterrupt
+    print(f"Sirviendo en {args.unix or f'{args.host}:{args.puerto}'}", flush=True)
+    try:
+        await parar.wait()
+    finally:
+        await servidor.detener()
+        if exportador is not None:
+            exportador.cerrar()
+        print(f"Cerrado: {servidor.servidas} mesas servidas, {servidor.acciones} acciones", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de mesas de Blackjack")
+    parser.add_argument("--host", default="127.0.0.1", help="Dirección TCP")
+    parser.add_argument("--puerto", type=int, default=PUERTO, help="Puerto TCP")
+    parser.add_argument("--unix", default=None, help="Ruta de un socket Unix en lugar de TCP")
+    parser.add_argument("--mazos", type=int, default=1, help="Número de barajas del zapato de cada mesa")
+    parser.add_argument("--penetracion", type=float, default=None, help="Fracción del zapato repartida antes de mezclar")
+    parser.add_argument("--semilla", type=int, default=None, help="Semilla de las mesas")
+    parser.add_argument("--generador", choices=sorted(GENERADORES), default="mt", help="Generador para mezclar")
+    parser.add_argument("--max-mesas", type=int, default=MAX_MESAS, help="Mesas como máximo en el servidor")
+    parser.add_argument("--max-mesas-conexion", type=int, default=MAX_MESAS_CONEXION, help="Mesas como máximo por conexión")
+    parser.add_argument("--metricas", default=None, help="Fichero donde exportar las métricas del motor (.json o texto de Prometheus)")
+    parser.add_argument("--intervalo-metricas", type=float, default=10.0, help="Segundos entre exportaciones de las métricas")
+    args = parser.parse_args()
+    try:
+        asyncio.run(servir(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
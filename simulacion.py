@@ -0,0 +1,453 @@
+"""
+Simulación Monte Carlo del juego de Blackjack sin interfaz gráfica.
+
+Juega millones de rondas con las mismas reglas que la ventana principal (la
+banca se planta con 17 o más, o si supera al jugador) repartiendo el trabajo
+entre varios procesos. Cada proceso usa su propio flujo del generador
+(``azar``), identificado por la semilla y su índice, así que el resultado es
+reproducible para una misma semilla y número de procesos.
+
+Como cada mezcla depende solo de la semilla, el flujo y su índice, cualquier
+mano de una simulación larga puede reproducirse a partir de un registro
+pequeño (generador, semilla, flujo, mezcla y acciones) con reproducir().
+
+Uso:
+    python simulacion.py --rondas 1000000 --procesos 8 --semilla 42
+    python simulacion.py --rondas 100000 --buscar cinco-cartas --limite 3
+    python simulacion.py --rondas 10000000 --almacen manos/
+    python simulacion.py --comprobar-reparto
+    python simulacion.py --reproducir '{"generador": "mt", "semilla": 42, "flujo": 0, "mezcla": 7, "acciones": ["pedir", "plantar"]}'
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from azar import GENERADORES, crear
+from conteo import HILO, Conteo
+from motor import CARTAS_POR_PALO, MAX_ASIENTOS, PALOS, Blackjack, Mazo, Mesa, Reglas
+
+# Condiciones de búsqueda de manos por nombre
+CONDICIONES = {
+    "victoria": lambda bj: bj.ganador() == 1,
+    "derrota": lambda bj: bj.ganador() == 2,
+    "empate": lambda bj: bj.ganador() == 0,
+    "cinco-cartas": lambda bj: len(bj.humano.mano) >= 5 and not bj.humano.is_bust,
+    "banca-cinco-cartas": lambda bj: len(bj.banca.mano) >= 5,
+}
+
+
+class PlantarseEn:
+    """
+    Política del jugador: pide carta mientras no alcance un umbral.
+
+    Parámetros:
+    - umbral (int): Puntuación con la que se planta en manos duras.
+    - umbral_blanda (int): Puntuación con la que se planta en manos blandas.
+      Por defecto, la misma que en las duras.
+    """
+
+    __slots__ = ("umbral", "umbral_blanda")
+
+    def __init__(self, umbral=17, umbral_blanda=None):
+        self.umbral = umbral
+        self.umbral_blanda = umbral if umbral_blanda is None else umbral_blanda
+
+    def __call__(self, jugador, visible_banca):
+        """
+        Decide si el jugador pide otra carta.
+
+        Parámetros:
+        - jugador (Jugador): Mano del jugador.
+        - visible_banca (int): Carta visible de la banca.
+
+        Retorna:
+        - bool: True para pedir carta, False para plantarse.
+        """
+
+        if jugador.is_soft:
+            return jugador.puntos < self.umbral_blanda
+        return jugador.puntos < self.umbral
+
+
+def jugar_ronda(bj, politica):
+    """
+    Juega una ronda completa: reparto inicial, turno del jugador según la
+    política y turno de la banca.
+
+    Parámetros:
+    - bj (Blackjack): Juego sobre el que se juega la ronda.
+    - politica (callable): Recibe la mano del jugador y la carta visible de
+      la banca y retorna True para pedir carta.
+
+    Retorna:
+    - int: 0 si hay empate, 1 si gana el jugador, o 2 si gana la banca.
+    """
+
+    bj.reiniciar()
+    return jugar_mano(bj, politica)
+
+
+def jugar_mano(bj, politica, acciones=None):
+    """
+    Juega una mano con la baraja en su estado actual, sin mezclar.
+
+    Parámetros:
+    - bj (Blackjack): Juego con jugadores nuevos y la baraja preparada.
+    - politica (callable): Política del jugador.
+    - acciones (list): Si se indica, se le añaden las acciones del jugador
+      ("pedir" o "plantar") para poder reproducir la mano.
+
+    Retorna:
+    - int: 0 si hay empate, 1 si gana el jugador, o 2 si gana la banca.
+    """
+
+    bj.preparar()
+    humano = bj.humano
+    visible = bj.banca.mano[0]
+    while humano.puntos < 21 and politica(humano, visible):
+        if acciones is not None:
+            acciones.append("pedir")
+        if bj.repartir(humano) is None:
+            break
+    if acciones is not None and humano.puntos < 21:
+        acciones.append("plantar")
+    humano.plantado = True
+    bj.jugarBanca()
+    return bj.ganador()
+
+
+def jugar_asiento(mesa, jugador, politica):
+    """
+    Juega el turno de un asiento según su política.
+
+    Parámetros:
+    - mesa (Mesa): Mesa con el reparto inicial hecho.
+    - jugador (Jugador): Jugador del asiento.
+    - politica (callable): Política del jugador.
+    """
+
+    visible = mesa.banca.mano[0]
+    while jugador.puntos < 21 and politica(jugador, visible):
+        if mesa.repartir(jugador) is None:
+            break
+    jugador.plantado = True
+
+
+def jugar_mesa(mesa, politicas):
+    """
+    Juega una mano de una mesa con todos los asientos ocupados por bots.
+
+    Parámetros:
+    - mesa (Mesa): Mesa con jugadores nuevos y la baraja preparada.
+    - politicas (list): Política de cada asiento, en orden de juego.
+
+    Retorna:
+    - list: Resultado de cada asiento (0 empate, 1 gana el jugador, 2 gana la banca).
+    """
+
+    mesa.preparar()
+    for jugador, politica in zip(mesa.jugadores, politicas):
+        jugar_asiento(mesa, jugador, politica)
+    mesa.jugarBanca()
+    return mesa.resultados()
+
+
+def comprobar_reparto(rondas=3000, mazos=1, penetracion=0.95, semilla=0):
+    """
+    Comprueba que las mesas de 1 a MAX_ASIENTOS asientos juegan manos
+    completas con un zapato muy penetrado: que el reparto inicial da dos
+    cartas a cada asiento y a la banca, que la banca no deja de pedir antes
+    de plantarse, que ninguna carta aparece en la mesa más veces que en el
+    zapato y que el conteo coincide al terminar cada mano con el recuento a
+    mano de las cartas jugadas desde la última mezcla (también cuando el
+    zapato se agota y se mezcla a mitad de mano).
+
+    Parámetros:
+    - rondas (int): Rondas por número de asientos, por defecto 3000.
+    - mazos (int): Barajas del zapato, por defecto 1.
+    - penetracion (float): Fracción del zapato repartida antes de mezclar, por defecto 0.95.
+    - semilla (int): Semilla del generador, por defecto 0.
+
+    Retorna:
+    - dict: Rondas y manos comprobadas y manos con mezcla a mitad de mano.
+
+    Lanza:
+    - ValueError: Con la primera mano incorrecta.
+    """
+
+    politica = PlantarseEn()
+    manos = recogidas = 0
+    for asientos in range(1, MAX_ASIENTOS + 1):
+        rng = crear("mt", semilla, asientos)
+        conteo = Conteo(mazos)
+        mesa = Mesa(Mazo(rng, mazos, penetracion, conteo), Reglas(mazos=mazos), asientos)
+        for ronda in range(rondas):
+            mesa.reiniciar()
+            mezclas = rng.mezclas
+            jugar_mesa(mesa, [politica] * asientos)
+            recogidas += rng.mezclas != mezclas
+            if any(len(jugador.mano) < 2 for jugador in mesa.jugadores + [mesa.banca]):
+                raise ValueError(f"Reparto inicial incompleto con {asientos} asientos en la ronda {ronda}")
+            if mesa.vivos() and not mesa.plantaBanca():
+                raise ValueError(f"La banca deja de pedir con {mesa.banca.puntos} con {asientos} asientos en la ronda {ronda}")
+            enJuego = mesa.enJuego()
+            if any(enJuego.count(carta) > mazos for carta in set(enJuego)):
+                raise ValueError(f"Carta repetida en la mesa con {asientos} asientos en la ronda {ronda}")
+            # Al terminar la mano todas las cartas jugadas desde la mezcla están boca arriba
+            jugadas = mesa.baraja.jugadas()
+            restantes = [len(PALOS) * mazos] * CARTAS_POR_PALO
+            for carta in jugadas:
+                restantes[carta % CARTAS_POR_PALO] -= 1
+            if (conteo.corriente, conteo.vistas, conteo.restantes) != (sum(HILO[carta] for carta in jugadas), len(jugadas), restantes):
+                raise ValueError(f"Conteo incorrecto con {asientos} asientos en la ronda {ronda}")
+            manos += asientos
+    if not recogidas:
+        raise ValueError("Ninguna mano ha agotado el zapato")
+    return {"rondas": rondas * MAX_ASIENTOS, "manos": manos, "recogidas": recogidas}
+
+
+def simular_lote(rondas, semilla, politica, asientos=1, generador="mt", flujo=0, almacen=None):
+    """
+    Juega un lote de rondas con un flujo propio del generador.
+
+    Parámetros:
+    - rondas (int): Número de rondas a jugar.
+    - semilla (int): Semilla de la simulación.
+    - politica (callable): Política de todos los jugadores.
+    - asientos (int): Asientos de la mesa, por defecto 1.
+    - generador (str): Nombre del generador en azar.GENERADORES, por defecto "mt".
+    - flujo (int): Flujo del generador del lote, por defecto 0.
+    - almacen (str): Directorio de un ``almacen`` donde guardar las manos,
+      por defecto None (no se guardan). Los segmentos del lote llevan el
+      prefijo ``flujo<flujo>``.
+
+    Retorna:
+    - list: Conteo de manos [empates, victorias del jugador, victorias de la banca].
+    """
+
+    conteo = [0, 0, 0]
+    escritor = None
+    if almacen is not None:
+        from almacen import Escritor
+        escritor = Escritor(almacen, f"flujo{flujo:03d}", semilla=semilla)
+    if asientos == 1:
+        bj = Blackjack(Mazo(crear(generador, semilla, flujo)))
+        for _ in range(rondas):
+            resultado = jugar_ronda(bj, politica)
+            conteo[resultado] += 1
+            if escritor is not None:
+                escritor.anotar(bj, (resultado,))
+    else:
+        mesa = Mesa(Mazo(crear(generador, semilla, flujo)), asientos=asientos)
+        politicas = [politica] * asientos
+        for _ in range(rondas):
+            mesa.reiniciar()
+            resultados = jugar_mesa(mesa, politicas)
+            for resultado in resultados:
+                conteo[resultado] += 1
+            if escritor is not None:
+                escritor.anotar(mesa, resultados)
+    if escritor is not None:
+        escritor.cerrar()
+    return conteo
+
+
+def buscar(rondas, semilla, politica, condicion, generador="mt", flujo=0, limite=10):
+    """
+    Juega las rondas de un flujo y registra las manos que cumplen una condición.
+
+    Las rondas son las mismas que juega simular_lote() con el mismo flujo,
+    así que sirve para localizar manos raras de una simulación larga.
+
+    Parámetros:
+    - rondas (int): Número de rondas a jugar.
+    - semilla (int): Semilla de la simulación.
+    - politica (callable): Política del jugador.
+    - condicion (callable): Recibe el juego al terminar la mano y retorna
+      True para registrarla.
+    - generador (str): Nombre del generador, por defecto "mt".
+    - flujo (int): Flujo del generador, por defecto 0.
+    - limite (int): Número máximo de manos registradas, por defecto 10.
+
+    Retorna:
+    - list: Registros de las manos, aptos para reproducir().
+    """
+
+    rng = crear(generador, semilla, flujo)
+    bj = Blackjack(Mazo(rng))
+    registros = []
+    for ronda in range(rondas):
+        bj.reiniciar()  # Como jugar_ronda()
+        posicion, mezcla = bj.inicio
+        registro = {
+            "generador": generador, "semilla": semilla, "flujo": flujo,
+            "mezcla": mezcla, "posicion": posicion,
+            "ronda": ronda, "acciones": [],
+        }
+        resultado = jugar_mano(bj, politica, registro["acciones"])
+        if condicion(bj):
+            registro["resultado"] = resultado
+            registros.append(registro)
+            if len(registros) >= limite:
+                break
+    return registros
+
+
+def reproducir(registro):
+    """
+    Reproduce una mano a partir de su registro.
+
+    Parámetros:
+    - registro (dict): Generador, semilla, flujo, índice de la mezcla y
+      acciones del jugador; opcionalmente la posición de la baraja al
+      empezar la mano, el número de mazos y el de asientos (con varios
+      asientos, "acciones" lleva una lista de acciones por asiento).
+
+    Retorna:
+    - Mesa: El juego al terminar la mano (un Blackjack con un asiento).
+    """
+
+    rng = crear(registro["generador"], registro["semilla"], registro.get("flujo", 0))
+    rng.situar(registro["mezcla"])
+    mazos = registro.get("mazos", 1)
+    asientos = registro.get("asientos", 1)
+    if asientos == 1:
+        mesa = Blackjack(Mazo(rng, mazos), Reglas(mazos=mazos))
+        acciones = [registro["acciones"]]
+    else:
+        mesa = Mesa(Mazo(rng, mazos), Reglas(mazos=mazos), asientos)
+        acciones = registro["acciones"]
+    mesa.baraja.posicion = registro.get("posicion", 0)
+    mesa.preparar()
+    for jugador, asiento in zip(mesa.jugadores, acciones):
+        for accion in asiento:
+            if accion != "pedir" or jugador.puntos >= 21:
+                break
+            mesa.repartir(jugador)
+        jugador.plantado = True
+    mesa.jugarBanca()
+    return mesa
+
+
+def intervalo(exitos, total, z=1.96):
+    """
+    Calcula el intervalo de confianza de Wilson para una proporción.
+
+    Parámetros:
+    - exitos (int): Número de casos favorables.
+    - total (int): Número total de casos.
+    - z (float): Cuantil de la normal, por defecto 1.96 (95%).
+
+    Retorna:
+    - tuple: Límites inferior y superior del intervalo.
+    """
+
+    if total == 0:
+        return (0.0, 0.0)
+    p = exitos / total
+    denominador = 1 + z * z / total
+    centro = (p + z * z / (2 * total)) / denominador
+    margen = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominador
+    return (centro - margen, centro + margen)
+
+
+def simular(rondas, procesos=None, semilla=0, politica=None, asientos=1, generador="mt", almacen=None):
+    """
+    Reparte la simulación entre varios procesos y agrega los resultados.
+
+    Parámetros:
+    - rondas (int): Número total de rondas.
+    - procesos (int): Número de procesos, por defecto uno por núcleo.
+    - semilla (int): Semilla de la simulación.
+    - politica (callable): Política de los jugadores, por defecto PlantarseEn(17).
+    - asientos (int): Asientos de cada mesa, por defecto 1.
+    - generador (str): Nombre del generador, por defecto "mt". El proceso i
+      usa el flujo i.
+    - almacen (str): Directorio donde guardar las manos, por defecto None.
+
+    Retorna:
+    - dict: Tasas de victoria, derrota y empate por mano con sus intervalos
+      de confianza, rondas y manos jugadas, y rondas y manos por segundo.
+    """
+
+    if almacen is not None:
+        from almacen import comprobar_semilla
+        comprobar_semilla(semilla)  # Antes de empezar, no en cada proceso
+    procesos = procesos or os.cpu_count() or 1
+    politica = politica if politica is not None else PlantarseEn()
+    lotes = [rondas // procesos + (1 if i < rondas % procesos else 0) for i in range(procesos)]
+    inicio = time.perf_counter()
+    if procesos == 1:
+        conteos = [simular_lote(lotes[0], semilla, politica, asientos, generador, 0, almacen)]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            conteos = list(ejecutor.map(simular_lote, lotes, [semilla] * procesos, [politica] * procesos,
+                                        [asientos] * procesos, [generador] * procesos, range(procesos),
+                                        [almacen] * procesos))
+    duracion = time.perf_counter() - inicio
+    empates, victorias, derrotas = (sum(c[i] for c in conteos) for i in range(3))
+    manos = rondas * asientos
+    resultado = {"rondas": rondas, "asientos": asientos, "manos": manos, "procesos": procesos, "semilla": semilla, "generador": generador}
+    for clave, valor in (("victoria", victorias), ("derrota", derrotas), ("empate", empates)):
+        resultado[clave] = {"tasa": valor / manos if manos else 0.0, "ic95": intervalo(valor, manos)}
+    resultado["rondas_por_segundo"] = rondas / duracion if duracion else 0.0
+    resultado["manos_por_segundo"] = manos / duracion if duracion else 0.0
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulación Monte Carlo del Blackjack")
+    parser.add_argument("--rondas", type=int, default=1_000_000, help="Número de rondas a jugar")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos en paralelo (por defecto, uno por núcleo)")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla de la simulación")
+    parser.add_argument("--plantarse", type=int, default=17, help="Puntuación con la que se planta el jugador")
+    parser.add_argument("--plantarse-blanda", type=int, default=None, help="Puntuación con la que se planta en manos blandas")
+    parser.add_argument("--asientos", type=int, default=1, help="Asientos de cada mesa (1-7)")
+    parser.add_argument("--generador", choices=sorted(GENERADORES), default="mt", help="Generador para mezclar")
+    parser.add_argument("--buscar", choices=sorted(CONDICIONES), default=None, help="Registra las manos de un flujo que cumplen la condición")
+    parser.add_argument("--flujo", type=int, default=0, help="Flujo (índice de proceso) en el que buscar")
+    parser.add_argument("--limite", type=int, default=10, help="Manos registradas como máximo al buscar")
+    parser.add_argument("--reproducir", default=None, help="Registro JSON de una mano a reproducir")
+    parser.add_argument("--almacen", default=None, help="Directorio donde guardar las manos (ver almacen.py)")
+    parser.add_argument("--comprobar-reparto", action="store_true", help="Comprueba las manos de 1 a 7 asientos con un zapato muy penetrado")
+    parser.add_argument("--json", action="store_true", help="Imprime el resultado en formato JSON")
+    args = parser.parse_args()
+    if args.almacen is not None:
+        from almacen import SEMILLAS
+        if args.semilla not in SEMILLAS:
+            parser.error("--semilla debe caber en 64 bits con signo para guardar las manos con --almacen")
+    politica = PlantarseEn(args.plantarse, args.plantarse_blanda)
+
+    if args.comprobar_reparto:
+        comprobado = comprobar_reparto(semilla=args.semilla)
+        print(f"Reparto y conteo correctos: {comprobado['rondas']:,} rondas y {comprobado['manos']:,} manos"
+              f" ({comprobado['recogidas']:,} con mezcla a mitad de mano)")
+        return
+    if args.reproducir:
+        bj = reproducir(json.loads(args.reproducir))
+        bj.humano.consultar()
+        bj.banca.consultar()
+        bj.comprobarGanador()
+        return
+    if args.buscar:
+        for registro in buscar(args.rondas, args.semilla, politica, CONDICIONES[args.buscar], args.generador, args.flujo, args.limite):
+            print(json.dumps(registro))
+        return
+
+    resultado = simular(args.rondas, args.procesos, args.semilla, politica, args.asientos, args.generador, args.almacen)
+    if args.json:
+        print(json.dumps(resultado))
+        return
+    print(f"Rondas: {resultado['rondas']} de {resultado['asientos']} asientos ({resultado['procesos']} procesos, semilla {resultado['semilla']}, {resultado['generador']})")
+    for clave in ("victoria", "derrota", "empate"):
+        bajo, alto = resultado[clave]["ic95"]
+        print(f"{clave.capitalize():9}: {resultado[clave]['tasa']:.4%}  IC95% [{bajo:.4%}, {alto:.4%}]")
+    print(f"Rondas por segundo: {resultado['rondas_por_segundo']:,.0f} ({resultado['manos_por_segundo']:,.0f} manos)")
+
+
+if __name__ == '__main__':
+    main()
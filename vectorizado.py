@@ -0,0 +1,227 @@
+"""
+Simulación por lotes del Blackjack con NumPy.
+
+Representa K barajas como un array entero de K x 52 cartas y juega las K
+rondas a la vez: cada fila tiene su propio puntero de extracción, su suma
+dura y su número de ases, y la banca pide cartas solo en las filas que aún
+no se han plantado. Las reglas son las mismas que en ``motor.Blackjack``.
+
+La mezcla es perezosa: se aplica un paso de Fisher-Yates a una posición de
+una fila justo antes de extraerla, de modo que solo se mezclan las cartas
+que realmente se reparten. El prefijo usado de cada fila queda en el array,
+así que la misma fila jugada en el motor escalar da el mismo resultado.
+
+Uso:
+    python vectorizado.py --rondas 10000000 --lote 1000000 --semilla 0
+"""
+
+import argparse
+import json
+import time
+from array import array
+
+import numpy as np
+
+from motor import Blackjack, Mazo, TOTAL_CARTAS, VALORES
+from simulacion import PlantarseEn, intervalo, jugar_mano
+
+# Valor de cada carta contando el As como 1
+_VALORES = np.array(VALORES, dtype=np.int8)
+
+
+def nuevas_barajas(k):
+    """
+    Crea K barajas ordenadas.
+
+    Parámetros:
+    - k (int): Número de barajas.
+
+    Retorna:
+    - ndarray: Array uint8 de forma (k, 52) con las cartas en orden.
+    """
+
+    return np.tile(np.arange(TOTAL_CARTAS, dtype=np.uint8), (k, 1))
+
+
+def barajar(k, rng):
+    """
+    Crea K barajas completamente mezcladas.
+
+    Parámetros:
+    - k (int): Número de barajas.
+    - rng (numpy.random.Generator): Generador para la mezcla.
+
+    Retorna:
+    - ndarray: Array uint8 de forma (k, 52).
+    """
+
+    return rng.permuted(nuevas_barajas(k), axis=1)
+
+
+def _puntos(duras, ases):
+    """ Puntuación de cada fila: un as cuenta como 11 si no se supera 21. """
+    return duras + 10 * ((ases > 0) & (duras <= 11))
+
+
+def jugar_lote(barajas, umbral=17, umbral_blanda=None, rng=None):
+    """
+    Juega una ronda por cada fila de barajas en paralelo.
+
+    Parámetros:
+    - barajas (ndarray): Array uint8 de forma (k, 52). Se modifica si se
+      indica rng.
+    - umbral (int): Puntuación con la que se planta el jugador en manos duras.
+    - umbral_blanda (int): Puntuación con la que se planta en manos blandas.
+      Por defecto, la misma que en las duras.
+    - rng (numpy.random.Generator): Si se indica, las barajas se consideran
+      sin mezclar y se mezclan de forma perezosa al extraer cada carta.
+
+    Retorna:
+    - ndarray: Resultado por fila: 0 empate, 1 gana el jugador, 2 gana la banca.
+    """
+
+    umbral_blanda = umbral if umbral_blanda is None else umbral_blanda
+    k = barajas.shape[0]
+    plano = barajas.reshape(-1)
+    base = np.arange(k, dtype=np.intp) * TOTAL_CARTAS
+    punteros = np.zeros(k, dtype=np.intp)
+
+    def extraer(filas):
+        # Extrae la siguiente carta de cada fila indicada
+        pos = punteros[filas]
+        indices = base[filas] + pos
+        if rng is not None:
+            # Paso de Fisher-Yates para la posición que se va a extraer
+            destino = indices + (rng.random(len(filas)) * (TOTAL_CARTAS - pos)).astype(np.intp)
+            carta = plano[destino]
+            plano[destino] = plano[indices]
+            plano[indices] = carta
+        punteros[filas] = pos + 1
+        return _VALORES[plano[indices]]
+
+    todas = np.arange(k, dtype=np.intp)
+    # Reparto inicial: jugador, jugador, banca, banca (boca abajo)
+    v1, v2, v3, v4 = (extraer(todas).astype(np.int16) for _ in range(4))
+    duras_j = v1 + v2
+    ases_j = (v1 == 1).astype(np.int16) + (v2 == 1)
+    duras_b = v3 + v4
+    ases_b = (v3 == 1).astype(np.int16) + (v4 == 1)
+
+    # Turno del jugador: pide mientras no alcance su umbral
+    while True:
+        puntos = _puntos(duras_j, ases_j)
+        blanda = puntos != duras_j
+        activos = (puntos < 21) & (puntos < np.where(blanda, umbral_blanda, umbral))
+        filas = np.flatnonzero(activos)
+        if len(filas) == 0:
+            break
+        valor = extraer(filas)
+        duras_j[filas] += valor
+        ases_j[filas] += valor == 1
+    puntos_j = _puntos(duras_j, ases_j)
+
+    # Turno de la banca: se planta con 17 o más o si supera al jugador
+    while True:
+        puntos_b = _puntos(duras_b, ases_b)
+        activos = (puntos_j <= 21) & (puntos_b < 17) & (puntos_b <= puntos_j)
+        filas = np.flatnonzero(activos)
+        if len(filas) == 0:
+            break
+        valor = extraer(filas)
+        duras_b[filas] += valor
+        ases_b[filas] += valor == 1
+
+    resultado = np.where(puntos_j > puntos_b, 1, np.where(puntos_b > puntos_j, 2, 0)).astype(np.int8)
+    resultado[puntos_b > 21] = 1
+    resultado[puntos_j > 21] = 2
+    return resultado
+
+
+def comprobar(barajas, umbral=17, umbral_blanda=None):
+    """
+    Juega cada fila de barajas con el motor escalar.
+
+    Parámetros:
+    - barajas (ndarray): Array uint8 de forma (k, 52).
+    - umbral (int): Puntuación con la que se planta el jugador en manos duras.
+    - umbral_blanda (int): Puntuación con la que se planta en manos blandas.
+
+    Retorna:
+    - ndarray: Resultado por fila, comparable con el de jugar_lote.
+    """
+
+    politica = PlantarseEn(umbral, umbral_blanda)
+    resultado = np.empty(len(barajas), dtype=np.int8)
+    for i, fila in enumerate(barajas):
+        mazo = Mazo()
+        mazo.cartas = array("B", fila.tobytes())
+        resultado[i] = jugar_mano(Blackjack(mazo), politica)
+    return resultado
+
+
+def simular(rondas, lote=1_000_000, semilla=0, umbral=17, umbral_blanda=None):
+    """
+    Juega rondas en lotes vectorizados y agrega los resultados.
+
+    Parámetros:
+    - rondas (int): Número total de rondas.
+    - lote (int): Número de rondas por lote.
+    - semilla (int): Semilla del generador de NumPy.
+    - umbral (int): Puntuación con la que se planta el jugador en manos duras.
+    - umbral_blanda (int): Puntuación con la que se planta en manos blandas.
+
+    Retorna:
+    - dict: Tasas de victoria, derrota y empate con sus intervalos de
+      confianza, rondas jugadas y rondas por segundo.
+    """
+
+    rng = np.random.default_rng(semilla)
+    conteo = np.zeros(3, dtype=np.int64)
+    inicio = time.perf_counter()
+    restantes = rondas
+    while restantes > 0:
+        k = min(lote, restantes)
+        conteo += np.bincount(jugar_lote(nuevas_barajas(k), umbral, umbral_blanda, rng), minlength=3)
+        restantes -= k
+    duracion = time.perf_counter() - inicio
+    empates, victorias, derrotas = (int(c) for c in conteo)
+    resultado = {"rondas": rondas, "semilla": semilla}
+    for clave, valor in (("victoria", victorias), ("derrota", derrotas), ("empate", empates)):
+        resultado[clave] = {"tasa": valor / rondas if rondas else 0.0, "ic95": intervalo(valor, rondas)}
+    resultado["rondas_por_segundo"] = rondas / duracion if duracion else 0.0
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulación vectorizada del Blackjack")
+    parser.add_argument("--rondas", type=int, default=10_000_000, help="Número de rondas a jugar")
+    parser.add_argument("--lote", type=int, default=1_000_000, help="Rondas por lote vectorizado")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla de la simulación")
+    parser.add_argument("--plantarse", type=int, default=17, help="Puntuación con la que se planta el jugador")
+    parser.add_argument("--plantarse-blanda", type=int, default=None, help="Puntuación con la que se planta en manos blandas")
+    parser.add_argument("--comprobar", type=int, default=0, help="Compara N rondas con el motor escalar")
+    parser.add_argument("--json", action="store_true", help="Imprime el resultado en formato JSON")
+    args = parser.parse_args()
+
+    if args.comprobar:
+        barajas = nuevas_barajas(args.comprobar)
+        lote = jugar_lote(barajas, args.plantarse, args.plantarse_blanda, np.random.default_rng(args.semilla))
+        escalar = comprobar(barajas, args.plantarse, args.plantarse_blanda)
+        diferencias = int(np.count_nonzero(lote != escalar))
+        print(f"Comprobación: {args.comprobar} rondas, {diferencias} diferencias con el motor escalar")
+        if diferencias:
+            raise SystemExit(1)
+
+    resultado = simular(args.rondas, args.lote, args.semilla, args.plantarse, args.plantarse_blanda)
+    if args.json:
+        print(json.dumps(resultado))
+        return
+    print(f"Rondas: {resultado['rondas']} (semilla {resultado['semilla']})")
+    for clave in ("victoria", "derrota", "empate"):
+        bajo, alto = resultado[clave]["ic95"]
+        print(f"{clave.capitalize():9}: {resultado[clave]['tasa']:.4%}  IC95% [{bajo:.4%}, {alto:.4%}]")
+    print(f"Rondas por segundo: {resultado['rondas_por_segundo']:,.0f}")
+
+
+if __name__ == '__main__':
+    main()